@@ -1,15 +1,32 @@
+import abc
 import argparse
+import codecs
+import concurrent.futures
+import contextlib
+import dataclasses
 import datetime
+import email.utils
+import hashlib
 import html as _html  # aliased because notification_email uses 'html' as local var
+import http.server
+import io
+import itertools
 import json
 import logging
 import logging.handlers
 import os
+import queue
 import re
 import signal
+import smtplib
+import sqlite3
 import sys
+import tarfile
+import threading
 import time
+import urllib.parse
 
+import backoff
 import configobj
 import daemon
 import kodijson
@@ -25,10 +42,45 @@ signal.signal(signal.SIGINT, signal.default_int_handler)  # ensure we correctly
 # TODO change functions to **kwargs and use .get() to get value (will be none if not fund)
 # TODO change return for function to dictionary
 
-# Persistent notification state — survives between scheduler invocations while the process is running.
-# Keyed by site_name (str). Each entry tracks whether a site was last known down and when the most
-# recent notification was sent, so we only alert on state transitions and suppress repeat emails.
+# Persistent per-site circuit breaker state — survives between scheduler invocations while the process
+# is running. Keyed by site_name (str). Each entry tracks whether the site is down (breaker open),
+# the consecutive request failures seen while closed, when the breaker opened and when the most recent
+# notification was sent, so we only alert on state transitions and suppress repeat emails. The state
+# is fed by real request outcomes from http_client as well as by the check_site health probes.
 _site_down_state: dict = {}
+_site_down_lock = threading.RLock()
+
+# Signalled when a half-open trial request finishes, fetch workers waiting on the trial then re-check
+# the breaker, see _circuit_admit.
+_site_down_condition = threading.Condition(_site_down_lock)
+
+# Health probe per source_site_name: (site name used for breaker state and notifications, probe URL).
+_SITE_PROBES = {
+    "github": ("GitHub", "https://api.github.com"),
+    "gitlab": ("GitLab", "https://gitlab.com/api/v4/projects"),
+    "pypi": ("PyPi", "https://pypi.org/pypi/requests/json"),
+    "aor": ("AOR", "https://archlinux.org/packages/core/any/base/"),
+    "aur": ("AUR", "https://aur.archlinux.org/rpc/?v=5&type=info&arg[]=yay"),
+}
+
+# Host -> site name, used by http_client to feed request outcomes into the matching circuit breaker.
+# Seeded from _SITE_PROBES; check_site registers the host of any other URL it probes.
+_site_hosts: dict = {
+    urllib.parse.urlsplit(probe_url).netloc: site_name for site_name, probe_url in _SITE_PROBES.values()
+}
+
+# Whether monitor_sites probes each source in use before fetching, cleared by --no-preflight. Without
+# probes the first real request of a run to each site acts as its probe, see _unprobed_sites.
+preflight_checks = True
+
+# Sites not probed this run (--no-preflight); the first request outcome for each one trips its breaker
+# just like a failed health probe would.
+_unprobed_sites: set = set()
+
+# Circuit breaker tuning, overridden from the [circuit_breaker] section of config.ini.
+circuit_failure_threshold = 3
+circuit_open_mins = 10
+circuit_notification_cooldown_hours = 4
 
 # Per-site app-failure counters — also module-level so they accumulate across scheduler runs.
 # Keyed by site_name (str); reset to 0 when any app for that site succeeds.
@@ -39,6 +91,247 @@ _app_down_counters: dict = {}
 # self-signed certificates (e.g. corporate MITM).
 verify_ssl = True
 
+# Conditional-request validators (ETag / Last-Modified) plus the version parsed from the last full
+# response, keyed by URL. Persisted to validator_cache_file (next to config.ini) so a 304 Not Modified
+# on a later run short-circuits to the cached version without downloading or parsing the payload.
+_validator_cache: dict = {}
+_validator_cache_lock = threading.Lock()
+_validator_cache_dirty = False
+validator_cache_file = None
+
+# Whether site fetches send conditional requests, overridden from the [http] section of config.ini.
+http_conditional_requests = True
+
+# Total number of worker threads used to fetch current versions concurrently, overridden from the
+# [sources] section of config.ini.
+fetch_workers = 16
+
+# Per-source settings keyed by source_site_name, loaded from the [sources] subsections of config.ini.
+# Any source or key missing here falls back to _SOURCE_DEFAULTS.
+source_settings: dict = {}
+
+# Retry policy every source starts from: attempts per request, and the base/cap of the exponential
+# backoff delay (seconds) that full jitter is applied to.
+_RETRY_DEFAULTS = {"max_attempts": 3, "base_delay_secs": 2.0, "max_delay_secs": 30.0}
+
+# Connect/read timeouts (seconds) every HTTP source starts from. Kept tight, a healthy upstream answers
+# well within these and a hung connection is cut off before it stalls the run.
+_TIMEOUT_DEFAULTS = {"connect_timeout_secs": 5.0, "read_timeout_secs": 15.0}
+
+_SOURCE_DEFAULTS = {
+    "github": {
+        "max_concurrency": 8,
+        "graphql_min_items": 5,
+        "rate_limit_reserve": 50,
+        "rate_limit_max_wait_secs": 60,
+        **_RETRY_DEFAULTS,
+        **_TIMEOUT_DEFAULTS,
+    },
+    "gitlab": {"max_concurrency": 4, **_RETRY_DEFAULTS, **_TIMEOUT_DEFAULTS},
+    "pypi": {"max_concurrency": 4, **_RETRY_DEFAULTS, **_TIMEOUT_DEFAULTS, "max_response_bytes": 5242880},
+    "aor": {
+        "max_concurrency": 4,
+        **_RETRY_DEFAULTS,
+        **_TIMEOUT_DEFAULTS,
+        "read_timeout_secs": 20.0,
+        "sync_db": False,
+        "sync_db_mirror": "https://geo.mirror.pkgbuild.com",
+        "sync_db_repos": ["core", "extra"],
+    },
+    "aur": {"max_concurrency": 4, **_RETRY_DEFAULTS, **_TIMEOUT_DEFAULTS},
+    "regex": {"max_concurrency": 2, **_RETRY_DEFAULTS, **_TIMEOUT_DEFAULTS},
+    # notification targets, not site sources: Kodi is on the LAN, smtplib only has a single socket timeout
+    "kodi": {**_RETRY_DEFAULTS, "connect_timeout_secs": 3.0, "read_timeout_secs": 5.0},
+    "smtp": {"timeout_secs": 30.0},
+    "default": {"max_concurrency": 4, **_RETRY_DEFAULTS, **_TIMEOUT_DEFAULTS},
+}
+
+# Wall-clock budget in seconds for one monitor_sites run, 0 for none. Set in __main__ from
+# run_deadline_mins and never longer than schedule_check_mins when scheduled, so a run cannot overrun
+# into the next one. _run_deadline is the time.monotonic() value the current run expires at.
+run_deadline_secs = 0
+_run_deadline = None
+
+# Start of a PyPI JSON API document up to the value of its leading "info" key, which is all
+# pypi_apps needs; the per-release file lists that follow it are never parsed. A document whose first
+# _PYPI_INFO_PREFIX_MAX_CHARS characters do not match is read whole. While the "info" object streams
+# in, _JSON_STRING_SPECIAL and _JSON_STRUCTURAL find the next character that matters inside and
+# outside a JSON string, so its closing bracket is found without parsing it again per chunk.
+_PYPI_INFO_PREFIX = re.compile(r'\s*\{\s*"info"\s*:\s*')
+_PYPI_INFO_PREFIX_MAX_CHARS = 1024
+_JSON_STRING_SPECIAL = re.compile(r'["\\]')
+_JSON_STRUCTURAL = re.compile(r'["{}\[\]]')
+_json_decoder = json.JSONDecoder()
+
+# Host -> source_site_name, used to pick the retry policy and timeouts of a request. Hosts not listed
+# here use the "default" settings, unless the caller names the source (Kodi).
+_SOURCE_HOSTS = {
+    "api.github.com": "github",
+    "gitlab.com": "gitlab",
+    "pypi.org": "pypi",
+    "archlinux.org": "aor",
+    "aur.archlinux.org": "aur",
+    "net-secondary.web.minecraft-services.net": "regex",
+    "launchermeta.mojang.com": "regex",
+}
+
+# Statuses worth retrying: rate limiting and transient server-side failures. A 403 is only retried
+# when it carries Retry-After (GitHub's secondary rate limit), any other 4xx fails straight away.
+_RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Write-behind state: during a run [results] and site_list item changes are made to config_obj in
+# memory and marked dirty with _mark_state_dirty(). _flush_state() writes config.ini atomically once
+# every state_flush_items apps, straight after a trigger/notify is recorded, and at the end of the run,
+# instead of rewriting the whole file after every change.
+_state_dirty = False
+_state_lock = threading.RLock()
+state_flush_items = 25
+
+# Optional SQLite state backend (state_backend = "sqlite"), opened by _open_state_db. When set, current and
+# previous versions live in its versions table instead of the [results] section of config.ini, and every
+# newly observed version and trigger/notify is appended to its history table. Writes join the write-behind
+# batch above and are committed by _flush_state.
+_state_db = None
+
+# site_list compiled into SiteSpec objects by _site_specs. Every run reuses them until the site_list
+# object itself is replaced (config.ini loaded again), so per-item parsing happens once, not per run.
+_compiled_site_list = None
+_compiled_site_specs = ()
+
+# monitor_sites runs as a pipeline: fetch -> compare (diff against stored state) -> act (throttling and
+# trigger releases) -> notify, each stage with its own workers and connected by bounded queues, so a
+# slow release or SMTP send never holds up version detection. Overridden from [pipeline] in config.ini.
+pipeline_queue_size = 100
+compare_workers = 1
+action_workers = 4
+notification_workers = 2
+
+# Per target repo locks, keyed by (owner, name). Several site items can feed one target repo, so the
+# act workers serialise the release-days check and release creation per target, see _trigger_release.
+_target_repo_locks: dict = {}
+_target_repo_locks_lock = threading.Lock()
+
+# Queue of the notification stage while a monitor_sites run is in progress, None otherwise, see
+# _send_notification.
+_notification_queue = None
+
+# Durable notification outbox, notification_outbox.jsonl next to config.ini (None disables it). Every
+# notification of a run is appended to it before delivery and its outcome is appended after, so a
+# notification whose delivery failed, or was cut short by a crash, is retried on a later run.
+# _outbox_pending maps entry id -> entry for everything not yet delivered. Retries of a failed entry
+# wait outbox_retry_mins, doubling with each failed attempt, and it is dropped after
+# outbox_max_attempts attempts. Overridden from [notification] in config.ini.
+outbox_file = None
+outbox_max_attempts = 10
+outbox_retry_mins = 5
+_outbox_pending: dict = {}
+_outbox_lock = threading.Lock()
+
+# Longest wait between two delivery attempts of an outbox entry.
+OUTBOX_MAX_RETRY_MINS = 24 * 60
+
+# Digest mode, set from [notification] in config.ini. While a run is in progress _digest_entries
+# collects the notification_email kwargs of every message type not in digest_immediate_types, and
+# _send_digest mails them as one summary once the run's notifications have drained.
+email_digest = False
+digest_immediate_types = ["site_error"]
+_digest_entries = None
+_digest_lock = threading.Lock()
+
+# Headings of the digest sections, in the order they are rendered, and the message types listed under each.
+DIGEST_SECTIONS = (
+    ("Version changes", ("trigger", "notify")),
+    ("Site status", ("site_error", "site_recovered")),
+    ("Errors", ("app_error", "config_error")),
+)
+
+# yagmail.SMTP session shared by every email of a run, logged in on first use and closed by
+# _close_smtp_session when the run's notifications have drained. _smtp_stats counts what was sent
+# over it for the run log.
+_smtp_session = None
+_smtp_lock = threading.Lock()
+_smtp_stats = {"sent": 0, "failed": 0, "reconnects": 0, "send_secs": 0.0}
+
+# Per-run memo of GET results keyed by ("http", method, url, auth identity), set to a fresh dict by
+# monitor_sites and back to None once the run ends. Each value is a Future, so a request already in
+# flight is waited on rather than sent twice. Streamed responses and bodies over MEMO_MAX_BODY_BYTES
+# (e.g. AOR sync databases) are only shared with the callers already waiting on them and then dropped,
+# their single consumer has parsed them by then. _run_memo_stats counts hits/misses for the run log,
+# "fetch" counting site items that reused another item's parsed result in the fetch stage.
+_run_memo = None
+_run_memo_lock = threading.Lock()
+MEMO_MAX_BODY_BYTES = 256 * 1024
+_run_memo_stats = {"http_hits": 0, "http_misses": 0, "fetch_hits": 0, "fetch_misses": 0}
+
+# Prometheus metrics, name -> (type, help). _metric_values maps (name, labels) -> value, a histogram's
+# value being [count per bucket in METRIC_LATENCY_BUCKETS, sum, count]. They are rendered in the text
+# exposition format by _render_metrics, served on /metrics by _start_metrics_server (--schedule
+# --daemon) and written to metrics_textfile after every run for node_exporter's textfile collector.
+METRICS = {
+    "tdb_runs_total": ("counter", "Checks of all sites run"),
+    "tdb_run_failures_total": ("counter", "Checks of all sites that ended with an unhandled error"),
+    "tdb_run_duration_seconds": ("gauge", "Wall time of the last check of all sites"),
+    "tdb_last_run_timestamp_seconds": ("gauge", "Unix time the last check of all sites finished"),
+    "tdb_site_items": ("gauge", "Site items in site_list"),
+    "tdb_http_request_duration_seconds": ("histogram", "Latency of HTTP request attempts per source"),
+    "tdb_http_requests_total": ("counter", "HTTP request attempts per source and status code"),
+    "tdb_http_response_bytes_total": ("counter", "Response body bytes downloaded per source"),
+    "tdb_http_retries_total": ("counter", "HTTP requests retried per source"),
+    "tdb_http_not_modified_total": ("counter", "Conditional requests answered 304 Not Modified per source"),
+    "tdb_memo_hits_total": ("counter", "Requests and parsed results reused within a run instead of fetched again"),
+    "tdb_memo_misses_total": ("counter", "Requests and parsed results fetched within a run"),
+    "tdb_github_rate_limit_remaining": ("gauge", "GitHub rate limit budget left per resource"),
+    "tdb_releases_created_total": ("counter", "GitHub releases created to trigger a build"),
+    "tdb_notification_duration_seconds": ("histogram", "Latency of delivered notifications per channel"),
+    "tdb_notification_failures_total": ("counter", "Notifications that could not be delivered per channel"),
+}
+METRIC_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+_metric_values: dict = {}
+_metrics_lock = threading.Lock()
+
+# node_exporter textfile written after every run, set from [metrics] in config.ini (None disables it).
+metrics_textfile = None
+
+# Per-run JSON reports, run-<timestamp>.json plus last_run.json written to run_report_dir (the logs
+# directory) by _write_run_report, keeping the newest run_reports_keep run files (0 disables them).
+# While a run is in progress _run_report holds what it has collected: per-item results keyed by
+# SiteSpec, fetch details keyed by fetch_key (or source name for batched requests) and seconds spent
+# per phase. _report_context.requests collects the HTTP attempts of the fetch running in a thread.
+run_report_dir = None
+run_reports_keep = 0
+_run_report = None
+_run_report_lock = threading.Lock()
+_report_context = threading.local()
+
+# GitHub GraphQL endpoint and the number of repositories aliased into a single query.
+GITHUB_GRAPHQL_URL = "https://api.github.com/graphql"
+GITHUB_GRAPHQL_BATCH_SIZE = 25
+
+# Per-run target repo details resolved by the GraphQL batch resolver, keyed by (owner, name). Each
+# entry holds the last release "published_at", "default_branch" and a "branches" dict of branch
+# name -> exists, letting throttling and release creation skip their own REST calls.
+_github_target_info: dict = {}
+
+# GitHub rate-limit budget per resource ("core", "graphql", ...) as last reported by the X-RateLimit-*
+# response headers, shared by every GitHub call so concurrent fetches pace themselves against one budget.
+# Each entry holds "limit", "remaining", "reset" (epoch secs) and "retry_after_until" (epoch secs) set
+# by a 429 or secondary rate limit 403. Module-level so the budget carries over between scheduler runs.
+_github_rate_limit: dict = {}
+_github_rate_limit_lock = threading.Lock()
+
+# Process-wide pool of HTTP sessions keyed by "scheme://host". Reusing a session keeps the TCP/TLS
+# connection alive between requests (and between scheduler runs) instead of paying a fresh handshake
+# for every call. Each entry tracks the session, its request count and when it was last used so
+# sessions can be recycled once they exceed the keep-alive limits below.
+_http_sessions: dict = {}
+_http_sessions_lock = threading.Lock()
+
+# Connection pool settings for the pooled sessions, overridden from the [http] section of config.ini.
+http_max_connections_per_host = 10
+http_block_when_pool_full = False
+http_keepalive_max_requests = 1000
+http_keepalive_idle_secs = 300
+
 
 def _silence_tls_warnings(verify_ssl_enabled):
     """Suppress urllib3's InsecureRequestWarning when TLS verification is off.
@@ -60,6 +353,228 @@ def create_config():
     config_obj.write()
 
 
+def _mark_state_dirty():
+    """Note that config_obj holds state not yet written to config.ini."""
+    global _state_dirty
+    with _state_lock:
+        _state_dirty = True
+
+
+def _write_config_atomic():
+    """Write config_obj to its file via a temp file, fsync and rename, so a crash leaves the old or new file."""
+    config_file = config_obj.filename
+    temp_file = "%s.tmp" % config_file
+
+    with open(temp_file, "wb") as state_file:
+        config_obj.write(outfile=state_file)
+        state_file.flush()
+        os.fsync(state_file.fileno())
+
+    # config.ini holds credentials, keep the permissions of the file being replaced
+    if os.path.exists(config_file):
+        os.chmod(temp_file, os.stat(config_file).st_mode & 0o7777)
+
+    os.replace(temp_file, config_file)
+
+    # fsync the directory as well so the rename itself is durable (not possible on Windows)
+    if hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(os.path.dirname(os.path.abspath(config_file)), os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def _flush_state():
+    """Atomically write config.ini if the state changed since the last flush.
+
+    On failure the state stays dirty and the next flush tries again.
+    """
+    start_time = time.monotonic()
+    try:
+        _write_state()
+
+    finally:
+        _report_phase("state_write", time.monotonic() - start_time)
+
+
+def _write_state():
+    """Commit the state database and write config.ini if it is dirty, see _flush_state."""
+    global _state_dirty
+
+    with _state_lock:
+        if _state_db is not None:
+            try:
+                _state_db.commit()
+
+            except sqlite3.Error as e:
+                app_logger_instance.warning("Unable to commit state database: %s" % e)
+
+        if not _state_dirty:
+            return
+
+        try:
+            _write_config_atomic()
+
+        except OSError as e:
+            app_logger_instance.warning("Unable to write state to %s: %s" % (config_obj.filename, e))
+            return
+
+        _state_dirty = False
+
+
+def _open_state_db(db_file):
+    """Open (creating if needed) the SQLite state database and make it the state backend.
+
+    The first time the database is opened, versions already recorded in the [results] section of
+    config.ini are imported for every item in site_list, so switching backends does not look like a
+    first run and does not re-trigger anything.
+    """
+    global _state_db
+
+    connection = sqlite3.connect(db_file, check_same_thread=False)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=FULL")
+    connection.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS versions (
+            site TEXT NOT NULL,
+            app TEXT NOT NULL,
+            target TEXT NOT NULL,
+            current_version TEXT,
+            previous_version TEXT,
+            updated_at REAL NOT NULL,
+            PRIMARY KEY (site, app, target)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS history (
+            id INTEGER PRIMARY KEY,
+            recorded_at REAL NOT NULL,
+            site TEXT NOT NULL,
+            app TEXT NOT NULL,
+            target TEXT NOT NULL,
+            event TEXT NOT NULL,
+            version TEXT
+        );
+        CREATE INDEX IF NOT EXISTS history_recorded_at ON history (recorded_at);
+        CREATE INDEX IF NOT EXISTS history_item ON history (site, app, target, recorded_at);
+        """
+    )
+
+    if connection.execute("SELECT 1 FROM versions LIMIT 1").fetchone() is None:
+        results = config_obj.get("results", {})
+        now = time.time()
+        imported = 0
+
+        for site_spec in _site_specs(_config_site_list()):
+            current_version = results.get(site_spec.current_version_key)
+            previous_version = results.get(site_spec.previous_version_key)
+
+            if current_version is None and previous_version is None:
+                continue
+
+            connection.execute(
+                "INSERT OR IGNORE INTO versions VALUES (?, ?, ?, ?, ?, ?)",
+                (*site_spec.state_key, current_version, previous_version, now),
+            )
+            imported += 1
+
+        connection.commit()
+
+        if imported:
+            app_logger_instance.info("Imported %s version records from config.ini into %s" % (imported, db_file))
+
+    _state_db = connection
+    return connection
+
+
+def _get_previous_version(site_spec):
+    """Return the stored previous version for an item, None if it has never been seen."""
+    if _state_db is None:
+        return config_obj["results"].get(site_spec.previous_version_key)
+
+    with _state_lock:
+        row = _state_db.execute(
+            "SELECT previous_version FROM versions WHERE site = ? AND app = ? AND target = ?", site_spec.state_key
+        ).fetchone()
+
+    return row[0] if row else None
+
+
+def _record_current_version(site_spec, current_version):
+    """Store the version just fetched for an item, adding an 'observed' history entry when it is new."""
+    if _state_db is None:
+        with _state_lock:
+            config_obj["results"][site_spec.current_version_key] = current_version
+            _mark_state_dirty()
+        return
+
+    item_key = site_spec.state_key
+    now = time.time()
+
+    with _state_lock:
+        row = _state_db.execute(
+            "SELECT current_version FROM versions WHERE site = ? AND app = ? AND target = ?", item_key
+        ).fetchone()
+
+        if row is not None and row[0] == current_version:
+            return
+
+        _state_db.execute(
+            "INSERT INTO versions (site, app, target, current_version, updated_at) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (site, app, target) DO UPDATE SET "
+            "current_version = excluded.current_version, updated_at = excluded.updated_at",
+            (*item_key, current_version, now),
+        )
+        _state_db.execute(
+            "INSERT INTO history (recorded_at, site, app, target, event, version) VALUES (?, ?, ?, ?, 'observed', ?)",
+            (now, *item_key, current_version),
+        )
+
+
+def _record_previous_version(site_spec, current_version, event):
+    """Store current_version as the item's previous version, recording why in the history.
+
+    event is 'first_seen', 'trigger', 'notify' or 'already_exists'.
+    """
+    if _state_db is None:
+        with _state_lock:
+            config_obj["results"][site_spec.previous_version_key] = current_version
+            _mark_state_dirty()
+        return
+
+    item_key = site_spec.state_key
+    now = time.time()
+
+    with _state_lock:
+        _state_db.execute(
+            "INSERT INTO versions (site, app, target, previous_version, updated_at) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (site, app, target) DO UPDATE SET "
+            "previous_version = excluded.previous_version, updated_at = excluded.updated_at",
+            (*item_key, current_version, now),
+        )
+        _state_db.execute(
+            "INSERT INTO history (recorded_at, site, app, target, event, version) VALUES (?, ?, ?, ?, ?, ?)",
+            (now, *item_key, event, current_version),
+        )
+
+
+def state_changes_since(since_secs):
+    """Return the history entries recorded in the last since_secs seconds, oldest first.
+
+    Each entry is a (recorded_at, site, app, target, event, version) tuple, recorded_at being a Unix
+    timestamp. Only available with the SQLite state backend, returns None otherwise.
+    """
+    if _state_db is None:
+        return None
+
+    with _state_lock:
+        return _state_db.execute(
+            "SELECT recorded_at, site, app, target, event, version FROM history "
+            "WHERE recorded_at >= ? ORDER BY recorded_at, id",
+            (time.time() - since_secs,),
+        ).fetchall()
+
+
 def time_check(current_time, grace_period_mins, source_version_change_datetime):
 
     # compare difference between local date/time and trigger date/time to produce timedelta
@@ -247,6 +762,25 @@ def notification_email(**kwargs):
         app_logger_instance.info("Email notification not enabled")
         return 1
 
+    # in digest mode the message waits for the end of the run unless its type is sent straight away
+    with _digest_lock:
+        if _digest_entries is not None and _digest_type(kwargs) not in digest_immediate_types:
+            _digest_entries.append(kwargs)
+            return 0
+
+    subject, html = _render_email(kwargs)
+
+    app_logger_instance.info("Sending email notification...")
+    return _smtp_send(subject, html)
+
+
+def _digest_type(kwargs):
+    """Return the message type of notification_email kwargs, the action for version-change emails."""
+    return kwargs.get("msg_type") or kwargs.get("action")
+
+
+def _render_email(kwargs):
+    """Return the (subject, html_body) for notification_email kwargs, HTML-escaping every field."""
     # unpack arguments from dictionary and HTML-escape for safe email rendering
     action = kwargs.get("action")
     msg_type = kwargs.get("msg_type")
@@ -275,17 +809,171 @@ def notification_email(**kwargs):
         target_repo_name,
     )
 
-    try:
-        yag = yagmail.SMTP(email_username, email_password)
-        app_logger_instance.info("Sending email notification...")
-        yag.send(to=email_to, subject=subject, contents=[html])
-        return 0
+    return subject, html
 
-    except Exception:
-        app_logger_instance.warning("Failed to send E-Mail notification to %s" % email_to)
+
+def _build_digest_content(entries):
+    """Build the (subject, html_body) of a digest email from the notification_email kwargs it collected."""
+    counts = []
+    html = ""
+
+    for heading, msg_types in DIGEST_SECTIONS:
+        section_entries = [kwargs for kwargs in entries if _digest_type(kwargs) in msg_types]
+        if not section_entries:
+            continue
+
+        counts.append("%d %s" % (len(section_entries), heading.lower()))
+        html += "<h3>%s</h3>" % heading
+        for kwargs in section_entries:
+            subject, entry_html = _render_email(kwargs)
+            html += "<p><b>%s</b><br>%s</p>" % (subject, entry_html)
+
+    subject = "TriggerDockerBuild digest - %s" % ", ".join(counts)
+    return subject, html
+
+
+def _start_digest():
+    """Start collecting this run's notification emails when digest mode is enabled."""
+    global _digest_entries
+
+    with _digest_lock:
+        _digest_entries = [] if email_digest else None
+
+
+def _send_digest():
+    """Stop collecting and send everything collected during the run as one email."""
+    global _digest_entries
+
+    with _digest_lock:
+        entries, _digest_entries = _digest_entries, None
+
+    if not entries:
+        return None
+
+    subject, html = _build_digest_content(entries)
+    app_logger_instance.info("Sending digest email notification with %d messages..." % len(entries))
+
+    # the digest replaces the emails it collected, so it goes through the outbox like they would have
+    if outbox_file:
+        entry_id = _outbox_put(_smtp_send, (subject, html), {})
+        return _deliver_outbox_entry(entry_id) if entry_id is not None else None
+
+    return _smtp_send(subject, html)
+
+
+def _smtp_connect():
+    """Open and log in a yagmail.SMTP session."""
+    # yagmail hands extra kwargs to smtplib, whose single socket timeout covers connect and every command
+    yag = yagmail.SMTP(email_username, email_password, timeout=float(_source_setting("smtp", "timeout_secs")))
+    yag.login()
+    return yag
+
+
+def _smtp_send(subject, html):
+    """Send one email over the run's SMTP session, returning 0 on success or 1 on failure.
+
+    yag.send() logs in again on every call, so the message is built with prepare_send() and handed
+    to the session's smtplib connection directly. A session the server has dropped (idle timeout,
+    reset) is reopened once and the message resent.
+    """
+    global _smtp_session
+
+    with _smtp_lock:
+        start_time = time.monotonic()
+
+        for attempt in range(2):
+            try:
+                if _smtp_session is None:
+                    _smtp_session = _smtp_connect()
+                    if attempt:
+                        _smtp_stats["reconnects"] += 1
+
+                recipients, message = _smtp_session.prepare_send(to=email_to, subject=subject, contents=[html])
+                _smtp_session.smtp.sendmail(_smtp_session.user, recipients, message)
+
+            except (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError) as e:
+                # the session is unusable either way, a retry starts from a fresh login
+                _close_smtp_connection()
+                if attempt:
+                    error = e
+                    break
+                app_logger_instance.info("SMTP session dropped (%s), reconnecting..." % e)
+                continue
+
+            except Exception as e:
+                error = e
+                break
+
+            send_secs = time.monotonic() - start_time
+            _metric_observe("tdb_notification_duration_seconds", send_secs, channel="email")
+            _smtp_stats["sent"] += 1
+            _smtp_stats["send_secs"] += send_secs
+            app_logger_instance.info("Sent E-Mail notification '%s' in %.2f secs" % (subject, send_secs))
+            return 0
+
+        _smtp_stats["failed"] += 1
+        _metric_inc("tdb_notification_failures_total", channel="email")
+        app_logger_instance.warning(
+            "Failed to send E-Mail notification to %s after %.2f secs: %s"
+            % (email_to, time.monotonic() - start_time, error)
+        )
         return 1
 
 
+def _close_smtp_connection():
+    """Close and forget the SMTP session, caller holds _smtp_lock."""
+    global _smtp_session
+
+    if _smtp_session is not None:
+        with contextlib.suppress(Exception):
+            _smtp_session.close()
+        _smtp_session = None
+
+
+def _close_smtp_session():
+    """Close the run's SMTP session and log what was sent over it."""
+    with _smtp_lock:
+        _close_smtp_connection()
+        stats = dict(_smtp_stats)
+        _smtp_stats.update(dict.fromkeys(_smtp_stats, 0))
+
+    if stats["sent"] or stats["failed"]:
+        app_logger_instance.info(
+            "E-Mail notifications: %d sent, %d failed, %d reconnects, %.2f secs average send"
+            % (stats["sent"], stats["failed"], stats["reconnects"], stats["send_secs"] / max(stats["sent"], 1))
+        )
+
+
+def _kodi_execute(transport):
+    """Return a replacement for a kodijson transport's execute() that sends the JSON-RPC call via http_client.
+
+    kodijson's own transport calls requests.post with no timeout, so a Kodi box that accepts the
+    connection but never answers would hang the run. The replacement keeps kodijson's call
+    signature and raises on failure as kodijson does. Calls are retried under the [[kodi]] settings
+    and are not cut short by the run deadline.
+    """
+
+    def execute(method, *args, **kwargs):
+        params = args[0] if len(args) == 1 else kwargs
+        return_code, status_code, content = http_client(
+            url=transport.url,
+            user_agent="python-kodi",
+            request_type="post",
+            auth=(transport.username, transport.password),
+            json_payload={"jsonrpc": "2.0", "id": 1, "method": method, "params": params},
+            source_site_name="kodi",
+            # retried under the [[kodi]] policy, a repeated GUI notification is harmless
+            idempotent=True,
+            # delivered after the fetch, the run deadline only bounds fetching
+            deadline=False,
+        )
+        if return_code != 0:
+            raise requests.exceptions.RequestException("Kodi JSON-RPC call %s failed: %s" % (method, content))
+        return json.loads(content)
+
+    return execute
+
+
 # noinspection PyUnresolvedReferences
 def notification_kodi(action, source_app_name, current_version):
 
@@ -301,7 +989,11 @@ def notification_kodi(action, source_app_name, current_version):
     # construct login with custom credentials for rpc call
     kodi = kodijson.Kodi("http://%s:%s/jsonrpc" % (kodi_hostname, kodi_port), kodi_username, kodi_password)
 
+    # kodijson posts without a timeout, route its calls through http_client so the kodi timeouts apply
+    kodi.transport.execute = _kodi_execute(kodi.transport)
+
     # send gui notification
+    start_time = time.monotonic()
     try:
         app_logger_instance.info("Sending kodi notification...")
         kodi.GUI.ShowNotification(
@@ -310,215 +1002,1287 @@ def notification_kodi(action, source_app_name, current_version):
                 "message": "%s [%s] - updated to %s" % (source_app_name, action, current_version),
             }
         )
+        _metric_observe("tdb_notification_duration_seconds", time.monotonic() - start_time, channel="kodi")
 
     except Exception:
+        _metric_inc("tdb_notification_failures_total", channel="kodi")
         app_logger_instance.warning(
             "Failed to send notification to Kodi instance at http://%s:%s/jsonrpc" % (kodi_hostname, kodi_port)
         )
         return 1
 
 
-def _parse_http_kwargs(kwargs):
-    """Validate and extract http_client arguments.
+def _send_notification(send, *args, **kwargs):
+    """Call send(*args, **kwargs), handing it to the notification stage when a monitor_sites run is in progress.
 
-    Returns a dict of parsed args, or None if a required argument is missing
-    or invalid (a warning is logged in that case).
+    During a run an enabled notification is recorded in the outbox first and the stage delivers the
+    outbox entry, so it survives a failed delivery or a crash.
     """
-    if kwargs is None:
-        app_logger_instance.warning("No keyword args sent to function, exiting function...")
-        return None
-
-    url = kwargs.get("url")
-    if not url:
-        app_logger_instance.warning("No URL sent to function, exiting function...")
-        return None
+    notification_queue = _notification_queue
 
-    user_agent = kwargs.get("user_agent")
-    if not user_agent:
-        app_logger_instance.warning("No User Agent sent to function, exiting function...")
-        return None
+    if notification_queue is None:
+        send(*args, **kwargs)
 
-    request_type = kwargs.get("request_type")
-    if request_type not in ("get", "put", "post"):
-        app_logger_instance.warning("Invalid or missing request type '%s', exiting function..." % request_type)
-        return None
+    elif outbox_file and _notification_enabled(send):
+        entry_id = _outbox_put(send, args, kwargs)
+        if entry_id is not None:
+            notification_queue.put((_deliver_outbox_entry, (entry_id,), {}))
 
-    return {
-        "url": url,
-        "user_agent": user_agent,
-        "request_type": request_type,
-        "auth": kwargs.get("auth"),
-        "additional_header": kwargs.get("additional_header"),
-        "data_payload": kwargs.get("data_payload"),
-        "json_payload": kwargs.get("json_payload"),
-    }
+    else:
+        notification_queue.put((send, args, kwargs))
 
 
-def _check_http_status(status_code, url, content):
-    """Raise HTTPError for non-2xx responses, logging a specific message."""
-    if 200 <= status_code <= 299:
-        return
+def _notification_enabled(send):
+    """Return False for a notification function whose target is switched off, nothing to keep in the outbox."""
+    return {"notification_email": email_notification, "notification_kodi": kodi_notification}.get(send.__name__, True)
 
-    if status_code == 401:
-        message = "The status code %s indicates unauthorised access for %s, error is %s"
-    elif status_code == 404:
-        message = "The status code %s indicates the requested resource could not be found  for %s, error is %s"
-    elif status_code == 422:
-        message = (
-            "The status code %s indicates a request was well-formed but was unable "
-            "to be followed due to semantic errors for %s, error is %s"
-        )
-    else:
-        message = "The status code %s indicates an unexpected error for %s, error is %s"
 
-    app_logger_instance.warning(message % (status_code, url, content))
-    raise requests.exceptions.HTTPError(status_code, url, content)
+def _outbox_append(record):
+    """Append one record to the outbox file and fsync it, caller holds _outbox_lock."""
+    with open(outbox_file, "a", encoding="utf-8") as outbox:
+        outbox.write(json.dumps(record, sort_keys=True) + "\n")
+        outbox.flush()
+        os.fsync(outbox.fileno())
 
 
-def _execute_http_request(
-    session, url, user_agent, request_type, auth, additional_header, data_payload, json_payload, verify_ssl
-):
-    """Build the request and execute it, retrying transient 5xx errors.
+def _outbox_put(send, args, kwargs):
+    """Record a notification in the outbox and return its entry id.
 
-    Returns (status_code, content).
+    The id is a hash of the notification itself, so the same notification queued again while an
+    earlier copy is still undelivered is dropped as a duplicate and None is returned.
     """
-    connect_timeout = 60.0
-    read_timeout = 60.0
+    entry = {"send": send.__name__, "args": list(args), "kwargs": kwargs}
+    entry_id = hashlib.sha256(json.dumps(entry, sort_keys=True).encode("utf-8")).hexdigest()[:16]
 
-    requests_data_dict = {
-        "url": url,
-        "timeout": (connect_timeout, read_timeout),
-        "allow_redirects": True,
-        "verify": verify_ssl,
-    }
+    with _outbox_lock:
+        if entry_id in _outbox_pending:
+            app_logger_instance.info("Notification %s is already in the outbox, skipping duplicate" % entry_id)
+            return None
 
-    session.headers.update({"Accept-encoding": "gzip", "User-Agent": user_agent})
+        entry.update(id=entry_id, queued_at=time.time(), attempts=0, next_attempt_at=0)
+        try:
+            _outbox_append(dict(entry, event="queued"))
 
-    if additional_header:
-        session.headers.update(additional_header)
+        except OSError as e:
+            app_logger_instance.warning("Unable to write notification outbox %s: %s" % (outbox_file, e))
 
-    if auth:
-        session.auth = auth
+        _outbox_pending[entry_id] = entry
 
-    if request_type in ("put", "post"):
-        if json_payload is not None:
-            # requests json= kwarg sets Content-Type: application/json
-            requests_data_dict.update({"json": json_payload})
-        else:
-            requests_data_dict.update({"data": data_payload})
+    return entry_id
 
-    request_method = getattr(session, request_type)
 
-    transient_statuses = (502, 503, 504)
-    max_attempts = 3
-    retry_delay_secs = 5
+def _deliver_outbox_entry(entry_id):
+    """Deliver one outbox entry and record the outcome, returning the notification function's result.
 
-    for attempt in range(max_attempts):
-        response = request_method(**requests_data_dict)
-        status_code = response.status_code
-        content = response.content
+    The notification functions return 1 on failure (email 0 and Kodi None on success). A failed
+    entry stays pending and is retried by a later run, with a retry delay that doubles per attempt.
+    """
+    with _outbox_lock:
+        entry = _outbox_pending.get(entry_id)
+
+    if entry is None:
+        return None
+
+    try:
+        result = globals()[entry["send"]](*entry["args"], **entry["kwargs"])
+
+    except Exception as e:
+        app_logger_instance.warning("Notification %s raised %s" % (entry_id, e))
+        result = 1
+
+    with _outbox_lock:
+        if result != 1:
+            del _outbox_pending[entry_id]
+            record = {"event": "delivered", "id": entry_id, "delivered_at": time.time()}
 
-        if status_code in transient_statuses and attempt < max_attempts - 1:
-            app_logger_instance.warning(
-                "Transient HTTP status %s from %s, retrying (%d/%d)..." % (status_code, url, attempt + 1, max_attempts)
-            )
-            time.sleep(retry_delay_secs)
         else:
-            return status_code, content
+            entry["attempts"] += 1
 
-    return status_code, content
+            if entry["attempts"] >= outbox_max_attempts:
+                del _outbox_pending[entry_id]
+                record = {"event": "dropped", "id": entry_id}
+                app_logger_instance.warning(
+                    "Giving up on notification %s after %d attempts" % (entry_id, entry["attempts"])
+                )
 
+            else:
+                retry_mins = min(outbox_retry_mins * 2 ** (entry["attempts"] - 1), OUTBOX_MAX_RETRY_MINS)
+                entry["next_attempt_at"] = time.time() + retry_mins * 60
+                record = {
+                    "event": "failed",
+                    "id": entry_id,
+                    "attempts": entry["attempts"],
+                    "next_attempt_at": entry["next_attempt_at"],
+                }
+                app_logger_instance.info(
+                    "Notification %s failed (attempt %d), retrying in %d mins"
+                    % (entry_id, entry["attempts"], retry_mins)
+                )
 
-def http_client(**kwargs):
+        try:
+            _outbox_append(record)
 
-    parsed = _parse_http_kwargs(kwargs)
-    if parsed is None:
-        return 1, None, None
+        except OSError as e:
+            app_logger_instance.warning("Unable to write notification outbox %s: %s" % (outbox_file, e))
 
-    url = parsed["url"]
+    return result
 
-    # use a session instance to customize how "requests" handles making http requests
-    session = requests.Session()
 
-    # Default to verifying SSL certificates. Users behind proxies with custom CA bundles
-    # can set REQUESTS_CA_BUNDLE or SSL_CERT_FILE environment variables instead of disabling.
-    # Set verify_ssl = False in config.ini to disable verification entirely
-    # (only for environments with self-signed certs from SSL-inspection proxies).
-    effective_verify_ssl = kwargs.get("verify_ssl", globals().get("verify_ssl", True))
+def _due_outbox_entries():
+    """Return the ids of pending outbox entries whose next delivery attempt is due."""
+    now = time.time()
 
-    status_code = None
+    with _outbox_lock:
+        return [entry_id for entry_id, entry in _outbox_pending.items() if entry["next_attempt_at"] <= now]
+
+
+def _load_outbox():
+    """Load undelivered entries from outbox_file by replaying its records, then compact the file.
+
+    A line that cannot be parsed (a write cut short by a crash) is skipped.
+    """
+    if not outbox_file or not os.path.exists(outbox_file):
+        return
 
+    pending = {}
     try:
-        status_code, content = _execute_http_request(
-            session,
-            url,
-            parsed["user_agent"],
-            parsed["request_type"],
-            parsed["auth"],
-            parsed["additional_header"],
-            parsed["data_payload"],
-            parsed["json_payload"],
-            effective_verify_ssl,
+        with open(outbox_file, encoding="utf-8") as outbox:
+            for line in outbox:
+                try:
+                    record = json.loads(line)
+                    event = record.pop("event")
+                    entry_id = record["id"]
+
+                except (ValueError, KeyError, AttributeError):
+                    app_logger_instance.warning("Skipping unreadable line in notification outbox %s" % outbox_file)
+                    continue
+
+                if event == "queued":
+                    pending[entry_id] = record
+                elif event == "failed" and entry_id in pending:
+                    pending[entry_id].update(attempts=record["attempts"], next_attempt_at=record["next_attempt_at"])
+                elif event in ("delivered", "dropped"):
+                    pending.pop(entry_id, None)
+
+    except OSError as e:
+        app_logger_instance.warning("Unable to read notification outbox %s: %s" % (outbox_file, e))
+        return
+
+    with _outbox_lock:
+        _outbox_pending.clear()
+        _outbox_pending.update(pending)
+
+    if pending:
+        app_logger_instance.info("%d undelivered notifications in the outbox" % len(pending))
+
+    _compact_outbox()
+
+
+def _compact_outbox():
+    """Atomically rewrite outbox_file with only the still undelivered entries."""
+    if not outbox_file:
+        return
+
+    with _outbox_lock:
+        snapshot = "".join(
+            json.dumps(dict(entry, event="queued"), sort_keys=True) + "\n" for entry in _outbox_pending.values()
         )
-        _check_http_status(status_code, url, content)
 
-    except requests.exceptions.HTTPError as content:
-        # HTTP error already logged by _check_http_status
-        return 1, status_code, content
+        temp_file = "%s.tmp" % outbox_file
+        try:
+            with open(temp_file, "w", encoding="utf-8") as outbox:
+                outbox.write(snapshot)
+                outbox.flush()
+                os.fsync(outbox.fileno())
+            os.replace(temp_file, outbox_file)
 
-    except requests.exceptions.RequestException as content:
-        # All remaining requests exceptions (timeouts, connection errors, redirects)
-        app_logger_instance.warning("%s for URL %s with error %s" % (type(content).__name__, url, content))
-        return 1, status_code, content
+        except OSError as e:
+            app_logger_instance.warning("Unable to compact notification outbox %s: %s" % (outbox_file, e))
 
-    app_logger_instance.info("The status code %s indicates a successful request for %s" % (status_code, url))
-    return 0, status_code, content
 
+def _metric_key(name, labels):
+    return name, tuple(sorted((label, str(value)) for label, value in labels.items()))
 
-def github_create_release(current_version, target_repo_branch, target_repo_owner, target_repo_name, user_agent):
-    """Create a GitHub release via the REST API.
 
-    Sends JSON via requests json= kwarg which automatically sets
-    Content-Type: application/json (required by the GitHub API).
+def _metric_inc(name, amount=1, **labels):
+    """Add amount to a counter."""
+    key = _metric_key(name, labels)
 
-    Returns (return_code, status_code, content).
-    """
+    with _metrics_lock:
+        _metric_values[key] = _metric_values.get(key, 0) + amount
 
-    # remove illegal characters from version (github does not allow certain chars for release name)
-    current_version = re.sub(r":", r".", current_version)
 
-    app_logger_instance.info("Creating Release on GitHub for version %s..." % current_version)
+def _metric_set(name, value, **labels):
+    """Set a gauge."""
+    with _metrics_lock:
+        _metric_values[_metric_key(name, labels)] = value
 
-    github_tag_name = "%s-01" % current_version
-    github_release_name = "API/URL triggered release"
-    github_release_body = github_tag_name
+
+def _metric_observe(name, value, **labels):
+    """Record one observation in a histogram."""
+    key = _metric_key(name, labels)
+
+    with _metrics_lock:
+        histogram = _metric_values.setdefault(key, [0] * len(METRIC_LATENCY_BUCKETS) + [0.0, 0])
+        for index, bound in enumerate(METRIC_LATENCY_BUCKETS):
+            if value <= bound:
+                histogram[index] += 1
+        histogram[-2] += value
+        histogram[-1] += 1
+
+
+def _metric_labels(labels, **extra):
+    """Render a label set as {name="value",...}, escaped as the exposition format requires."""
+    labels = labels + tuple(extra.items())
+    if not labels:
+        return ""
+
+    def _escape(value):
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    return "{%s}" % ",".join('%s="%s"' % (name, _escape(value)) for name, value in labels)
+
+
+def _render_metrics():
+    """Return every metric recorded so far in the Prometheus text exposition format (version 0.0.4)."""
+    with _metrics_lock:
+        values = {key: list(value) if isinstance(value, list) else value for key, value in _metric_values.items()}
+
+    lines = []
+    for name, (metric_type, help_text) in METRICS.items():
+        series = sorted((labels, value) for (metric_name, labels), value in values.items() if metric_name == name)
+        if not series:
+            continue
+
+        lines.append("# HELP %s %s" % (name, help_text))
+        lines.append("# TYPE %s %s" % (name, metric_type))
+
+        for labels, value in series:
+            if metric_type != "histogram":
+                lines.append("%s%s %s" % (name, _metric_labels(labels), repr(float(value))))
+                continue
+
+            for bound, count in zip(METRIC_LATENCY_BUCKETS, value, strict=False):
+                lines.append("%s_bucket%s %d" % (name, _metric_labels(labels, le=repr(bound)), count))
+            lines.append("%s_bucket%s %d" % (name, _metric_labels(labels, le="+Inf"), value[-1]))
+            lines.append("%s_sum%s %s" % (name, _metric_labels(labels), repr(float(value[-2]))))
+            lines.append("%s_count%s %d" % (name, _metric_labels(labels), value[-1]))
+
+    return "\n".join(lines) + "\n"
+
+
+def _write_metrics_textfile():
+    """Atomically write the metrics to metrics_textfile, node_exporter must never read a half-written file."""
+    if not metrics_textfile:
+        return
+
+    temp_file = "%s.%d.tmp" % (metrics_textfile, os.getpid())
+    try:
+        with open(temp_file, "w", encoding="utf-8") as textfile:
+            textfile.write(_render_metrics())
+        os.replace(temp_file, metrics_textfile)
+
+    except OSError as e:
+        app_logger_instance.warning("Unable to write metrics textfile %s: %s" % (metrics_textfile, e))
+
+
+class _MetricsRequestHandler(http.server.BaseHTTPRequestHandler):
+    """Serve _render_metrics() on /metrics."""
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+
+        body = _render_metrics().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        app_logger_instance.debug("Metrics request from %s: %s" % (self.client_address[0], format % args))
+
+
+def _start_metrics_server(listen_address, listen_port):
+    """Serve /metrics on listen_address:listen_port from a daemon thread, returns the server."""
+    server = http.server.ThreadingHTTPServer((listen_address, listen_port), _MetricsRequestHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    app_logger_instance.info("Serving metrics on http://%s:%s/metrics" % server.server_address[:2])
+    return server
+
+
+def _start_run_report():
+    """Start collecting this run's report when reports are enabled."""
+    global _run_report
+
+    with _run_report_lock:
+        if run_report_dir and run_reports_keep:
+            _run_report = {"started_at": time.time(), "items": {}, "fetches": {}, "phases": {}}
+        else:
+            _run_report = None
+
+
+def _report_item(site_spec, **fields):
+    """Record fields of a site item's result in the run report."""
+    with _run_report_lock:
+        if _run_report is not None:
+            _run_report["items"].setdefault(site_spec, {}).update(fields)
+
+
+def _report_batched(site_specs):
+    """Mark the items among site_specs that have no fetch of their own as resolved by a batched request."""
+    with _run_report_lock:
+        if _run_report is not None:
+            for site_spec in site_specs:
+                if site_spec.fetch_key not in _run_report["fetches"]:
+                    _run_report["items"].setdefault(site_spec, {})["batched"] = True
+
+
+def _report_phase(phase, secs):
+    """Add secs to the time the run report shows for a phase."""
+    with _run_report_lock:
+        if _run_report is not None:
+            _run_report["phases"][phase] = _run_report["phases"].get(phase, 0.0) + secs
+
+
+def _report_request(status_code, content):
+    """Record one HTTP attempt for the fetch running in this thread, if it is being reported."""
+    requests_made = getattr(_report_context, "requests", None)
+    if requests_made is not None:
+        requests_made.append((status_code, len(content) if isinstance(content, (bytes, str)) else 0))
+
+
+@contextlib.contextmanager
+def _report_fetch(key):
+    """Record the latency, HTTP status and bytes of the requests made inside the block under key."""
+    if _run_report is None:
+        yield
+        return
+
+    _report_context.requests = requests_made = []
+    start_time = time.monotonic()
+    try:
+        yield
+
+    finally:
+        _report_context.requests = None
+        fetch = {
+            "fetch_secs": round(time.monotonic() - start_time, 3),
+            "requests": len(requests_made),
+            "http_status": requests_made[-1][0] if requests_made else None,
+            "bytes": sum(nbytes for _, nbytes in requests_made),
+        }
+        with _run_report_lock:
+            if _run_report is not None:
+                _run_report["fetches"][key] = fetch
+
+
+def _write_run_report(site_specs, run_secs, run_error=None):
+    """Write the finished run's report to run-<timestamp>.json and last_run.json, then prune old reports.
+
+    run_error is the exception a failed run ended with, recorded as "error".
+    """
+    global _run_report
+
+    with _run_report_lock:
+        report, _run_report = _run_report, None
+
+    if report is None:
+        return
+
+    items = []
+    for site_spec in site_specs:
+        # items resolved by a batched request have no fetch of their own, see "sources"; items skipped
+        # before fetching (config errors, down sites, deferrals) have neither
+        fetch = report["fetches"].get(site_spec.fetch_key, {})
+        items.append(
+            {
+                "source_site_name": site_spec.source_site_name,
+                "source_app_name": site_spec.source_app_name,
+                "source_repo_name": site_spec.source_repo_name,
+                "target_repo_name": site_spec.target_repo_name,
+                "action": site_spec.action,
+                **fetch,
+                **report["items"].get(site_spec, {}),
+            }
+        )
+
+    started_at = report["started_at"]
+    content = json.dumps(
+        {
+            "started_at": datetime.datetime.fromtimestamp(started_at, datetime.UTC).isoformat(),
+            "wall_secs": round(run_secs, 3),
+            "error": None if run_error is None else "%s: %s" % (type(run_error).__name__, run_error),
+            "phases_secs": {phase: round(secs, 3) for phase, secs in report["phases"].items()},
+            "sources": {key[1]: fetch for key, fetch in report["fetches"].items() if key[0] == "source"},
+            "items": items,
+        },
+        indent=1,
+    )
+
+    run_file = os.path.join(run_report_dir, "run-%s.json" % time.strftime("%Y%m%d-%H%M%S", time.localtime(started_at)))
+    try:
+        for report_file in (run_file, os.path.join(run_report_dir, "last_run.json")):
+            temp_file = "%s.tmp" % report_file
+            with open(temp_file, "w", encoding="utf-8") as json_file:
+                json_file.write(content)
+            os.replace(temp_file, report_file)
+
+        # the timestamp sorts run files oldest first
+        run_files = sorted(name for name in os.listdir(run_report_dir) if re.fullmatch(r"run-[\d-]+\.json", name))
+        for name in run_files[: max(len(run_files) - run_reports_keep, 0)]:
+            os.remove(os.path.join(run_report_dir, name))
+
+    except OSError as e:
+        app_logger_instance.warning("Unable to write run report to %s: %s" % (run_report_dir, e))
+
+
+def _parse_http_kwargs(kwargs):
+    """Validate and extract http_client arguments.
+
+    Returns a dict of parsed args, or None if a required argument is missing
+    or invalid (a warning is logged in that case).
+    """
+    if kwargs is None:
+        app_logger_instance.warning("No keyword args sent to function, exiting function...")
+        return None
+
+    url = kwargs.get("url")
+    if not url:
+        app_logger_instance.warning("No URL sent to function, exiting function...")
+        return None
+
+    user_agent = kwargs.get("user_agent")
+    if not user_agent:
+        app_logger_instance.warning("No User Agent sent to function, exiting function...")
+        return None
+
+    request_type = kwargs.get("request_type")
+    if request_type not in ("get", "put", "post"):
+        app_logger_instance.warning("Invalid or missing request type '%s', exiting function..." % request_type)
+        return None
+
+    return {
+        "url": url,
+        "user_agent": user_agent,
+        "request_type": request_type,
+        "auth": kwargs.get("auth"),
+        "additional_header": kwargs.get("additional_header"),
+        "data_payload": kwargs.get("data_payload"),
+        "json_payload": kwargs.get("json_payload"),
+    }
+
+
+def _check_http_status(status_code, url, content):
+    """Raise HTTPError for non-2xx responses, logging a specific message."""
+    if 200 <= status_code <= 299:
+        return
+
+    if status_code == 401:
+        message = "The status code %s indicates unauthorised access for %s, error is %s"
+    elif status_code == 404:
+        message = "The status code %s indicates the requested resource could not be found  for %s, error is %s"
+    elif status_code == 422:
+        message = (
+            "The status code %s indicates a request was well-formed but was unable "
+            "to be followed due to semantic errors for %s, error is %s"
+        )
+    else:
+        message = "The status code %s indicates an unexpected error for %s, error is %s"
+
+    app_logger_instance.warning(message % (status_code, url, content))
+    raise requests.exceptions.HTTPError(status_code, url, content)
+
+
+def _http_session_key(url):
+    """Return the "scheme://host" pool key for a URL."""
+    parsed_url = urllib.parse.urlsplit(url)
+    return "%s://%s" % (parsed_url.scheme.lower(), parsed_url.netloc.lower())
+
+
+def _new_http_session():
+    """Create a session whose connection pool is sized from the [http] config."""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=http_max_connections_per_host,
+        pool_block=http_block_when_pool_full,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _get_http_session(url):
+    """Return the pooled session for the URL's scheme and host, creating it on first use.
+
+    A session is recycled once it has served http_keepalive_max_requests requests or has been
+    idle for longer than http_keepalive_idle_secs, as servers silently drop long-idle
+    keep-alive connections and reusing them would surface as connection resets.
+    """
+    key = _http_session_key(url)
+    now = time.monotonic()
+
+    with _http_sessions_lock:
+        entry = _http_sessions.get(key)
+
+        if entry is not None:
+            expired = entry["requests"] >= http_keepalive_max_requests
+            idle = now - entry["last_used"] > http_keepalive_idle_secs
+            if expired or idle:
+                app_logger_instance.debug("Recycling pooled HTTP session for %s" % key)
+                entry["session"].close()
+                entry = None
+
+        if entry is None:
+            entry = {"session": _new_http_session(), "requests": 0, "last_used": now}
+            _http_sessions[key] = entry
+
+        entry["requests"] += 1
+        entry["last_used"] = now
+        return entry["session"]
+
+
+def _close_http_sessions():
+    """Close and forget every pooled HTTP session."""
+    with _http_sessions_lock:
+        for entry in _http_sessions.values():
+            entry["session"].close()
+        _http_sessions.clear()
+
+
+def _load_validator_cache():
+    """Load the persistent validator cache from validator_cache_file, if there is one."""
+    if not validator_cache_file or not os.path.exists(validator_cache_file):
+        return
+
+    try:
+        with open(validator_cache_file, encoding="utf-8") as cache_file:
+            cache = json.load(cache_file)
+
+    except (OSError, ValueError):
+        app_logger_instance.warning("Unable to read validator cache %s, starting empty" % validator_cache_file)
+        return
+
+    if isinstance(cache, dict):
+        with _validator_cache_lock:
+            _validator_cache.clear()
+            _validator_cache.update(cache)
+
+
+def _save_validator_cache():
+    """Atomically write the validator cache back to validator_cache_file if it has changed."""
+    global _validator_cache_dirty
+
+    if not validator_cache_file or not _validator_cache_dirty:
+        return
+
+    with _validator_cache_lock:
+        snapshot = json.dumps(_validator_cache, indent=1, sort_keys=True)
+        _validator_cache_dirty = False
+
+    temp_file = "%s.tmp" % validator_cache_file
+    try:
+        with open(temp_file, "w", encoding="utf-8") as cache_file:
+            cache_file.write(snapshot)
+        os.replace(temp_file, validator_cache_file)
+
+    except OSError as e:
+        app_logger_instance.warning("Unable to write validator cache %s: %s" % (validator_cache_file, e))
+
+
+def _conditional_headers(url):
+    """Return If-None-Match/If-Modified-Since headers for a URL with a cached version.
+
+    Validators are only sent when a parsed version is cached, otherwise a 304 would leave the
+    caller with nothing to return.
+    """
+    with _validator_cache_lock:
+        entry = _validator_cache.get(url)
+
+    if not entry or entry.get("version") is None:
+        return {}
+
+    headers = {}
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def _store_validators(url, response_headers):
+    """Record the ETag/Last-Modified validators from a full (non-304) response.
+
+    Any previously cached version is dropped, as it belongs to the old body; the caller stores
+    the newly parsed version with _cache_version().
+    """
+    global _validator_cache_dirty
+
+    etag = response_headers.get("ETag") if response_headers is not None else None
+    last_modified = response_headers.get("Last-Modified") if response_headers is not None else None
+    etag = etag if isinstance(etag, str) else None
+    last_modified = last_modified if isinstance(last_modified, str) else None
+
+    with _validator_cache_lock:
+        if etag or last_modified:
+            _validator_cache[url] = {"etag": etag, "last_modified": last_modified, "version": None}
+            _validator_cache_dirty = True
+        elif _validator_cache.pop(url, None) is not None:
+            _validator_cache_dirty = True
+
+
+def _cache_version(url, current_version):
+    """Remember the version parsed from the full response for url, for reuse on a later 304."""
+    global _validator_cache_dirty
+
+    with _validator_cache_lock:
+        entry = _validator_cache.get(url)
+        if entry is not None and entry.get("version") != current_version:
+            entry["version"] = current_version
+            _validator_cache_dirty = True
+
+
+def _cached_version(url):
+    """Return the version cached for url (used when the server answers 304), or None."""
+    with _validator_cache_lock:
+        entry = _validator_cache.get(url)
+        return entry.get("version") if entry else None
+
+
+def _github_rate_limit_resource(url):
+    """Return the GitHub rate-limit resource a URL draws from, or None for non-GitHub URLs."""
+    parsed_url = urllib.parse.urlsplit(url)
+    if parsed_url.netloc.lower() != "api.github.com":
+        return None
+    return "graphql" if parsed_url.path.rstrip("/") == "/graphql" else "core"
+
+
+def _github_rate_limit_wait(resource, priority):
+    """Return the seconds a request should wait before spending the GitHub budget for resource.
+
+    Low priority requests keep rate_limit_reserve requests back for high priority ones (release
+    creation), and are paced once the budget gets within twice the reserve so it lasts until reset.
+    """
+    reserve = _source_setting("github", "rate_limit_reserve") if priority == "low" else 0
+    now = time.time()
+
+    with _github_rate_limit_lock:
+        budget = dict(_github_rate_limit.get(resource) or {})
+
+    retry_after_until = budget.get("retry_after_until") or 0
+    if retry_after_until > now:
+        return retry_after_until - now
+
+    remaining = budget.get("remaining")
+    reset = budget.get("reset") or 0
+    if remaining is None or reset <= now:
+        return 0
+
+    if remaining <= reserve:
+        return reset - now
+
+    if priority == "low" and remaining <= reserve * 2:
+        return (reset - now) / (remaining - reserve)
+
+    return 0
+
+
+def _github_rate_limited(resource="core"):
+    """Return True while low priority GitHub requests for resource are being deferred."""
+    return _github_rate_limit_wait(resource, "low") > _source_setting("github", "rate_limit_max_wait_secs")
+
+
+def _github_rate_limit_acquire(resource, priority):
+    """Wait for GitHub budget before a request. Returns False if a low priority request is deferred.
+
+    Waits longer than rate_limit_max_wait_secs defer low priority requests outright; high priority
+    requests wait at most that long and then go ahead regardless.
+    """
+    wait_secs = _github_rate_limit_wait(resource, priority)
+    max_wait_secs = _source_setting("github", "rate_limit_max_wait_secs")
+
+    if wait_secs > max_wait_secs and priority == "low":
+        return False
+
+    if wait_secs > 0:
+        wait_secs = min(wait_secs, max_wait_secs)
+        app_logger_instance.info(
+            "Pacing GitHub '%s' request for %.1f seconds to stay within rate limit"
+            % (
+                resource,
+                wait_secs,
+            )
+        )
+        time.sleep(wait_secs)
+
+    with _github_rate_limit_lock:
+        budget = _github_rate_limit.get(resource)
+        # spend one request up front so concurrent workers do not all see the same last request
+        if budget and budget.get("remaining"):
+            budget["remaining"] -= 1
+
+    return True
+
+
+def _update_github_rate_limit(resource, status_code, response_headers, content):
+    """Record the GitHub budget reported by a response, and any Retry-After/secondary rate limit."""
+
+    def _header(name):
+        value = response_headers.get(name) if response_headers is not None else None
+        return value if isinstance(value, str) else None
+
+    def _header_int(name):
+        value = _header(name)
+        return int(value) if value is not None and value.isdigit() else None
+
+    resource = _header("X-RateLimit-Resource") or resource
+    remaining = _header_int("X-RateLimit-Remaining")
+
+    with _github_rate_limit_lock:
+        budget = _github_rate_limit.setdefault(resource, {})
+
+        if remaining is not None:
+            _metric_set("tdb_github_rate_limit_remaining", remaining, resource=resource)
+            budget["remaining"] = remaining
+            budget["limit"] = _header_int("X-RateLimit-Limit")
+            budget["reset"] = _header_int("X-RateLimit-Reset")
+
+        if status_code not in (403, 429):
+            return
+
+        retry_after = _header_int("Retry-After")
+        secondary = isinstance(content, bytes) and b"secondary rate limit" in content.lower()
+
+        if retry_after is not None or secondary or status_code == 429:
+            # GitHub asks for at least a minute between retries when no Retry-After is given
+            budget["retry_after_until"] = time.time() + (retry_after if retry_after is not None else 60)
+            app_logger_instance.warning(
+                "GitHub '%s' rate limit hit (status %s), holding requests for %s seconds"
+                % (resource, status_code, retry_after if retry_after is not None else 60)
+            )
+
+
+def _log_github_rate_limit():
+    """Log the remaining GitHub budget for every resource seen so far."""
+    with _github_rate_limit_lock:
+        budgets = {resource: dict(budget) for resource, budget in _github_rate_limit.items()}
+
+    for resource, budget in sorted(budgets.items()):
+        if budget.get("remaining") is None:
+            continue
+        reset = budget.get("reset")
+        reset_str = time.strftime("%H:%M:%S", time.localtime(reset)) if reset else "unknown"
+        app_logger_instance.info(
+            "GitHub '%s' rate limit remaining %s/%s, resets at %s"
+            % (resource, budget["remaining"], budget.get("limit"), reset_str)
+        )
+
+
+def _request_source(url, source_site_name=None):
+    """Return the source whose settings apply to a request, the named one or else the owner of url's host."""
+    return source_site_name or _SOURCE_HOSTS.get(urllib.parse.urlsplit(url).netloc, "default")
+
+
+def _retry_policy(url, source_site_name=None):
+    """Return (max_attempts, base_delay_secs, max_delay_secs) for the source of a request."""
+    source_site_name = _request_source(url, source_site_name)
+    return (
+        max(1, int(_source_setting(source_site_name, "max_attempts"))),
+        float(_source_setting(source_site_name, "base_delay_secs")),
+        float(_source_setting(source_site_name, "max_delay_secs")),
+    )
+
+
+def _request_timeouts(url, source_site_name=None):
+    """Return the (connect, read) timeouts in seconds for the source of a request."""
+    source_site_name = _request_source(url, source_site_name)
+    return (
+        float(_source_setting(source_site_name, "connect_timeout_secs")),
+        float(_source_setting(source_site_name, "read_timeout_secs")),
+    )
+
+
+def _run_time_left():
+    """Return the seconds left before the current run's deadline, or None if the run has no deadline."""
+    if _run_deadline is None:
+        return None
+    return _run_deadline - time.monotonic()
+
+
+def _run_deadline_reached():
+    time_left = _run_time_left()
+    return time_left is not None and time_left <= 0
+
+
+def _retry_after_secs(response_headers):
+    """Return the delay in seconds the server asked for, or None if it did not say.
+
+    Honors Retry-After in both its delta-seconds and HTTP-date forms, and GitHub's exhausted
+    primary rate limit (x-ratelimit-remaining of 0), which only reports the reset epoch.
+    """
+    if not response_headers:
+        return None
+
+    retry_after = response_headers.get("Retry-After")
+    if isinstance(retry_after, str) and retry_after.strip():
+        retry_after = retry_after.strip()
+        if retry_after.isdigit():
+            return float(retry_after)
+        retry_at = email.utils.parsedate_tz(retry_after)
+        if retry_at is None:
+            return None
+        return max(0.0, email.utils.mktime_tz(retry_at) - time.time())
+
+    remaining = response_headers.get("X-RateLimit-Remaining")
+    reset = response_headers.get("X-RateLimit-Reset")
+    if remaining == "0" and isinstance(reset, str) and reset.isdigit():
+        return max(0.0, int(reset) - time.time())
+
+    return None
+
+
+def _execute_http_request(
+    session,
+    url,
+    user_agent,
+    request_type,
+    auth,
+    additional_header,
+    data_payload,
+    json_payload,
+    verify_ssl,
+    retry=True,
+    idempotent=False,
+    idempotency_check=None,
+    source_site_name=None,
+    stream_reader=None,
+    deadline=True,
+):
+    """Build the request and execute it, retrying transient failures with jittered backoff.
+
+    GETs are retried on 429, transient 5xx, connection errors and timeouts, waiting for the
+    server's Retry-After when given and otherwise for an exponential delay with full jitter. A
+    POST/PUT is only retried when the caller marks it idempotent, or supplies idempotency_check:
+    a callable run before each retry that returns the final (status_code, content,
+    response_headers) if the earlier attempt turned out to have landed, else None. retry=False
+    sends a single attempt.
+
+    Timeouts and the retry policy come from the [sources] settings of source_site_name, or of the
+    source that owns url's host. Under a run deadline each attempt's timeouts are clamped to the time
+    left, and no retry is attempted once its delay would run past the deadline; deadline=False
+    exempts the request (notifications, which are delivered after the fetch).
+
+    stream_reader streams a 200 response body instead of loading it whole: it is called with the
+    response and returns the content to hand back (None if the body had to be abandoned).
+
+    Returns (status_code, content, response_headers).
+    """
+    connect_timeout, read_timeout = _request_timeouts(url, source_site_name)
+
+    requests_data_dict = {
+        "url": url,
+        "allow_redirects": True,
+        "verify": verify_ssl,
+    }
+
+    # headers and auth are passed per request so the pooled session is never mutated; a GitHub
+    # token set for one call must not leak into a later call to a third-party site.
+    headers = {"Accept-encoding": "gzip", "User-Agent": user_agent}
+
+    if additional_header:
+        headers.update(additional_header)
+
+    requests_data_dict["headers"] = headers
+
+    if auth:
+        requests_data_dict["auth"] = auth
+
+    if stream_reader is not None:
+        requests_data_dict["stream"] = True
+
+    if request_type in ("put", "post"):
+        if json_payload is not None:
+            # requests json= kwarg sets Content-Type: application/json
+            requests_data_dict.update({"json": json_payload})
+        else:
+            requests_data_dict.update({"data": data_payload})
+
+    request_method = getattr(session, request_type)
+
+    max_attempts, base_delay_secs, max_delay_secs = _retry_policy(url, source_site_name)
+    metric_source = _request_source(url, source_site_name)
+    retryable = retry and (request_type == "get" or idempotent or idempotency_check is not None)
+
+    # backoff's wait generators are primed with a first next() before they yield delays
+    delays = backoff.expo(factor=base_delay_secs, max_value=max_delay_secs)
+    next(delays)
+
+    attempt = 0
+    while True:
+        attempt += 1
+        retry_after = None
+        last_error = None
+
+        # never let a single attempt outlast the run deadline (a 1s floor still lets it connect)
+        time_left = _run_time_left() if deadline else None
+        if time_left is None:
+            requests_data_dict["timeout"] = (connect_timeout, read_timeout)
+        else:
+            time_left = max(time_left, 1.0)
+            requests_data_dict["timeout"] = (min(connect_timeout, time_left), min(read_timeout, time_left))
+
+        attempt_start_time = time.monotonic()
+        try:
+            response = request_method(**requests_data_dict)
+            status_code = response.status_code
+
+            # a streamed body is read here so a connection dropped mid-body is retried like any other
+            if stream_reader is not None and status_code == 200:
+                content = stream_reader(response)
+            else:
+                content = response.content
+        except (
+            requests.exceptions.ConnectionError,
+            requests.exceptions.Timeout,
+            requests.exceptions.ChunkedEncodingError,
+        ) as error:
+            _metric_observe(
+                "tdb_http_request_duration_seconds", time.monotonic() - attempt_start_time, source=metric_source
+            )
+            _metric_inc("tdb_http_requests_total", source=metric_source, code="error")
+            _report_request(None, None)
+            if not retryable or attempt >= max_attempts:
+                raise
+            reason = type(error).__name__
+            last_error = error
+        else:
+            response_headers = response.headers
+
+            _metric_observe(
+                "tdb_http_request_duration_seconds", time.monotonic() - attempt_start_time, source=metric_source
+            )
+            _metric_inc("tdb_http_requests_total", source=metric_source, code=status_code)
+            if isinstance(content, (bytes, str)):
+                _metric_inc("tdb_http_response_bytes_total", len(content), source=metric_source)
+            _report_request(status_code, content)
+
+            if not retryable or attempt >= max_attempts:
+                return status_code, content, response_headers
+
+            if status_code in _RETRY_STATUSES:
+                retry_after = _retry_after_secs(response_headers)
+            elif status_code == 403 and response_headers and isinstance(response_headers.get("Retry-After"), str):
+                retry_after = _retry_after_secs(response_headers)
+            else:
+                return status_code, content, response_headers
+
+            if retry_after is not None and retry_after > max_delay_secs:
+                app_logger_instance.warning(
+                    "HTTP status %s from %s asks to retry after %.0fs, longer than the %.0fs maximum delay, giving up"
+                    % (status_code, url, retry_after, max_delay_secs)
+                )
+                return status_code, content, response_headers
+
+            reason = "Transient HTTP status %s" % status_code
+
+        delay = retry_after if retry_after is not None else backoff.full_jitter(next(delays))
+
+        time_left = _run_time_left() if deadline else None
+        if time_left is not None and delay >= time_left:
+            app_logger_instance.warning("%s from %s, not retrying as the run deadline is reached" % (reason, url))
+            if last_error is not None:
+                raise last_error
+            return status_code, content, response_headers
+
+        app_logger_instance.warning(
+            "%s from %s, retrying in %.1fs (%d/%d)..." % (reason, url, delay, attempt, max_attempts)
+        )
+        _metric_inc("tdb_http_retries_total", source=metric_source)
+        time.sleep(delay)
+
+        # a POST may have been applied even though the response was lost, ask the caller first
+        if idempotency_check is not None:
+            result = idempotency_check()
+            if result is not None:
+                return result
+
+
+def _memo_key(parsed, kwargs):
+    """Return the run memo key of a GET: the URL plus who asked and for which representation.
+
+    The credentials are hashed so no token is kept in the memo. The Accept header (e.g. the GitHub
+    SHA media type), conditional validators (a 304 is only meaningful to a conditional caller) and
+    stream_reader (which trims the body) all change what a caller gets back, so they are keyed too.
+    """
+    headers = parsed["additional_header"] or {}
+    identity = hashlib.sha256(repr((parsed["auth"], headers.get("Authorization"))).encode("utf-8")).hexdigest()
+    variant = (headers.get("Accept"), bool(kwargs.get("conditional")), kwargs.get("stream_reader") is not None)
+    return ("http", parsed["request_type"], parsed["url"], identity[:16], variant)
+
+
+def _memoized(key, compute, keep=None):
+    """Return compute() at most once per run for key, other callers get (or wait for) the same result.
+
+    When keep(result) is false the result is only handed to callers already waiting for it, the entry
+    is then dropped so the next caller computes it again.
+    """
+    memo = _run_memo
+    if memo is None:
+        return compute()
+
+    kind = key[0]
+    with _run_memo_lock:
+        future = memo.get(key)
+        owner = future is None
+        if owner:
+            future = memo[key] = concurrent.futures.Future()
+        _run_memo_stats["%s_%s" % (kind, "misses" if owner else "hits")] += 1
+    _metric_inc("tdb_memo_misses_total" if owner else "tdb_memo_hits_total", kind=kind)
+
+    if not owner:
+        return future.result()
+
+    try:
+        result = compute()
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+
+    future.set_result(result)
+
+    if keep is not None and not keep(result):
+        with _run_memo_lock:
+            if memo.get(key) is future:
+                del memo[key]
+
+    return result
+
+
+def _memo_keep_response(result):
+    """Return whether an http_client result is small enough to keep in the run memo."""
+    content = result[2]
+    return not isinstance(content, (bytes, str)) or len(content) <= MEMO_MAX_BODY_BYTES
+
+
+def _forget_memoized(url_prefix):
+    """Drop memoized responses for URLs under url_prefix, after a change that makes them stale."""
+    memo = _run_memo
+    if memo is None:
+        return
+
+    with _run_memo_lock:
+        for key in [key for key in memo if key[0] == "http" and key[2].startswith(url_prefix)]:
+            del memo[key]
+
+
+def _log_run_memo_stats():
+    """Log how many requests and parsed results this run reused instead of fetching again."""
+    with _run_memo_lock:
+        stats = dict(_run_memo_stats)
+
+    app_logger_instance.info(
+        "Request memoization: %d HTTP hits, %d misses; parsed results %d hits, %d misses"
+        % (stats["http_hits"], stats["http_misses"], stats["fetch_hits"], stats["fetch_misses"])
+    )
+
+
+def http_client(**kwargs):
+
+    parsed = _parse_http_kwargs(kwargs)
+    if parsed is None:
+        return 1, None, None
+
+    # identical GETs within a run share one response, including one that is still in flight;
+    # memoize=False opts out for requests that must observe a change made earlier in the run; large
+    # and streamed bodies are not kept once the callers waiting on them have them
+    if parsed["request_type"] == "get" and kwargs.get("memoize", True):
+        keep = _memo_keep_response if kwargs.get("stream_reader") is None else (lambda result: False)
+        return _memoized(_memo_key(parsed, kwargs), lambda: _http_client(parsed, kwargs), keep)
+
+    return _http_client(parsed, kwargs)
+
+
+def _http_client(parsed, kwargs):
+    """Send one request parsed by _parse_http_kwargs, see http_client for the kwargs."""
+    url = parsed["url"]
+
+    # once the run deadline has passed only high priority requests (release creation for versions
+    # already fetched) are still sent, anything else waits for the next run; notifications pass
+    # deadline=False as the deadline only bounds fetching
+    if kwargs.get("priority", "low") != "high" and kwargs.get("deadline", True) and _run_deadline_reached():
+        app_logger_instance.warning("Run deadline reached, skipping request for %s until the next run" % url)
+        return 1, None, None
+
+    # every GitHub call draws on one shared budget, low priority calls are deferred when it runs low
+    github_resource = _github_rate_limit_resource(url)
+    if github_resource is not None and not _github_rate_limit_acquire(github_resource, kwargs.get("priority", "low")):
+        app_logger_instance.warning(
+            "GitHub '%s' rate limit budget low, deferring request for %s until it resets" % (github_resource, url)
+        )
+        return 1, None, None
+
+    # reuse the pooled session for this host so keep-alive connections survive between calls
+    session = _get_http_session(url)
+
+    # Default to verifying SSL certificates. Users behind proxies with custom CA bundles
+    # can set REQUESTS_CA_BUNDLE or SSL_CERT_FILE environment variables instead of disabling.
+    # Set verify_ssl = False in config.ini to disable verification entirely
+    # (only for environments with self-signed certs from SSL-inspection proxies).
+    effective_verify_ssl = kwargs.get("verify_ssl", globals().get("verify_ssl", True))
+
+    # conditional GETs send the stored ETag/Last-Modified validators for this URL, the caller then
+    # uses _cached_version() when the server answers 304 Not Modified
+    conditional = kwargs.get("conditional", False) and http_conditional_requests and parsed["request_type"] == "get"
+    additional_header = parsed["additional_header"]
+
+    if conditional:
+        additional_header = dict(additional_header or {})
+        additional_header.update(_conditional_headers(url))
+
+    # feed the outcome into the circuit breaker of the site this host belongs to (if any); check_site
+    # passes circuit=False and records its own probe result
+    site_name = _site_hosts.get(urllib.parse.urlsplit(url).netloc)
+    record_outcome = kwargs.get("circuit", True) and site_name is not None
+
+    status_code = None
+
+    try:
+        status_code, content, response_headers = _execute_http_request(
+            session,
+            url,
+            parsed["user_agent"],
+            parsed["request_type"],
+            parsed["auth"],
+            additional_header,
+            parsed["data_payload"],
+            parsed["json_payload"],
+            effective_verify_ssl,
+            retry=kwargs.get("retry", True),
+            idempotent=kwargs.get("idempotent", False),
+            idempotency_check=kwargs.get("idempotency_check"),
+            source_site_name=kwargs.get("source_site_name"),
+            stream_reader=kwargs.get("stream_reader"),
+            deadline=kwargs.get("deadline", True),
+        )
+
+        if github_resource is not None:
+            _update_github_rate_limit(github_resource, status_code, response_headers, content)
+
+        if conditional and status_code == 304:
+            _metric_inc("tdb_http_not_modified_total", source=_request_source(url, kwargs.get("source_site_name")))
+            app_logger_instance.info("The status code 304 indicates %s is unchanged since the last check" % url)
+            return 0, status_code, content
+
+        _check_http_status(status_code, url, content)
+
+    except requests.exceptions.HTTPError as content:
+        # HTTP error already logged by _check_http_status; only server-side errors mean the host is
+        # unhealthy, a 404 for one unknown package says nothing about the site as a whole
+        if record_outcome:
+            _record_site_outcome(site_name, url, status_code < 500 and status_code != 429)
+        return 1, status_code, content
+
+    except requests.exceptions.RequestException as content:
+        # All remaining requests exceptions (timeouts, connection errors, redirects)
+        app_logger_instance.warning("%s for URL %s with error %s" % (type(content).__name__, url, content))
+        if record_outcome:
+            _record_site_outcome(site_name, url, False)
+        return 1, status_code, content
+
+    if record_outcome:
+        _record_site_outcome(site_name, url, True)
+
+    # an abandoned streamed body was never parsed, so its validators must not vouch for a cached version
+    if conditional and content is not None:
+        _store_validators(url, response_headers)
+
+    app_logger_instance.info("The status code %s indicates a successful request for %s" % (status_code, url))
+    return 0, status_code, content
+
+
+def github_create_release(current_version, target_repo_branch, target_repo_owner, target_repo_name, user_agent):
+    """Create a GitHub release via the REST API.
+
+    Sends JSON via requests json= kwarg which automatically sets
+    Content-Type: application/json (required by the GitHub API).
+
+    Returns (return_code, status_code, content).
+    """
+
+    # remove illegal characters from version (github does not allow certain chars for release name)
+    current_version = re.sub(r":", r".", current_version)
+
+    app_logger_instance.info("Creating Release on GitHub for version %s..." % current_version)
+
+    github_tag_name = "%s-01" % current_version
+    github_release_name = "API/URL triggered release"
+    github_release_body = github_tag_name
     request_type = "post"
     http_url = "https://api.github.com/repos/%s/%s/releases" % (target_repo_owner, target_repo_name)
+
+    # The GraphQL resolver may already know the configured branch does not exist on the target
+    # repo, in which case go straight to the default branch instead of waiting for the 422 below.
+    target_commitish = target_repo_branch
+    target_info = _github_target_info.get((target_repo_owner, target_repo_name)) or {}
+    if target_info.get("branches", {}).get(target_repo_branch) is False:
+        app_logger_instance.info(
+            "Branch '%s' does not exist on '%s/%s', using the repo's default branch..."
+            % (target_repo_branch, target_repo_owner, target_repo_name)
+        )
+        target_commitish = ""
+
     # JSON dict sent via requests json= kwarg → Content-Type: application/json
     # (required by the GitHub API; data= without the header causes 422 errors)
     json_payload = {
         "tag_name": github_tag_name,
-        "target_commitish": target_repo_branch,
+        "target_commitish": target_commitish,
         "name": github_release_name,
         "body": github_release_body,
         "draft": False,
         "prerelease": False,
     }
 
-    # process post request
+    def release_exists():
+        """Before a retried POST, check whether the lost attempt already created the release."""
+        check_return_code, check_status_code, check_content = http_client(
+            url="https://api.github.com/repos/%s/%s/releases/tags/%s"
+            % (target_repo_owner, target_repo_name, urllib.parse.quote(github_tag_name, safe="")),
+            user_agent=user_agent,
+            additional_header={"Authorization": "token %s" % target_access_token},
+            request_type="get",
+            priority="high",
+            # asked again before each retry, a memoized answer would hide a release created meanwhile
+            memoize=False,
+        )
+        if check_return_code == 0 and check_status_code == 200:
+            app_logger_instance.info(
+                "Release '%s' already exists on '%s/%s', not posting it again"
+                % (github_tag_name, target_repo_owner, target_repo_name)
+            )
+            # report it as created so the caller records the version exactly as after a 201
+            return 201, check_content, None
+        return None
+
+    # process post request, only retried once release_exists() confirms the earlier attempt did not land
     return_code, status_code, content = http_client(
         url=http_url,
         user_agent=user_agent,
         additional_header={"Authorization": "token %s" % target_access_token},
         request_type=request_type,
         json_payload=json_payload,
+        priority="high",
+        idempotency_check=release_exists,
     )
 
     # GitHub returns a misleading 422 "tag_name is not a valid tag" when the
     # configured target_repo_branch does not exist on the target repo (e.g.
     # 'master' when the repo only has 'main'). Fall back to an empty
     # target_commitish, which GitHub auto-maps to the repo's default branch.
-    if return_code != 0 and status_code == 422:
+    if return_code != 0 and status_code == 422 and target_commitish:
         app_logger_instance.warning(
             "Release creation failed with 422 for branch '%s', "
             "retrying with the repo's default branch..." % target_repo_branch
@@ -533,8 +2297,17 @@ def github_create_release(current_version, target_repo_branch, target_repo_owner
             additional_header={"Authorization": "token %s" % target_access_token},
             request_type=request_type,
             json_payload=fallback_payload,
+            priority="high",
+            idempotency_check=release_exists,
         )
 
+    if status_code == 201:
+        _metric_inc("tdb_releases_created_total")
+
+        # the target repo now has a newer release, drop its cached publishedAt and responses for this run
+        _github_target_info.pop((target_repo_owner, target_repo_name), None)
+        _forget_memoized("https://api.github.com/repos/%s/%s/" % (target_repo_owner, target_repo_name))
+
     return return_code, status_code, content
 
 
@@ -546,47 +2319,142 @@ def check_site(**kwargs):
     site_name = kwargs.get("site_name")
     # Hours to wait before sending a "still down" reminder while a site remains degraded.
     # Prevents a flood of repeat emails across scheduler runs during a prolonged outage.
-    notification_cooldown_hours = kwargs.get("notification_cooldown_hours", 4)
+    notification_cooldown_hours = kwargs.get("notification_cooldown_hours", circuit_notification_cooldown_hours)
 
     request_type = "get"
 
-    # set number of retries and set default site_down boolean
-    retries = 10
-    sleep_secs = 60
-    site_down = True
+    # later fetches to this host feed the same circuit breaker as the probe
+    _site_hosts.setdefault(urllib.parse.urlsplit(url).netloc, site_name)
 
-    while True:
-        # Only send GitHub PAT to GitHub — not to third-party sites like GitLab, PyPI, AOR, or AUR.
-        if site_name.lower() == "github":
-            auth_header = {"Authorization": "token %s" % target_access_token}
-        else:
-            auth_header = None
+    # an open breaker skips the probe entirely, the site is retried once the breaker half-opens
+    if _circuit_state(site_name) == "open":
+        app_logger_instance.info(f"'{site_name}' circuit open, skipping health probe for '{url}'")
+        return True
 
-        # download json content
-        return_code, status_code, content = http_client(
-            url=url, user_agent=user_agent, additional_header=auth_header, request_type=request_type
-        )
+    # Only send GitHub PAT to GitHub — not to third-party sites like GitLab, PyPI, AOR, or AUR.
+    if site_name.lower() == "github":
+        auth_header = {"Authorization": "token %s" % target_access_token}
+    else:
+        auth_header = None
 
-        if return_code == 0:
-            site_down = False
-            app_logger_instance.debug(f"'{site_name}' site operational for '{url}'")
-            break
-        else:
-            app_logger_instance.info(
-                f"Having issues connecting to '{site_name}' for '{url}', retrying in '{sleep_secs}' seconds..."
-            )
-            time.sleep(sleep_secs)
-            retries = retries - 1
+    # a single probe with no retries, outcome recorded below so a failed probe opens the breaker straight away;
+    # high priority so a low GitHub budget or a passed run deadline is never mistaken for the site being down
+    return_code, status_code, content = http_client(
+        url=url,
+        user_agent=user_agent,
+        additional_header=auth_header,
+        request_type=request_type,
+        circuit=False,
+        retry=False,
+        priority="high",
+    )
+
+    site_down = return_code != 0
 
-        if retries <= 0:
-            app_logger_instance.warning(f"'{site_name}' site down for '{url}'")
-            break
+    if site_down:
+        app_logger_instance.warning(f"'{site_name}' site down for '{url}'")
+    else:
+        app_logger_instance.debug(f"'{site_name}' site operational for '{url}'")
 
-    _handle_site_state(site_name, url, site_down, notification_cooldown_hours)
+    _record_site_outcome(site_name, url, not site_down, notification_cooldown_hours, trip=True)
 
     return site_down
 
 
+def _circuit_state(site_name):
+    """Return the circuit breaker state for a site: "closed", "open" or "half_open".
+
+    An open breaker becomes half-open once circuit_open_mins have passed since it opened; one
+    request is then let through as a trial (see _circuit_admit), closing the breaker on success
+    or re-opening it on failure.
+    """
+    with _site_down_lock:
+        state = _site_down_state.get(site_name)
+
+        if not state or not state.get("is_down"):
+            return "closed"
+
+        opened_at = state.get("opened_at")
+
+    if opened_at is None:
+        return "half_open"
+
+    open_secs = (datetime.datetime.now(datetime.UTC) - opened_at).total_seconds()
+    return "half_open" if open_secs >= circuit_open_mins * 60 else "open"
+
+
+def _circuit_admit(site_name):
+    """Decide whether a fetch for the site may send requests now.
+
+    Returns False while its breaker is open, "trial" for the one caller a half-open breaker lets
+    through and True otherwise. Other callers wait for the trial to end and then follow the breaker
+    it leaves behind, so a recovering site sees one request rather than one per fetch worker. The
+    trial caller must call _circuit_trial_end once it is done.
+    """
+    with _site_down_condition:
+        while True:
+            state = _circuit_state(site_name)
+
+            if state != "half_open":
+                return state == "closed"
+
+            site_state = _site_down_state[site_name]
+            if not site_state.get("trial"):
+                site_state["trial"] = True
+                return "trial"
+
+            _site_down_condition.wait()
+
+
+def _circuit_trial_end(site_name):
+    """End the half-open trial admitted by _circuit_admit and wake the callers waiting on it.
+
+    A trial that recorded no outcome (a 304 or memoized response, or a request skipped for the
+    run deadline) leaves the breaker half-open, and the next caller becomes the trial.
+    """
+    with _site_down_condition:
+        site_state = _site_down_state.get(site_name)
+        if site_state:
+            site_state.pop("trial", None)
+        _site_down_condition.notify_all()
+
+
+def _record_site_outcome(site_name, url, success, notification_cooldown_hours=None, trip=False):
+    """Feed one request outcome for a site into its circuit breaker.
+
+    A success closes the breaker (sending a recovery email if it was open). A failure opens it
+    once circuit_failure_threshold consecutive failures are seen, immediately when trip is True
+    (health probes), or straight away again for a failed half-open trial.
+
+    Returns True if the breaker is open after recording the outcome.
+    """
+    if notification_cooldown_hours is None:
+        notification_cooldown_hours = circuit_notification_cooldown_hours
+
+    with _site_down_lock:
+        state = _site_down_state.get(site_name, {})
+
+        # without a preflight probe, the first real request to a site stands in for it
+        if site_name in _unprobed_sites:
+            _unprobed_sites.discard(site_name)
+            trip = True
+
+        if success:
+            if state.get("is_down") or state.get("failures"):
+                _handle_site_state(site_name, url, False, notification_cooldown_hours)
+            return False
+
+        failures = state.get("failures", 0) + 1
+
+        if trip or state.get("is_down") or failures >= circuit_failure_threshold:
+            _handle_site_state(site_name, url, True, notification_cooldown_hours)
+            _site_down_state[site_name].update({"failures": failures, "opened_at": datetime.datetime.now(datetime.UTC)})
+            return True
+
+        _site_down_state[site_name] = {"is_down": False, "notified_at": None, **state, "failures": failures}
+        return False
+
+
 def _handle_site_state(site_name, url, site_down, notification_cooldown_hours):
     """Send site_error/site_recovered notifications on state transitions.
 
@@ -600,8 +2468,12 @@ def _handle_site_state(site_name, url, site_down, notification_cooldown_hours):
     if not site_down:
         if was_down:
             recovery_msg = f"{site_name} site has recovered - '{url}'"
-            notification_email(
-                msg_type="site_recovered", error_msg=recovery_msg, source_site_name=site_name, source_site_url=url
+            _send_notification(
+                notification_email,
+                msg_type="site_recovered",
+                error_msg=recovery_msg,
+                source_site_name=site_name,
+                source_site_url=url,
             )
             app_logger_instance.info(recovery_msg)
         _site_down_state[site_name] = {"is_down": False, "notified_at": None}
@@ -610,7 +2482,13 @@ def _handle_site_state(site_name, url, site_down, notification_cooldown_hours):
     if not was_down:
         # Transition: UP → DOWN — send first-time alert and record state
         error_msg = f"{site_name} site down - '{url}'"
-        notification_email(msg_type="site_error", error_msg=error_msg, source_site_name=site_name, source_site_url=url)
+        _send_notification(
+            notification_email,
+            msg_type="site_error",
+            error_msg=error_msg,
+            source_site_name=site_name,
+            source_site_url=url,
+        )
         app_logger_instance.warning(error_msg)
         _site_down_state[site_name] = {"is_down": True, "notified_at": datetime.datetime.now(datetime.UTC)}
         return
@@ -621,7 +2499,13 @@ def _handle_site_state(site_name, url, site_down, notification_cooldown_hours):
 
     if hours_since_notif >= notification_cooldown_hours:
         error_msg = f"{site_name} site still down - '{url}' (ongoing issue, last notified {hours_since_notif:.1f}h ago)"
-        notification_email(msg_type="site_error", error_msg=error_msg, source_site_name=site_name, source_site_url=url)
+        _send_notification(
+            notification_email,
+            msg_type="site_error",
+            error_msg=error_msg,
+            source_site_name=site_name,
+            source_site_url=url,
+        )
         app_logger_instance.warning(error_msg)
         _site_down_state[site_name] = {"is_down": True, "notified_at": now}
     else:
@@ -631,59 +2515,241 @@ def _handle_site_state(site_name, url, site_down, notification_cooldown_hours):
         )
 
 
-def github_target_last_release_date(target_repo_owner, target_repo_name, user_agent):
+def github_target_last_release_date(target_repo_owner, target_repo_name, user_agent):
+
+    # already resolved for this run by the GraphQL batch resolver
+    published_at = (_github_target_info.get((target_repo_owner, target_repo_name)) or {}).get("published_at")
+    if published_at:
+        app_logger_instance.debug(
+            "Using last release date for '%s/%s' from GraphQL batch" % (target_repo_owner, target_repo_name)
+        )
+        return 0, published_at
+
+    github_query_type = "releases/latest"
+    json_query = "published_at"
+
+    # construct url to github rest api
+    url = "https://api.github.com/repos/%s/%s/%s" % (target_repo_owner, target_repo_name, github_query_type)
+    request_type = "get"
+
+    # download json content
+    return_code, status_code, content = http_client(
+        url=url,
+        user_agent=user_agent,
+        additional_header={"Authorization": "token %s" % target_access_token},
+        request_type=request_type,
+        priority="high",
+    )
+
+    if return_code == 0:
+        try:
+            content = json.loads(content)
+
+        except (ValueError, TypeError, KeyError):
+            app_logger_instance.info("Problem loading json from %s" % url)
+            return 1, None
+
+    else:
+        app_logger_instance.info("Problem downloading json content from %s" % url)
+        return 1, None
+
+    try:
+        # get release date from json
+        target_last_release_date = content["%s" % json_query]
+
+    except (IndexError, KeyError):
+        app_logger_instance.info("Problem parsing json from %s, skipping to next iteration..." % url)
+        return 1, None
+
+    # convert the following then compare against throttle days value "2020-04-15T21:53:20Z"
+    return 0, target_last_release_date
+
+
+def _github_query_mapping(source_query_type):
+    """Map a github source_query_type to (github_query_type, json_query).
+
+    Returns (None, None) for an unknown query type.
+    """
+    mapping = {
+        "tag": ("tags", "name"),
+        "pre-release": ("releases", "tag_name"),
+        "release": ("releases/latest", "tag_name"),
+        "branch": ("commits", "sha"),
+    }
+    return mapping.get((source_query_type or "").lower(), (None, None))
+
+
+def _github_rest_request(source_repo_name, source_app_name, source_query_type, source_branch_name):
+    """Return (url, accept) for the leanest REST request that resolves a github site item.
+
+    Only the newest entry of /tags and /releases is ever read and the API lists both newest first,
+    so per_page=1 asks for just that entry instead of the default page of 30 (releases carry full
+    notes and asset lists). A branch head comes from /commits/{branch} with the SHA media type,
+    which answers with the bare commit SHA instead of a page of commit objects.
+    """
+    github_query_type, _ = _github_query_mapping(source_query_type)
+    url = "https://api.github.com/repos/%s/%s" % (source_repo_name, source_app_name)
+
+    if github_query_type == "commits":
+        return "%s/commits/%s" % (
+            url,
+            urllib.parse.quote(source_branch_name or "", safe="/"),
+        ), "application/vnd.github.sha"
+
+    if github_query_type in ("tags", "releases"):
+        return "%s/%s?per_page=1" % (url, github_query_type), None
+
+    return "%s/%s" % (url, github_query_type), None
+
+
+def _github_source_site_url(source_repo_name, source_app_name, github_query_type, source_branch_name=None):
+    """Return the human-facing GitHub URL used in notifications for a github site item."""
+    source_site_url = "https://github.com/%s/%s/%s" % (source_repo_name, source_app_name, github_query_type)
+
+    if source_branch_name is not None:
+        source_site_url = "%s/%s" % (source_site_url, source_branch_name)
+
+    return source_site_url
+
+
+def _github_graphql_source_fields(source_query_type, source_branch_name):
+    """Return the GraphQL repository selection for a source query type, or None if unsupported.
+
+    Tags are deliberately not resolved here: the REST /tags ordering that github_apps relies on
+    has no GraphQL equivalent, and a different "latest tag" would trigger a spurious build.
+    """
+    if source_query_type == "release":
+        return "latestRelease { tagName }"
+
+    if source_query_type == "pre-release":
+        return "releases(first: 1, orderBy: {field: CREATED_AT, direction: DESC}) { nodes { tagName } }"
+
+    if source_query_type == "branch" and source_branch_name:
+        return "ref(qualifiedName: %s) { target { oid } }" % json.dumps("refs/heads/%s" % source_branch_name)
+
+    return None
+
+
+def _github_graphql_source_version(repository, source_query_type):
+    """Extract the version for a source query type from a GraphQL repository result."""
+    try:
+        if source_query_type == "release":
+            return repository["latestRelease"]["tagName"]
+
+        if source_query_type == "pre-release":
+            return repository["releases"]["nodes"][0]["tagName"]
+
+        return repository["ref"]["target"]["oid"]
+
+    except (IndexError, KeyError, TypeError):
+        return None
+
+
+def _github_graphql_query(aliases, user_agent):
+    """POST one aliased GraphQL query and return its data dict (possibly partial), or None."""
+    query = "query {\n%s\n}" % "\n".join(
+        "%s: repository(owner: %s, name: %s) { %s }" % (alias, json.dumps(owner), json.dumps(name), fields)
+        for alias, (owner, name, fields) in aliases.items()
+    )
+
+    return_code, status_code, content = http_client(
+        url=GITHUB_GRAPHQL_URL,
+        user_agent=user_agent,
+        additional_header={"Authorization": "bearer %s" % target_access_token},
+        request_type="post",
+        json_payload={"query": query},
+        # a GraphQL query only reads, so it is as safe to retry as a GET
+        idempotent=True,
+    )
+
+    if return_code != 0:
+        app_logger_instance.info("Problem downloading GraphQL content from %s" % GITHUB_GRAPHQL_URL)
+        return None
+
+    try:
+        response = json.loads(content)
+
+    except (ValueError, TypeError):
+        app_logger_instance.info("Problem loading json from %s" % GITHUB_GRAPHQL_URL)
+        return None
+
+    if not isinstance(response, dict):
+        return None
+
+    # errors for individual aliases (e.g. a renamed repo) still return data for the rest
+    for error in response.get("errors") or []:
+        app_logger_instance.info("GraphQL error from %s: %s" % (GITHUB_GRAPHQL_URL, error.get("message")))
+
+    return response.get("data") or None
 
-    github_query_type = "releases/latest"
-    json_query = "published_at"
 
-    # construct url to github rest api
-    url = "https://api.github.com/repos/%s/%s/%s" % (target_repo_owner, target_repo_name, github_query_type)
-    request_type = "get"
+def github_apps_batch(site_specs, target_repos, user_agent):
+    """Resolve many github site items (and target repo details) with aliased GraphQL queries.
 
-    # download json content
-    return_code, status_code, content = http_client(
-        url=url,
-        user_agent=user_agent,
-        additional_header={"Authorization": "token %s" % target_access_token},
-        request_type=request_type,
-    )
+    Each query covers up to GITHUB_GRAPHQL_BATCH_SIZE repositories, fetching the latest release,
+    newest (pre-)release or branch head for every source item, plus the last release date,
+    default branch and configured branch existence for every (owner, name, branch) target repo.
+    Target details are stored in _github_target_info for github_target_last_release_date and
+    github_create_release to use later in the run.
 
-    if return_code == 0:
-        try:
-            content = json.loads(content)
+    Returns a dict of SiteSpec.prefetch_key -> version for every item the query resolved;
+    anything missing (tags, errors, unknown repos) is left for the per-item REST fallback.
+    """
+    aliases = {}
+    item_keys = {}
 
-        except (ValueError, TypeError, KeyError):
-            app_logger_instance.info("Problem loading json from %s" % url)
-            return 1, None
+    for site_spec in site_specs:
+        item_key = site_spec.prefetch_key
+        _, source_repo_name, source_app_name, source_query_type, source_branch_name = item_key
+        fields = _github_graphql_source_fields(source_query_type, source_branch_name)
 
-    else:
-        app_logger_instance.info("Problem downloading json content from %s" % url)
-        return 1, None
+        if fields is None or item_key in item_keys.values():
+            continue
 
-    try:
-        # get release date from json
-        target_last_release_date = content["%s" % json_query]
+        alias = "s%d" % len(item_keys)
+        item_keys[alias] = item_key
+        aliases[alias] = (source_repo_name, source_app_name, fields)
 
-    except (IndexError, KeyError):
-        app_logger_instance.info("Problem parsing json from %s, skipping to next iteration..." % url)
-        return 1, None
+    target_keys = {}
+    for target_repo_owner, target_repo_name, target_repo_branch in target_repos:
+        alias = "t%d" % len(target_keys)
+        target_keys[alias] = (target_repo_owner, target_repo_name, target_repo_branch)
+        fields = "latestRelease { publishedAt } defaultBranchRef { name }"
+        if target_repo_branch:
+            fields += " ref(qualifiedName: %s) { name }" % json.dumps("refs/heads/%s" % target_repo_branch)
+        aliases[alias] = (target_repo_owner, target_repo_name, fields)
 
-    # convert the following then compare against throttle days value "2020-04-15T21:53:20Z"
-    return 0, target_last_release_date
+    versions = {}
+    alias_names = list(aliases)
 
+    for start in range(0, len(alias_names), GITHUB_GRAPHQL_BATCH_SIZE):
+        chunk = {alias: aliases[alias] for alias in alias_names[start : start + GITHUB_GRAPHQL_BATCH_SIZE]}
+        data = _github_graphql_query(chunk, user_agent)
 
-def _github_query_mapping(source_query_type):
-    """Map a github source_query_type to (github_query_type, json_query).
+        if data is None:
+            continue
 
-    Returns (None, None) for an unknown query type.
-    """
-    mapping = {
-        "tag": ("tags", "name"),
-        "pre-release": ("releases", "tag_name"),
-        "release": ("releases/latest", "tag_name"),
-        "branch": ("commits", "sha"),
-    }
-    return mapping.get((source_query_type or "").lower(), (None, None))
+        for alias, repository in data.items():
+            if repository is None:
+                continue
+
+            if alias in item_keys:
+                version = _github_graphql_source_version(repository, item_keys[alias][3])
+                if version is not None:
+                    versions[item_keys[alias]] = version
+
+            elif alias in target_keys:
+                target_repo_owner, target_repo_name, target_repo_branch = target_keys[alias]
+                target_info = _github_target_info.setdefault((target_repo_owner, target_repo_name), {"branches": {}})
+                target_info["published_at"] = (repository.get("latestRelease") or {}).get("publishedAt")
+                target_info["default_branch"] = (repository.get("defaultBranchRef") or {}).get("name")
+                if target_repo_branch:
+                    target_info["branches"][target_repo_branch] = repository.get("ref") is not None
+
+    app_logger_instance.debug(
+        "Resolved %d of %d GitHub items via GraphQL batch queries" % (len(versions), len(item_keys))
+    )
+    return versions
 
 
 def github_apps(source_app_name, source_query_type, source_repo_name, user_agent, source_branch_name):
@@ -698,14 +2764,14 @@ def github_apps(source_app_name, source_query_type, source_repo_name, user_agent
         return None, None
 
     # construct url for package details
-    source_site_url = "https://github.com/%s/%s/%s" % (source_repo_name, source_app_name, github_query_type)
+    source_site_url = _github_source_site_url(source_repo_name, source_app_name, github_query_type)
 
-    # construct url to github rest api
-    url = "https://api.github.com/repos/%s/%s/%s" % (source_repo_name, source_app_name, github_query_type)
+    # construct url to github rest api, requesting no more than the one entry we read
+    url, accept = _github_rest_request(source_repo_name, source_app_name, source_query_type, source_branch_name)
 
-    # if github branch then we specify the branch name via 'sha' parameter
-    if source_query_type.lower() == "branch":
-        url = "%s?sha=%s" % (url, source_branch_name)
+    additional_header = {"Authorization": "token %s" % target_access_token}
+    if accept is not None:
+        additional_header["Accept"] = accept
 
     request_type = "get"
 
@@ -713,24 +2779,48 @@ def github_apps(source_app_name, source_query_type, source_repo_name, user_agent
     return_code, status_code, content = http_client(
         url=url,
         user_agent=user_agent,
-        additional_header={"Authorization": "token %s" % target_access_token},
+        additional_header=additional_header,
         request_type=request_type,
+        conditional=True,
     )
 
-    if return_code == 0:
-        try:
-            content = json.loads(content)
+    if source_query_type.lower() == "branch":
+        branch_site_url = _github_source_site_url(
+            source_repo_name, source_app_name, github_query_type, source_branch_name
+        )
+    else:
+        branch_site_url = source_site_url
 
-        except (ValueError, TypeError, KeyError):
-            app_logger_instance.info("Problem loading json from %s" % url)
-            return None, source_site_url
+    # unchanged since the last check (304 responses do not count against the GitHub rate limit)
+    if return_code == 0 and status_code == 304:
+        return _cached_version(url), branch_site_url
 
-    else:
+    if return_code != 0:
         app_logger_instance.info("Problem downloading json content from %s" % url)
         return None, source_site_url
 
+    # the SHA media type returns the branch head as plain text rather than json
+    if github_query_type == "commits":
+        current_version = content.decode("utf-8", "replace") if isinstance(content, bytes) else str(content)
+        current_version = current_version.strip()
+
+        if not re.fullmatch(r"[0-9a-fA-F]{7,64}", current_version):
+            app_logger_instance.warning("Problem parsing commit sha from %s, skipping to next iteration..." % url)
+            return None, source_site_url
+
+        _cache_version(url, current_version)
+
+        return current_version, branch_site_url
+
+    try:
+        content = json.loads(content)
+
+    except (ValueError, TypeError, KeyError):
+        app_logger_instance.info("Problem loading json from %s" % url)
+        return None, source_site_url
+
     try:
-        # releases/latest returns a dict; tags/commits/releases return a list
+        # releases/latest returns a dict; tags/releases return a list
         if github_query_type == "releases/latest":
             current_version = content["%s" % json_query]
         else:
@@ -740,10 +2830,9 @@ def github_apps(source_app_name, source_query_type, source_repo_name, user_agent
         app_logger_instance.warning("Problem parsing json from %s, skipping to next iteration..." % url)
         return None, source_site_url
 
-    if source_query_type.lower() == "branch":
-        source_site_url = "%s/%s" % (source_site_url, source_branch_name)
+    _cache_version(url, current_version)
 
-    return current_version, source_site_url
+    return current_version, branch_site_url
 
 
 def gitlab_apps(
@@ -768,7 +2857,12 @@ def gitlab_apps(
         return None, source_site_url
 
     # download webpage content
-    return_code, status_code, content = http_client(url=url, user_agent=user_agent, request_type=request_type)
+    return_code, status_code, content = http_client(
+        url=url, user_agent=user_agent, request_type=request_type, conditional=True
+    )
+
+    if return_code == 0 and status_code == 304:
+        return _cached_version(url), source_site_url
 
     if return_code == 0:
         try:
@@ -791,9 +2885,96 @@ def gitlab_apps(
         app_logger_instance.info("Problem parsing json from %s, skipping to next iteration..." % url)
         return None, source_site_url
 
+    _cache_version(url, current_version)
+
     return current_version, source_site_url
 
 
+def _pypi_info_reader(url, max_response_bytes):
+    """Return a stream_reader that keeps only the leading "info" object of a PyPI JSON response.
+
+    The body is read in chunks until the "info" object decodes, then the connection is dropped and
+    {"info": ...} is returned as json. A document that does not start with "info" is read whole and
+    returned as is. Bodies growing past max_response_bytes are abandoned and None is returned.
+    """
+
+    def read(response):
+        buffer = bytearray()
+        decoder = codecs.getincrementaldecoder("utf-8")("ignore")
+        pieces = []
+        value_start = None
+        scanning = True
+        in_string = False
+        depth = skip = 0
+
+        for chunk in response.iter_content(chunk_size=65536):
+            buffer.extend(chunk)
+
+            if len(buffer) > max_response_bytes:
+                response.close()
+                app_logger_instance.warning(
+                    "Response from %s is larger than the %d byte maximum, abandoning it" % (url, max_response_bytes)
+                )
+                return None
+
+            if not scanning:
+                continue
+
+            # each chunk is decoded and scanned once, a multi-byte character split across chunks is
+            # held back by the decoder until the rest of it arrives
+            piece = decoder.decode(chunk)
+            pieces.append(piece)
+            pos = skip
+
+            if value_start is None:
+                text = "".join(pieces)
+                match = _PYPI_INFO_PREFIX.match(text)
+                # wait for the first character of the value, raw_decode does not skip whitespace
+                if match is None or match.end() == len(text):
+                    scanning = len(text) <= _PYPI_INFO_PREFIX_MAX_CHARS
+                    continue
+                piece = text
+                pieces = [text]
+                value_start = pos = match.end()
+
+            # track string and bracket nesting from where the last chunk left off, the "info" value
+            # is only decoded once its closing bracket has arrived
+            while True:
+                found = (_JSON_STRING_SPECIAL if in_string else _JSON_STRUCTURAL).search(piece, pos)
+                if found is None:
+                    skip = max(pos - len(piece), 0)
+                    break
+
+                char = found.group()
+                pos = found.end()
+                if char == "\\":
+                    pos += 1
+                elif char == '"':
+                    in_string = not in_string
+                elif char in "{[":
+                    depth += 1
+                else:
+                    depth -= 1
+                    if depth <= 0:
+                        break
+
+            if found is None:
+                continue
+
+            try:
+                info, _ = _json_decoder.raw_decode("".join(pieces), value_start)
+            except ValueError:
+                scanning = False
+                continue
+
+            response.close()
+            return json.dumps({"info": info}).encode("utf-8")
+
+        return bytes(buffer)
+
+    return read
+
+
 def pypi_apps(source_app_name, user_agent):
 
     # use pypi json to get python package version
@@ -803,8 +2984,18 @@ def pypi_apps(source_app_name, user_agent):
     # construct url for package details
     source_site_url = f"https://pypi.org/search/?q={source_app_name}"
 
-    # download webpage content
-    return_code, status_code, content = http_client(url=url, user_agent=user_agent, request_type=request_type)
+    # stream the json and stop once the leading "info" object is complete, the per-release file
+    # lists after it run to megabytes for packages with a long history
+    return_code, status_code, content = http_client(
+        url=url,
+        user_agent=user_agent,
+        request_type=request_type,
+        conditional=True,
+        stream_reader=_pypi_info_reader(url, int(_source_setting("pypi", "max_response_bytes"))),
+    )
+
+    if return_code == 0 and status_code == 304:
+        return _cached_version(url), source_site_url
 
     if return_code == 0:
         try:
@@ -826,79 +3017,569 @@ def pypi_apps(source_app_name, user_agent):
         app_logger_instance.info("Problem extracting version from json for %s, skipping to next iteration..." % url)
         return None, source_site_url
 
+    _cache_version(url, current_version)
+
     return current_version, source_site_url
 
 
+def _aor_source_site_url(source_app_name):
+    """Return the human-facing archlinux.org package search URL used in notifications."""
+    return f"https://archlinux.org/packages/?sort=&q={source_app_name}&maintainer=&flagged="
+
+
+def _aor_version(pkgver, pkgrel):
+    """Return an AOR version in the pkgver-pkgrel form recorded in results (the epoch is not included)."""
+    return "%s-%s" % (pkgver, pkgrel)
+
+
 def aor_apps(source_app_name, user_agent):
 
-    # use aor unofficial api to get app release info
-    url = "https://archlinux.org/packages/search/json/?q=%s" % source_app_name
+    # use aor unofficial api to get app release info, name= is an exact package name match (q= is a
+    # fuzzy search over names and descriptions that can return dozens of unrelated packages)
+    url = "https://archlinux.org/packages/search/json/?name=%s" % urllib.parse.quote(source_app_name, safe="")
     request_type = "get"
 
     # construct url for package details
-    source_site_url = f"https://archlinux.org/packages/?sort=&q={source_app_name}&maintainer=&flagged="
+    source_site_url = _aor_source_site_url(source_app_name)
 
     # download webpage content
-    return_code, status_code, content = http_client(url=url, user_agent=user_agent, request_type=request_type)
+    return_code, status_code, content = http_client(
+        url=url, user_agent=user_agent, request_type=request_type, conditional=True
+    )
 
     if return_code != 0:
         app_logger_instance.info("Problem downloading json content from %s" % url)
         return None, source_site_url
 
+    if status_code == 304:
+        return _cached_version(url), source_site_url
+
     try:
         # decode json
         content = json.loads(content)
 
-        # filter python objects with list comprehension to prevent fuzzy mismatch
+        # the same package is listed once per repo/architecture it is built for, use the first
         content = [x for x in content["results"] if x["pkgname"] == source_app_name]
 
-        # get package version and release number from json
-        pkgver = content[0]["pkgver"]
-        pkgrel = content[0]["pkgrel"]
-
-        # construct app version
-        current_version = "%s-%s" % (pkgver, pkgrel)
+        # construct app version from the package version and release number
+        current_version = _aor_version(content[0]["pkgver"], content[0]["pkgrel"])
 
     except (ValueError, TypeError, KeyError, IndexError):
         app_logger_instance.info("Problem loading or parsing json from %s, skipping to next iteration..." % url)
         return None, source_site_url
 
+    _cache_version(url, current_version)
+
     return current_version, source_site_url
 
 
+def _aor_sync_db_versions(content, source_app_names):
+    """Return {pkgname: version} for the wanted packages found in a pacman sync database.
+
+    A sync database is a (compressed) tar holding one <pkgname>-<pkgver>-<pkgrel>/desc file per
+    package, with %NAME% and %VERSION% sections. The epoch is dropped from %VERSION% to match the
+    pkgver-pkgrel form aor_apps records.
+    """
+    versions = {}
+
+    with tarfile.open(fileobj=io.BytesIO(content), mode="r:*") as sync_db:
+        for member in sync_db:
+            if not member.isfile() or not member.name.endswith("/desc"):
+                continue
+
+            # the directory name already carries the package name, skip unwanted packages unread
+            pkgname = member.name.rsplit("/", 1)[0].rsplit("-", 2)[0]
+            if pkgname not in source_app_names:
+                continue
+
+            sections = {}
+            section = None
+            for line in sync_db.extractfile(member).read().decode("utf-8", "replace").splitlines():
+                if line.startswith("%") and line.endswith("%"):
+                    section = line
+                elif line and section is not None and section not in sections:
+                    sections[section] = line
+
+            if sections.get("%NAME%") in source_app_names and "%VERSION%" in sections:
+                pkgver, pkgrel = sections["%VERSION%"].split(":", 1)[-1].rsplit("-", 1)
+                versions.setdefault(sections["%NAME%"], _aor_version(pkgver, pkgrel))
+
+    return versions
+
+
+def aor_apps_batch(source_app_names, user_agent):
+    """Resolve many AOR packages from the repo sync databases, returning {pkgname: version}.
+
+    Each configured repo's .db is downloaded from the mirror once per run (a conditional GET, so
+    an unchanged database costs a 304) and every wanted package is read from it. The versions of
+    the wanted packages are cached with the database's validators; packages not found, or not
+    cached on a 304, are left for aor_apps to look up one by one.
+    """
+    source_app_names = set(source_app_names)
+    mirror = _source_setting("aor", "sync_db_mirror").rstrip("/")
+    versions = {}
+
+    for repo in _source_setting("aor", "sync_db_repos"):
+        url = "%s/%s/os/x86_64/%s.db" % (mirror, repo, repo)
+
+        return_code, status_code, content = http_client(
+            url=url, user_agent=user_agent, request_type="get", conditional=True, source_site_name="aor"
+        )
+
+        if return_code != 0:
+            app_logger_instance.info("Problem downloading sync database from %s" % url)
+            continue
+
+        if status_code == 304:
+            repo_versions = _cached_version(url) or {}
+
+        else:
+            try:
+                repo_versions = _aor_sync_db_versions(content, source_app_names)
+            except (tarfile.TarError, OSError, EOFError, ValueError):
+                app_logger_instance.warning("Problem parsing sync database from %s" % url)
+                continue
+
+            _cache_version(url, repo_versions)
+
+        for source_app_name, version in repo_versions.items():
+            if source_app_name in source_app_names:
+                versions.setdefault(source_app_name, version)
+
+    app_logger_instance.info(
+        "Resolved %d of %d AOR packages from the sync databases" % (len(versions), len(source_app_names))
+    )
+    return versions
+
+
 def aur_apps(source_app_name, user_agent):
 
     # use aur api to get app release info
     url = "https://aur.archlinux.org/rpc/?v=5&type=info&arg[]=%s" % source_app_name
     request_type = "get"
 
-    # construct url for package details
-    source_site_url = "https://aur.archlinux.org/packages/%s/" % source_app_name
+    # construct url for package details
+    source_site_url = "https://aur.archlinux.org/packages/%s/" % source_app_name
+
+    # download webpage content
+    return_code, status_code, content = http_client(
+        url=url, user_agent=user_agent, request_type=request_type, conditional=True
+    )
+
+    if return_code == 0 and status_code == 304:
+        return _cached_version(url), source_site_url
+
+    if return_code == 0:
+        try:
+            content = json.loads(content)
+
+        except (ValueError, TypeError, KeyError):
+            app_logger_instance.info("Problem loading json from %s" % url)
+            return None, source_site_url
+
+    else:
+        app_logger_instance.info("Problem downloading json content from %s" % url)
+        return None, source_site_url
+
+    try:
+        # get app version from json
+        current_version = content["results"][0]["Version"]
+
+    except (IndexError, KeyError):
+        app_logger_instance.info("Problem parsing json from %s, skipping to next iteration..." % url)
+        return None, source_site_url
+
+    _cache_version(url, current_version)
+
+    return current_version, source_site_url
+
+
+# Upper bound on the length of a multi-arg AUR RPC URL. The AUR web server rejects overly long
+# request lines, so aur_apps_batch splits large package lists into several calls below this size.
+AUR_RPC_MAX_URL_LENGTH = 4000
+
+
+def _aur_batch_urls(source_app_names):
+    """Split package names into as few multi-arg AUR RPC info URLs as the URL length limit allows."""
+    base_url = "https://aur.archlinux.org/rpc/?v=5&type=info"
+    urls = []
+    url = base_url
+
+    for source_app_name in source_app_names:
+        arg = "&arg[]=%s" % urllib.parse.quote(source_app_name, safe="")
+
+        if url != base_url and len(url) + len(arg) > AUR_RPC_MAX_URL_LENGTH:
+            urls.append(url)
+            url = base_url
+
+        url += arg
+
+    if url != base_url:
+        urls.append(url)
+
+    return urls
+
+
+def aur_apps_batch(source_app_names, user_agent):
+    """Resolve the versions of many AUR packages with multi-arg RPC info calls.
+
+    The AUR RPC accepts any number of arg[] values in one info request, so a long site_list
+    resolves in one or two round-trips instead of one per package.
+
+    Returns a dict of package name -> version for every package the AUR returned. Packages
+    missing from the result (unknown name or a failed chunk) are left for aur_apps to fetch and
+    report individually.
+    """
+    versions = {}
+
+    # de-duplicate while keeping site_list order, the same package may feed several targets
+    source_app_names = list(dict.fromkeys(source_app_names))
+
+    for url in _aur_batch_urls(source_app_names):
+        return_code, status_code, content = http_client(url=url, user_agent=user_agent, request_type="get")
+
+        if return_code != 0:
+            app_logger_instance.info("Problem downloading json content from %s" % url)
+            continue
+
+        try:
+            for result in json.loads(content)["results"]:
+                versions[result["Name"]] = result["Version"]
+
+        except (ValueError, TypeError, KeyError):
+            app_logger_instance.info("Problem loading or parsing json from %s" % url)
+
+    app_logger_instance.debug(
+        "Resolved %d of %d AUR packages via batched RPC info calls" % (len(versions), len(source_app_names))
+    )
+    return versions
+
+
+class Source(abc.ABC):
+    """A site_list source, registered in _SOURCES under its source_site_name.
+
+    monitor_sites groups the items of a run by source and calls fetch_many once per source, so a
+    source is free to resolve its items in as few requests as its upstream allows. The default
+    fetch_many calls fetch_one for each item on a pool of the source's max_concurrency workers;
+    sources with a batch API override it and pass whatever they resolved to _fetch_each, which only
+    calls fetch_one for the rest. probe health-checks the source's site before a run.
+    """
+
+    name = None
+
+    def prepare(self, site_specs):
+        """Called with every item of the run before fetch_many, for sources that need more than their own."""
+
+    @abc.abstractmethod
+    def fetch_one(self, site_spec, user_agent):
+        """Return (current_version, source_site_url) for one item, current_version None on failure."""
+
+    def fetch_many(self, site_specs, user_agent):
+        """Return {site_spec: (current_version, source_site_url)} for every item in site_specs."""
+        return self._fetch_each(site_specs, user_agent)
+
+    def probe(self, user_agent):
+        """Health-check the source's site, returning True if it is down. Sources without a probe are never down."""
+        site_name, url = _SITE_PROBES.get(self.name, (None, None))
+        if url is None:
+            return False
+        return check_site(url=url, user_agent=user_agent, site_name=site_name)
+
+    def deferred(self):
+        """Return True if items should be left for a later run without a request."""
+        return False
+
+    def _fetch_each(self, site_specs, user_agent, prefetched_versions=None):
+        """Fetch every item not found in prefetched_versions (keyed by SiteSpec.prefetch_key) with fetch_one."""
+        results = {}
+        pending = []
+
+        for site_spec in site_specs:
+            prefetched_version = (prefetched_versions or {}).get(site_spec.prefetch_key)
+            if prefetched_version is not None:
+                results[site_spec] = (prefetched_version, site_spec.source_site_url)
+            else:
+                pending.append(site_spec)
+
+        if pending:
+            max_workers = min(_source_setting(self.name, "max_concurrency"), len(pending))
+            with concurrent.futures.ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="fetch-%s" % self.name
+            ) as executor:
+                results.update(zip(pending, executor.map(self._fetch_guarded, pending, [user_agent] * len(pending))))
+
+        return results
+
+    def _fetch_guarded(self, site_spec, user_agent):
+        with _fetch_slots or contextlib.nullcontext():
+            # out of time for this run, leave the item for the next one
+            if _run_deadline_reached():
+                return None, None
+            # the breaker may have opened mid-run from earlier failures, skip without a request
+            site_name = _site_name(self.name)
+            admitted = _circuit_admit(site_name)
+            if not admitted:
+                return None, None
+            try:
+                if self.deferred():
+                    return None, None
+                with _report_fetch(site_spec.fetch_key):
+                    return self.fetch_one(site_spec, user_agent)
+
+            finally:
+                if admitted == "trial":
+                    _circuit_trial_end(site_name)
+
+
+class GithubSource(Source):
+    """GitHub releases, tags and branch heads, batched through GraphQL once enough items are configured."""
+
+    name = "github"
+
+    def __init__(self):
+        self._target_repos = []
+
+    def prepare(self, site_specs):
+        # target repo details for the trigger items of every source ride along in the GraphQL batch
+        target_repo_owner = config_obj["general"]["target_repo_owner"]
+        self._target_repos = sorted(
+            {
+                (target_repo_owner, site_spec.target_repo_name, site_spec.target_repo_branch)
+                for site_spec in site_specs
+                if site_spec.action == "trigger"
+            }
+        )
+
+    def fetch_one(self, site_spec, user_agent):
+        return github_apps(
+            site_spec.source_app_name,
+            site_spec.source_query_type,
+            site_spec.source_repo_name,
+            user_agent,
+            site_spec.source_branch_name,
+        )
+
+    def fetch_many(self, site_specs, user_agent):
+        prefetched_versions = {}
+        graphql_min_items = _source_setting(self.name, "graphql_min_items")
+        if graphql_min_items and len(site_specs) >= graphql_min_items:
+            prefetched_versions = github_apps_batch(site_specs, self._target_repos, user_agent)
+        return self._fetch_each(site_specs, user_agent, prefetched_versions)
+
+    def deferred(self):
+        # GitHub budget exhausted, defer the item to a later run instead of failing it
+        return _github_rate_limited()
+
+
+class GitlabSource(Source):
+    name = "gitlab"
+
+    def fetch_one(self, site_spec, user_agent):
+        return gitlab_apps(
+            site_spec.source_app_name,
+            site_spec.source_repo_name,
+            site_spec.source_project_id,
+            site_spec.source_branch_name,
+            site_spec.source_query_type,
+            user_agent,
+        )
+
+
+class PypiSource(Source):
+    name = "pypi"
+
+    def fetch_one(self, site_spec, user_agent):
+        return pypi_apps(site_spec.source_app_name, user_agent)
+
+
+class AorSource(Source):
+    """Arch Linux official repositories, batched through the repo sync databases when sync_db is enabled."""
+
+    name = "aor"
+
+    def fetch_one(self, site_spec, user_agent):
+        return aor_apps(site_spec.source_app_name, user_agent)
+
+    def fetch_many(self, site_specs, user_agent):
+        prefetched_versions = {}
+        if _source_setting(self.name, "sync_db"):
+            source_app_names = {site_spec.source_app_name for site_spec in site_specs}
+            for source_app_name, version in aor_apps_batch(source_app_names, user_agent).items():
+                prefetched_versions[("aor", source_app_name)] = version
+        return self._fetch_each(site_specs, user_agent, prefetched_versions)
+
+
+class AurSource(Source):
+    """Arch User Repository, batched through multi-package RPC info calls."""
+
+    name = "aur"
+
+    def fetch_one(self, site_spec, user_agent):
+        return aur_apps(site_spec.source_app_name, user_agent)
+
+    def fetch_many(self, site_specs, user_agent):
+        source_app_names = [site_spec.source_app_name for site_spec in site_specs]
+        prefetched_versions = {
+            ("aur", source_app_name): version
+            for source_app_name, version in aur_apps_batch(source_app_names, user_agent).items()
+        }
+        return self._fetch_each(site_specs, user_agent, prefetched_versions)
+
+
+class RegexSource(Source):
+    """Minecraft server downloads, scraped per app."""
+
+    name = "regex"
+
+    def fetch_one(self, site_spec, user_agent):
+        return _fetch_regex_version(
+            site_spec.source_app_name, site_spec.source_site_name, site_spec.source_repo_name, None, user_agent
+        )
+
+
+# Source registry keyed by source_site_name; site_list items naming any other source are skipped as
+# unknown. Add a source with register_source before site_list is compiled.
+_SOURCES: dict = {}
+
+
+def register_source(source):
+    """Register a Source instance under its name, replacing any source already registered there."""
+    _SOURCES[source.name] = source
+    return source
+
+
+for _source_class in (GithubSource, GitlabSource, PypiSource, AorSource, AurSource, RegexSource):
+    register_source(_source_class())
+
+# Run-wide cap on in-flight item fetches across every source, set to fetch_workers by _fetch_site_versions.
+_fetch_slots = None
+
+
+@dataclasses.dataclass(frozen=True, slots=True, eq=False)
+class SiteSpec:
+    """One site_list item compiled for monitor_sites, built once by _compile_site_spec.
+
+    Holds the item's settings with the query type lower-cased, the keys it is stored, de-duplicated
+    and batch-resolved under, its notification URL where that does not depend on the response, and
+    its registered Source. site_item is the config section itself, still used for the grace-period and
+    trigger datetimes written back to config.ini. Compared by identity, so specs can key dicts.
+    """
+
+    site_item: dict
+    source_site_name: str | None
+    source_app_name: str | None
+    source_repo_name: str | None
+    source_branch_name: str | None
+    source_project_id: str | None
+    source_query_type: str
+    target_repo_name: str | None
+    target_repo_branch: str | None
+    target_release_days: int | None
+    grace_period_mins: int | None
+    action: str | None
+    site_key: str
+    state_key: tuple
+    current_version_key: str
+    previous_version_key: str
+    fetch_key: tuple
+    prefetch_key: tuple | None
+    source_site_url: str | None
+    source: Source | None
+
+
+def _compile_site_spec(site_item):
+    """Build the SiteSpec for one site_list item."""
+    source_site_name = site_item.get("source_site_name")
+    source_app_name = site_item.get("source_app_name")
+    source_repo_name = site_item.get("source_repo_name")
+    source_branch_name = site_item.get("source_branch_name")
+    # Normalise to empty string so a missing source_query_type is handled
+    # as "invalid" by the site functions instead of crashing on .lower().
+    source_query_type = (site_item.get("source_query_type") or "").lower()
+    target_repo_name = site_item.get("target_repo_name")
+    grace_period_mins = site_item.get("grace_period_mins")
+
+    # if grace period not defined then set to default value (required for aor)
+    if source_site_name == "aor" and grace_period_mins is None:
+        grace_period_mins = 60
+
+    # items resolved by a batched lookup are returned with a URL known up front
+    prefetch_key = source_site_url = None
+    if source_site_name == "github":
+        prefetch_key = ("github", source_repo_name, source_app_name, source_query_type, source_branch_name)
+        github_query_type, _ = _github_query_mapping(source_query_type)
+        source_site_url = _github_source_site_url(
+            source_repo_name,
+            source_app_name,
+            github_query_type,
+            source_branch_name if source_query_type == "branch" else None,
+        )
+    elif source_site_name == "aor":
+        prefetch_key = ("aor", source_app_name)
+        source_site_url = _aor_source_site_url(source_app_name)
+    elif source_site_name == "aur":
+        prefetch_key = ("aur", source_app_name)
+        source_site_url = "https://aur.archlinux.org/packages/%s/" % source_app_name
+
+    state_key = (source_site_name, source_app_name, target_repo_name)
+
+    return SiteSpec(
+        site_item=site_item,
+        source_site_name=source_site_name,
+        source_app_name=source_app_name,
+        source_repo_name=source_repo_name,
+        source_branch_name=source_branch_name,
+        source_project_id=site_item.get("source_project_id"),
+        source_query_type=source_query_type,
+        target_repo_name=target_repo_name,
+        target_repo_branch=site_item.get("target_repo_branch"),
+        target_release_days=site_item.get("target_release_days"),
+        grace_period_mins=grace_period_mins,
+        action=site_item.get("action"),
+        site_key=f"{source_site_name}:{source_app_name}",
+        state_key=state_key,
+        current_version_key="%s_%s_%s_current_version" % state_key,
+        previous_version_key="%s_%s_%s_previous_version" % state_key,
+        # items monitoring the same upstream (e.g. one package feeding several target repos) share one fetch
+        fetch_key=(
+            source_site_name,
+            source_repo_name,
+            source_app_name,
+            source_query_type,
+            source_branch_name,
+            site_item.get("source_project_id"),
+        ),
+        prefetch_key=prefetch_key,
+        source_site_url=source_site_url,
+        source=_SOURCES.get(source_site_name),
+    )
+
 
-    # download webpage content
-    return_code, status_code, content = http_client(url=url, user_agent=user_agent, request_type=request_type)
+def _config_site_list():
+    """Return site_list from config.ini, or an empty list when it is not a list."""
+    site_list = config_obj["monitor_sites"]["site_list"]
 
-    if return_code == 0:
-        try:
-            content = json.loads(content)
+    # Defensive: a legacy or malformed config may leave site_list as a plain
+    # string (the old configspec default was a quoted string). Treat it as an
+    # empty list rather than iterating string characters and crashing.
+    if not isinstance(site_list, list):
+        app_logger_instance.warning(
+            "site_list in config.ini is not a list (got %s), no sites to monitor" % type(site_list).__name__
+        )
+        return []
 
-        except (ValueError, TypeError, KeyError):
-            app_logger_instance.info("Problem loading json from %s" % url)
-            return None, source_site_url
+    return site_list
 
-    else:
-        app_logger_instance.info("Problem downloading json content from %s" % url)
-        return None, source_site_url
 
-    try:
-        # get app version from json
-        current_version = content["results"][0]["Version"]
+def _site_specs(site_list):
+    """Return the SiteSpecs for site_list, compiling them only when site_list is not the one compiled last."""
+    global _compiled_site_list, _compiled_site_specs
 
-    except (IndexError, KeyError):
-        app_logger_instance.info("Problem parsing json from %s, skipping to next iteration..." % url)
-        return None, source_site_url
+    if site_list is not _compiled_site_list:
+        _compiled_site_specs = tuple(_compile_site_spec(site_item) for site_item in site_list)
+        _compiled_site_list = site_list
 
-    return current_version, source_site_url
+    return _compiled_site_specs
 
 
 APP_DOWN_COUNTER_MAX = 3  # max consecutive failed-app-detection emails before suppressing
@@ -930,7 +3611,8 @@ def _handle_app_fetch(current_version, site_key, source_site_name, source_app_na
         )
 
         if _app_down_counters[site_key] <= APP_DOWN_COUNTER_MAX:
-            notification_email(
+            _send_notification(
+                notification_email,
                 msg_type="app_error",
                 error_msg=error_msg,
                 source_site_name=source_site_name,
@@ -963,7 +3645,8 @@ def _notify_app_error(site_key, source_site_name, source_app_name, source_repo_n
     _app_down_counters[site_key] = _app_down_counters.get(site_key, 0) + 1
 
     if _app_down_counters[site_key] <= APP_DOWN_COUNTER_MAX:
-        notification_email(
+        _send_notification(
+            notification_email,
             msg_type="app_error",
             error_msg=error_msg,
             source_site_name=source_site_name,
@@ -981,20 +3664,11 @@ def _notify_app_error(site_key, source_site_name, source_app_name, source_repo_n
 
 
 def _handle_version_change(
-    site_item,
-    source_site_name,
-    source_app_name,
-    source_repo_name,
+    site_spec,
     source_site_url,
-    target_repo_name,
-    target_repo_branch,
     target_repo_owner,
-    action,
     current_version,
     previous_version,
-    grace_period_mins,
-    target_release_days,
-    source_version_change_datetime,
     user_agent_chrome,
 ):
     """Handle a detected version change for one app.
@@ -1003,46 +3677,34 @@ def _handle_version_change(
     notify action, then sends the notification and updates config. Returns True
     if the caller should skip the remainder of the current site iteration.
     """
-    if action == "trigger":
-        if _trigger_release(
-            site_item,
-            source_site_name,
-            source_app_name,
-            target_repo_name,
-            target_repo_branch,
-            target_repo_owner,
-            current_version,
-            previous_version,
-            grace_period_mins,
-            target_release_days,
-            source_version_change_datetime,
-            user_agent_chrome,
-        ):
+    if site_spec.action == "trigger":
+        if _trigger_release(site_spec, target_repo_owner, current_version, previous_version, user_agent_chrome):
             return True
 
-    elif action == "notify":
+    elif site_spec.action == "notify":
         app_logger_instance.info(
             "Previous version %s and current version %s are different" % (previous_version, current_version)
         )
 
-    app_logger_instance.debug("Writing current version %s to config.ini" % current_version)
-    config_obj["results"]["%s_%s_%s_previous_version" % (source_site_name, source_app_name, target_repo_name)] = (
-        current_version
-    )
-    config_obj.write()
-
-    notification_email(
-        action=action,
-        source_app_name=source_app_name,
-        source_repo_name=source_repo_name,
-        source_site_name=source_site_name,
+    app_logger_instance.debug("Writing current version %s to state" % current_version)
+    _record_previous_version(site_spec, current_version, site_spec.action)
+    _report_item(site_spec, result="triggered" if site_spec.action == "trigger" else "notified")
+    # make the trigger/notify record durable before notifying, a crash must not repeat the action
+    _flush_state()
+
+    _send_notification(
+        notification_email,
+        action=site_spec.action,
+        source_app_name=site_spec.source_app_name,
+        source_repo_name=site_spec.source_repo_name,
+        source_site_name=site_spec.source_site_name,
         source_site_url=source_site_url,
-        target_repo_name=target_repo_name,
+        target_repo_name=site_spec.target_repo_name,
         previous_version=previous_version,
         current_version=current_version,
     )
 
-    notification_kodi(action, source_app_name, current_version)
+    _send_notification(notification_kodi, site_spec.action, site_spec.source_app_name, current_version)
 
     return False
 
@@ -1061,8 +3723,9 @@ def _throttle_by_grace_period(
 
     if source_version_change_datetime is None:
         app_logger_instance.debug("Trigger datetime not defined in config.ini, creating from current datetime")
-        site_item["source_version_change_datetime"] = current_datetime_str
-        config_obj.write()
+        with _state_lock:
+            site_item["source_version_change_datetime"] = current_datetime_str
+            _mark_state_dirty()
         return True
 
     source_version_change_datetime_object = datetime.datetime.strptime(
@@ -1118,50 +3781,54 @@ def _throttle_by_release_days(
     return False
 
 
-def _trigger_release(
-    site_item,
-    source_site_name,
-    source_app_name,
-    target_repo_name,
-    target_repo_branch,
-    target_repo_owner,
-    current_version,
-    previous_version,
-    grace_period_mins,
-    target_release_days,
-    source_version_change_datetime,
-    user_agent_chrome,
-):
+def _target_repo_lock(target_repo_owner, target_repo_name):
+    """Return the lock serialising releases for one target repo, created on first use."""
+    with _target_repo_locks_lock:
+        return _target_repo_locks.setdefault((target_repo_owner, target_repo_name), threading.Lock())
+
+
+def _trigger_release(site_spec, target_repo_owner, current_version, previous_version, user_agent_chrome):
     """Create the GitHub release for a detected version change.
 
     Applies grace-period and release-days throttling first. Returns True if the
     caller should skip the remainder of the current site iteration.
     """
+    site_item = site_spec.site_item
+    target_repo_name = site_spec.target_repo_name
+    source_version_change_datetime = site_item.get("source_version_change_datetime")
     current_datetime_object = datetime.datetime.now()
     current_datetime_str = current_datetime_object.strftime("%Y-%m-%d %H:%M:%S")
 
     if _throttle_by_grace_period(
         site_item,
-        source_app_name,
-        grace_period_mins,
+        site_spec.source_app_name,
+        site_spec.grace_period_mins,
         source_version_change_datetime,
         current_datetime_object,
         current_datetime_str,
     ):
+        _report_item(site_spec, result="throttled", throttle="grace_period")
         return True
 
-    if _throttle_by_release_days(
-        target_repo_owner, target_repo_name, user_agent_chrome, target_release_days, current_datetime_object
-    ):
-        return True
+    # another item feeding the same target must see this release before its own release-days check
+    with _target_repo_lock(target_repo_owner, target_repo_name):
+        if _throttle_by_release_days(
+            target_repo_owner,
+            target_repo_name,
+            user_agent_chrome,
+            site_spec.target_release_days,
+            current_datetime_object,
+        ):
+            _report_item(site_spec, result="throttled", throttle="release_days")
+            return True
 
-    app_logger_instance.info(
-        "Previous version %s and current version %s are different, "
-        "triggering a docker hub build (via github tag)..." % (previous_version, current_version)
-    )
-    return_code, status_code, content = github_create_release(
-        current_version, target_repo_branch, target_repo_owner, target_repo_name, user_agent_chrome
-    )
+        app_logger_instance.info(
+            "Previous version %s and current version %s are different, "
+            "triggering a docker hub build (via github tag)..." % (previous_version, current_version)
+        )
+        return_code, status_code, content = github_create_release(
+            current_version, site_spec.target_repo_branch, target_repo_owner, target_repo_name, user_agent_chrome
+        )
 
     if status_code == 201:
         app_logger_instance.info(
@@ -1179,26 +3846,27 @@ def _trigger_release(
                     "overwriting current version and skipping to next iteration..."
                     % (target_repo_owner, target_repo_name)
                 )
-                app_logger_instance.debug("Writing current version %s to config.ini" % current_version)
-                config_obj["results"][
-                    "%s_%s_%s_previous_version" % (source_site_name, source_app_name, target_repo_name)
-                ] = current_version
-                config_obj.write()
+                app_logger_instance.debug("Writing current version %s to state" % current_version)
+                _record_previous_version(site_spec, current_version, "already_exists")
+                _report_item(site_spec, result="already_exists")
         except AttributeError:
             app_logger_instance.warning(
                 "Problem creating GitHub release due to unknown error for '%s/%s', "
                 "skipping to next iteration..." % (target_repo_owner, target_repo_name)
             )
+            _report_item(site_spec, result="release_failed")
         return True
 
     if source_version_change_datetime is not None:
         app_logger_instance.debug("Deleting 'source_version_change_datetime', used next time version change occurs")
-        del site_item["source_version_change_datetime"]
-        config_obj.write()
+        with _state_lock:
+            del site_item["source_version_change_datetime"]
+            _mark_state_dirty()
 
     app_logger_instance.debug("Creating 'target_trigger_datetime', used to track when trigger of docker build happened")
-    site_item["target_trigger_datetime"] = current_datetime_str
-    config_obj.write()
+    with _state_lock:
+        site_item["target_trigger_datetime"] = current_datetime_str
+        _mark_state_dirty()
 
     return False
 
@@ -1225,9 +3893,12 @@ def _fetch_bedrock_version(source_site_name, source_app_name, source_repo_name,
     """Fetch the bedrock server version from the Mojang download-links API."""
     bedrock_unofficial_api = "https://net-secondary.web.minecraft-services.net/api/v1.0/download/links"
     return_code, status_code, content = http_client(
-        url=bedrock_unofficial_api, user_agent=user_agent_chrome, request_type="get"
+        url=bedrock_unofficial_api, user_agent=user_agent_chrome, request_type="get", conditional=True
     )
 
+    if return_code == 0 and status_code == 304 and _cached_version(bedrock_unofficial_api) is not None:
+        return _cached_version(bedrock_unofficial_api), source_site_url
+
     if return_code != 0:
         _notify_app_error(
             f"regex:{source_app_name}",
@@ -1254,6 +3925,7 @@ def _fetch_bedrock_version(source_site_name, source_app_name, source_repo_name,
         if not version_match:
             raise ValueError("Could not extract version from download URL")
 
+        _cache_version(bedrock_unofficial_api, version_match.group(1))
         return version_match.group(1), source_site_url
 
     except (json.JSONDecodeError, KeyError, ValueError) as e:
@@ -1272,9 +3944,12 @@ def _fetch_minecraftserver_version(source_site_name, source_app_name, source_rep
     """Fetch the Java edition server version from the Mojang version manifest."""
     source_site_url = "https://launchermeta.mojang.com/mc/game/version_manifest.json"
     return_code, status_code, content = http_client(
-        url=source_site_url, user_agent=user_agent_chrome, request_type="get"
+        url=source_site_url, user_agent=user_agent_chrome, request_type="get", conditional=True
     )
 
+    if return_code == 0 and status_code == 304 and _cached_version(source_site_url) is not None:
+        return _cached_version(source_site_url), source_site_url
+
     if return_code != 0:
         _notify_app_error(
             f"regex:{source_app_name}",
@@ -1288,6 +3963,7 @@ def _fetch_minecraftserver_version(source_site_name, source_app_name, source_rep
 
     try:
         current_version = json.loads(content)["latest"]["release"]
+        _cache_version(source_site_url, current_version)
         return current_version, source_site_url
 
     except (json.JSONDecodeError, ValueError, IndexError, KeyError):
@@ -1302,284 +3978,432 @@ def _fetch_minecraftserver_version(source_site_name, source_app_name, source_rep
         return None, source_site_url
 
 
-def monitor_sites():
+def _source_setting(source_site_name, key):
+    """Return a per-source setting from [sources] in config.ini, falling back to the built-in default."""
+    configured = source_settings.get(source_site_name) or {}
+    if key in configured:
+        return configured[key]
+    return _SOURCE_DEFAULTS.get(source_site_name, _SOURCE_DEFAULTS["default"])[key]
 
-    # read sites list from config
-    config_site_list = config_obj["monitor_sites"]["site_list"]
 
-    # Defensive: a legacy or malformed config may leave site_list as a plain
-    # string (the old configspec default was a quoted string). Treat it as an
-    # empty list rather than iterating string characters and crashing.
-    if not isinstance(config_site_list, list):
+def _site_name(source_site_name):
+    """Return the site name used for breaker state and notifications of a source_site_name."""
+    return _SITE_PROBES.get(source_site_name, (source_site_name, None))[0]
+
+
+def _probe_sites(source_site_names, user_agent_chrome):
+    """Health-check the given sources concurrently, returning {source_site_name: site_down}.
+
+    Only sources that appear in site_list are probed. With preflight_checks disabled no probe is
+    sent: sites are reported down only if their breaker is already open, and the first real
+    request to each site then decides its health.
+    """
+    sources = [
+        source
+        for source_site_name, source in _SOURCES.items()
+        if source_site_name in source_site_names and source_site_name in _SITE_PROBES
+    ]
+
+    if not sources:
+        return {}
+
+    if not preflight_checks:
+        app_logger_instance.info("Preflight checks disabled, inferring site health from the first request")
+        _unprobed_sites.update(_site_name(source.name) for source in sources)
+        return {source.name: _circuit_state(_site_name(source.name)) == "open" for source in sources}
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(sources), thread_name_prefix="probe") as executor:
+        futures = {source.name: executor.submit(source.probe, user_agent_chrome) for source in sources}
+        return {source_site_name: future.result() for source_site_name, future in futures.items()}
+
+
+def _skip_site_item(site_spec, site_down):
+    """Return True if a site item must be skipped before fetching its version.
+
+    Sends a config_error notification when a trigger item has no target branch, and skips
+    items whose site is marked down or whose source_site_name is unknown.
+    """
+    if site_spec.action != "notify":
+        # if target branch not defined then send email notification and skip to next item
+        if site_spec.target_repo_branch is None:
+            msg_type = "config_error"
+            error_msg = (
+                "Target repo branch not defined for target repo '%s', skipping to next iteration..."
+                % site_spec.target_repo_name
+            )
+            _send_notification(
+                notification_email,
+                msg_type=msg_type,
+                error_msg=error_msg,
+                source_site_name=site_spec.source_site_name,
+                source_repo_name=site_spec.source_repo_name,
+                source_app_name=site_spec.source_app_name,
+                source_site_url=None,
+            )
+            app_logger_instance.warning(error_msg)
+            _report_item(site_spec, result="config_error")
+            return True
+
+    if site_spec.source is None:
         app_logger_instance.warning(
-            "site_list in config.ini is not a list (got %s), no sites to monitor" % type(config_site_list).__name__
+            "Source site name %s unknown, skipping to next iteration..." % site_spec.source_site_name
         )
-        config_site_list = []
-
-    target_repo_owner = config_obj["general"]["target_repo_owner"]
+        _report_item(site_spec, result="unknown_source")
+        return True
 
-    # pretend to be windows 10 running chrome (required for minecraft bedrock)
-    user_agent_chrome = (
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
-        "(KHTML, like Gecko) Chrome/113.0.0.0 Safari/537.36"
-    )
+    if site_down.get(site_spec.source_site_name):
+        app_logger_instance.warning(
+            "Site '%s' marked as down, skipping processing for application '%s'..."
+            % (site_spec.source_site_name, site_spec.source_app_name)
+        )
+        _report_item(site_spec, result="site_down")
+        return True
 
-    # check github api is operational
-    url = "https://api.github.com"
+    return False
 
-    site_down_github = check_site(url=url, user_agent=user_agent_chrome, site_name="GitHub")
 
-    # check gitlab rest api is operational
-    url = "https://gitlab.com/api/v4/projects"
+def _iter_site_versions(site_specs, user_agent_chrome):
+    """Fetch the current version for every site item, calling each source's fetch_many once.
 
-    site_down_gitlab = check_site(url=url, user_agent=user_agent_chrome, site_name="GitLab")
+    Items monitoring the same upstream (e.g. one package feeding several target repos) are fetched
+    once. Sources run concurrently, each item fetch is capped by its source's max_concurrency and
+    fetch_workers caps the fetches in flight across all sources.
 
-    # check pypi website is operational
-    test_package = "requests"
-    url = f"https://pypi.org/pypi/{test_package}/json"
+    Yields (site_spec, (current_version, source_site_url)) for every item, each source's items as
+    soon as its fetch_many returns.
+    """
+    global _fetch_slots
 
-    site_down_pypi = check_site(url=url, user_agent=user_agent_chrome, site_name="PyPi")
+    if not site_specs:
+        return
 
-    # check aor site is operational
-    test_package = "base"
-    url = f"https://archlinux.org/packages/core/any/{test_package}/"
+    same_fetch_site_specs = {}
+    for site_spec in site_specs:
+        same_fetch_site_specs.setdefault(site_spec.fetch_key, []).append(site_spec)
 
-    site_down_aor = check_site(url=url, user_agent=user_agent_chrome, site_name="AOR")
+    with _run_memo_lock:
+        _run_memo_stats["fetch_misses"] += len(same_fetch_site_specs)
+        _run_memo_stats["fetch_hits"] += len(site_specs) - len(same_fetch_site_specs)
 
-    # check aur site is operational
-    test_package = "yay"
-    url = f"https://aur.archlinux.org/rpc/?v=5&type=info&arg[]={test_package}"
+    source_site_specs = {}
+    for fetch_site_specs in same_fetch_site_specs.values():
+        source_site_specs.setdefault(fetch_site_specs[0].source, []).append(fetch_site_specs[0])
 
-    site_down_aur = check_site(url=url, user_agent=user_agent_chrome, site_name="AUR")
+    for source in source_site_specs:
+        source.prepare(site_specs)
 
-    # set counter for number of failures to get app package details
-    # These are module-level dicts (_app_down_counters) so they persist across scheduler runs.
-    # Counters are keyed by "site_name:app_name" so a success for one app does not reset the
-    # counter for a different app on the same site that is still failing.
+    _fetch_slots = threading.BoundedSemaphore(fetch_workers)
 
-    # loop over each site and check previous and current result
-    for site_item in config_site_list:
-        source_site_name = site_item.get("source_site_name")
-        source_app_name = site_item.get("source_app_name")
-        source_repo_name = site_item.get("source_repo_name")
-        source_project_id = site_item.get("source_project_id")
-        source_branch_name = site_item.get("source_branch_name")
-        target_release_days = site_item.get("target_release_days")
-        target_repo_name = site_item.get("target_repo_name")
-        target_repo_branch = site_item.get("target_repo_branch")
-        # Normalise to empty string so a missing source_query_type is handled
-        # as "invalid" by the site functions instead of crashing on .lower().
-        source_query_type = site_item.get("source_query_type") or ""
-        grace_period_mins = site_item.get("grace_period_mins")
-        source_version_change_datetime = site_item.get("source_version_change_datetime")
-        action = site_item.get("action")
-
-        # set default values in case they are not supplied
-        source_site_url = None
-
-        app_logger_instance.info("-------------------------------------")
-        app_logger_instance.info("Processing started for application %s..." % source_app_name)
-
-        if action != "notify":
-            # if target branch not defined then send email notification and skip to next item
-            if target_repo_branch is None:
-                msg_type = "config_error"
-                error_msg = (
-                    "Target repo branch not defined for target repo '%s', skipping to next iteration..."
-                    % target_repo_name
-                )
-                notification_email(
-                    msg_type=msg_type,
-                    error_msg=error_msg,
-                    source_site_name=source_site_name,
-                    source_repo_name=source_repo_name,
-                    source_app_name=source_app_name,
-                    source_site_url=source_site_url,
-                )
-                app_logger_instance.warning(error_msg)
-                continue
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=len(source_site_specs), thread_name_prefix="source"
+    ) as executor:
+        futures = [
+            executor.submit(_fetch_source, source, source_specs, user_agent_chrome)
+            for source, source_specs in source_site_specs.items()
+        ]
+        for future in concurrent.futures.as_completed(futures):
+            for fetched_site_spec, fetch_result in future.result().items():
+                for site_spec in same_fetch_site_specs[fetched_site_spec.fetch_key]:
+                    yield site_spec, fetch_result
 
-        if source_site_name == "github":
-            if site_down_github:
-                app_logger_instance.warning(
-                    "Site '%s' marked as down, skipping processing for application '%s'..."
-                    % (source_site_name, source_app_name)
-                )
-                continue
 
-            current_version, source_site_url = github_apps(
-                source_app_name, source_query_type, source_repo_name, user_agent_chrome, source_branch_name
-            )
+def _fetch_source(source, site_specs, user_agent_chrome):
+    """Call source.fetch_many, reporting the requests it makes itself (batched lookups) under the source."""
+    with _report_fetch(("source", source.name)):
+        results = source.fetch_many(site_specs, user_agent_chrome)
 
-            if not _handle_app_fetch(
-                current_version,
-                f"github:{source_app_name}",
-                source_site_name,
-                source_app_name,
-                source_repo_name,
-                source_site_url,
-            ):
-                continue
+    # a version found without a fetch of its own came from the source's batched lookups
+    _report_batched(site_spec for site_spec, (current_version, _) in results.items() if current_version is not None)
+    return results
 
-        elif source_site_name == "gitlab":
-            if site_down_gitlab:
-                app_logger_instance.warning(
-                    "Site '%s' marked as down, skipping processing for application '%s'..."
-                    % (source_site_name, source_app_name)
-                )
-                continue
 
-            current_version, source_site_url = gitlab_apps(
-                source_app_name,
-                source_repo_name,
-                source_project_id,
-                source_branch_name,
-                source_query_type,
-                user_agent_chrome,
-            )
+def _fetch_site_versions(site_specs, user_agent_chrome):
+    """Fetch the current version for every site item, see _iter_site_versions.
 
-            if not _handle_app_fetch(
-                current_version,
-                f"gitlab:{source_app_name}",
-                source_site_name,
-                source_app_name,
-                source_repo_name,
-                source_site_url,
-            ):
-                continue
+    Returns a list of (current_version, source_site_url) in site_specs order.
+    """
+    fetch_results = dict(_iter_site_versions(site_specs, user_agent_chrome))
+    return [fetch_results[site_spec] for site_spec in site_specs]
 
-        elif source_site_name == "pypi":
-            if site_down_pypi:
-                app_logger_instance.warning(
-                    "Site '%s' marked as down, skipping processing for application '%s'..."
-                    % (source_site_name, source_app_name)
-                )
-                continue
 
-            current_version, source_site_url = pypi_apps(source_app_name, user_agent_chrome)
+def _compare_site_version(site_spec, current_version, source_site_url):
+    """Compare a fetched version with the stored state, recording the current (and first seen) version.
 
-            if not _handle_app_fetch(
-                current_version,
-                f"pypi:{source_app_name}",
-                source_site_name,
-                source_app_name,
-                source_repo_name,
-                source_site_url,
-            ):
-                continue
+    Returns the previous version when it differs from current_version and the change needs acting
+    on, otherwise None (unchanged, first run, deferred or failed, any app_error already sent).
+    """
+    source_site_name = site_spec.source_site_name
+    source_app_name = site_spec.source_app_name
 
-        elif source_site_name == "aor":
-            if site_down_aor:
-                app_logger_instance.warning(
-                    "Site '%s' marked as down, skipping processing for application '%s'..."
-                    % (source_site_name, source_app_name)
-                )
-                continue
+    app_logger_instance.info("-------------------------------------")
+    app_logger_instance.info("Processing started for application %s..." % source_app_name)
 
-            # if grace period not defined then set to default value (required for aor)
-            if grace_period_mins is None:
-                grace_period_mins = 60
+    _report_item(site_spec, url=source_site_url, current_version=current_version)
 
-            current_version, source_site_url = aor_apps(source_app_name, user_agent_chrome)
+    if current_version is None and _circuit_state(_site_name(source_site_name)) == "open":
+        # the site went down during this run, the breaker has already sent the site_error email
+        app_logger_instance.warning(
+            "Site '%s' marked as down, skipping processing for application '%s'..."
+            % (source_site_name, source_app_name)
+        )
+        _report_item(site_spec, result="site_down")
+        return None
 
-            if not _handle_app_fetch(
-                current_version,
-                f"aor:{source_app_name}",
-                source_site_name,
-                source_app_name,
-                source_repo_name,
-                source_site_url,
-            ):
-                continue
+    if current_version is None and _run_deadline_reached():
+        # not an app failure, the run simply ran out of time before fetching it
+        app_logger_instance.warning(
+            "Run deadline reached, deferring application '%s' to the next run" % source_app_name
+        )
+        _report_item(site_spec, result="deferred")
+        return None
 
-        elif source_site_name == "aur":
-            if site_down_aur:
-                app_logger_instance.warning(
-                    "Site '%s' marked as down, skipping processing for application '%s'..."
-                    % (source_site_name, source_app_name)
-                )
-                continue
+    if current_version is None and source_site_name == "github" and _github_rate_limited():
+        # not an app failure, the item is fetched again once the GitHub budget resets
+        app_logger_instance.warning(
+            "GitHub rate limit budget low, deferring application '%s' to a later run" % source_app_name
+        )
+        _report_item(site_spec, result="deferred")
+        return None
 
-            current_version, source_site_url = aur_apps(source_app_name, user_agent_chrome)
+    if source_site_name == "regex":
+        if current_version is None:
+            _report_item(site_spec, result="fetch_failed")
+            return None
 
-            if not _handle_app_fetch(
-                current_version,
-                f"aur:{source_app_name}",
-                source_site_name,
-                source_app_name,
-                source_repo_name,
-                source_site_url,
-            ):
-                continue
+        # Successful regex fetch — reset this app's failure counter
+        _app_down_counters.pop(site_spec.site_key, None)
 
-        elif source_site_name == "regex":
-            current_version, source_site_url = _fetch_regex_version(
-                source_app_name, source_site_name, source_repo_name, source_site_url, user_agent_chrome
-            )
+    elif not _handle_app_fetch(
+        current_version,
+        site_spec.site_key,
+        source_site_name,
+        source_app_name,
+        site_spec.source_repo_name,
+        source_site_url,
+    ):
+        _report_item(site_spec, result="fetch_failed")
+        return None
 
-            if current_version is None:
-                continue
+    # write value for current match to state
+    _record_current_version(site_spec, current_version)
 
-            # Successful regex fetch — reset this app's failure counter
-            _app_down_counters.pop(f"regex:{source_app_name}", None)
+    # read value from previous match from state
+    previous_version = _get_previous_version(site_spec)
 
-        else:
-            app_logger_instance.warning("Source site name %s unknown, skipping to next iteration..." % source_site_name)
-            continue
+    if previous_version is None:
+        app_logger_instance.info("No known previous version for app %s, assuming first run" % source_app_name)
+        app_logger_instance.info(
+            "Setting previous version to current version %s and going to next iteration" % current_version
+        )
+        _record_previous_version(site_spec, current_version, "first_seen")
+        _report_item(site_spec, result="first_seen")
+        return None
 
-        # write value for current match to config
-        config_obj["results"]["%s_%s_%s_current_version" % (source_site_name, source_app_name, target_repo_name)] = (
-            current_version
+    if previous_version == current_version:
+        app_logger_instance.info(
+            "Previous version %s and current version %s match, nothing to do" % (previous_version, current_version)
         )
-        config_obj.write()
+        app_logger_instance.info("Processing finished for application %s" % source_app_name)
+        _report_item(site_spec, result="unchanged", previous_version=previous_version)
+        return None
 
-        try:
-            # read value from previous match from config
-            previous_version = config_obj["results"][
-                "%s_%s_%s_previous_version" % (source_site_name, source_app_name, target_repo_name)
-            ]
+    _report_item(site_spec, result="changed", previous_version=previous_version)
+    return previous_version
 
-        except KeyError:
-            app_logger_instance.info("No known previous version for app %s, assuming first run" % source_app_name)
-            app_logger_instance.info(
-                "Setting previous version to current version %s and going to next iteration" % current_version
-            )
-            config_obj["results"][
-                "%s_%s_%s_previous_version" % (source_site_name, source_app_name, target_repo_name)
-            ] = current_version
-            config_obj.write()
-            continue
 
-        if previous_version != current_version:
-            if _handle_version_change(
-                site_item,
-                source_site_name,
-                source_app_name,
-                source_repo_name,
-                source_site_url,
-                target_repo_name,
-                target_repo_branch,
-                target_repo_owner,
-                action,
-                current_version,
-                previous_version,
-                grace_period_mins,
-                target_release_days,
-                source_version_change_datetime,
-                user_agent_chrome,
+def _deliver_notification(send, args, kwargs):
+    start_time = time.monotonic()
+    try:
+        send(*args, **kwargs)
+
+    finally:
+        _report_phase("notifications", time.monotonic() - start_time)
+
+
+class _PipelineStage:
+    """One stage of the monitor_sites pipeline: workers calling handler(*item) for each item on a bounded queue.
+
+    An error raised by the handler is logged and appended to errors instead of stopping the worker,
+    monitor_sites re-raises the first one once the whole pipeline has drained.
+    """
+
+    _STOP = object()
+
+    def __init__(self, name, workers, handler, errors):
+        self.queue = queue.Queue(maxsize=pipeline_queue_size)
+        self._handler = handler
+        self._errors = errors
+        self._threads = [
+            threading.Thread(target=self._work, name="%s-%d" % (name, number), daemon=True)
+            for number in range(max(workers, 1))
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def put(self, *item):
+        self.queue.put(item)
+
+    def close(self):
+        """Wait for everything queued so far to be handled, then stop the workers."""
+        for _ in self._threads:
+            self.queue.put(self._STOP)
+        for thread in self._threads:
+            thread.join()
+
+    def _work(self):
+        while True:
+            item = self.queue.get()
+            if item is self._STOP:
+                return
+
+            try:
+                self._handler(*item)
+
+            except Exception as e:
+                app_logger_instance.warning("Unhandled error in %s: %s" % (threading.current_thread().name, e))
+                self._errors.append(e)
+
+
+def monitor_sites():
+
+    # read sites list from config
+    config_site_list = _config_site_list()
+
+    target_repo_owner = config_obj["general"]["target_repo_owner"]
+
+    # start the clock for this run's deadline, checked by http_client and the fetch workers
+    global _run_deadline, _run_memo
+    run_start_time = time.monotonic()
+    _run_deadline = run_start_time + run_deadline_secs if run_deadline_secs else None
+
+    # responses are memoized for this run only, the next run must see upstream changes
+    with _run_memo_lock:
+        _run_memo = {}
+        _run_memo_stats.update(dict.fromkeys(_run_memo_stats, 0))
+
+    # target repo details from the GraphQL resolver are only valid for the run that fetched them
+    _github_target_info.clear()
+
+    # pretend to be windows 10 running chrome (required for minecraft bedrock)
+    user_agent_chrome = (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/113.0.0.0 Safari/537.36"
+    )
+
+    # compiled once per site_list, later runs reuse the specs
+    site_specs = _site_specs(config_site_list)
+
+    # set counter for number of failures to get app package details
+    # These are module-level dicts (_app_down_counters) so they persist across scheduler runs.
+    # Counters are keyed by "site_name:app_name" so a success for one app does not reset the
+    # counter for a different app on the same site that is still failing.
+
+    compared_count = itertools.count(1)
+
+    def compare(site_spec, current_version, source_site_url):
+        start_time = time.monotonic()
+        previous_version = _compare_site_version(site_spec, current_version, source_site_url)
+        _report_phase("compare", time.monotonic() - start_time)
+        if previous_version is not None:
+            act_stage.put(site_spec, source_site_url, current_version, previous_version)
+
+        # write buffered state out every state_flush_items apps, bounding what a crash can lose
+        if next(compared_count) % state_flush_items == 0:
+            _flush_state()
+
+    def act(site_spec, source_site_url, current_version, previous_version):
+        start_time = time.monotonic()
+        if not _handle_version_change(
+            site_spec, source_site_url, target_repo_owner, current_version, previous_version, user_agent_chrome
+        ):
+            app_logger_instance.info("Processing finished for application %s" % site_spec.source_app_name)
+        _report_phase("actions", time.monotonic() - start_time)
+
+    # fetch -> compare -> act -> notify, every notification of the run goes through the notify stage
+    global _notification_queue
+    errors = []
+    notify_stage = _PipelineStage("notify", notification_workers, _deliver_notification, errors)
+    act_stage = _PipelineStage("act", action_workers, act, errors)
+    compare_stage = _PipelineStage("compare", compare_workers, compare, errors)
+    _notification_queue = notify_stage.queue
+    _start_digest()
+    _start_run_report()
+
+    # notifications left undelivered by earlier runs go first
+    for entry_id in _due_outbox_entries():
+        notify_stage.put(_deliver_outbox_entry, (entry_id,), {})
+
+    run_error = None
+    try:
+        try:
+            # check the sites actually used in site_list are operational
+            phase_start_time = time.monotonic()
+            site_down = _probe_sites({site_spec.source_site_name for site_spec in site_specs}, user_agent_chrome)
+            _report_phase("health_probes", time.monotonic() - phase_start_time)
+
+            # drop items with config errors or a down site before fetching, so only real work is fetched
+            fetch_site_specs = [site_spec for site_spec in site_specs if not _skip_site_item(site_spec, site_down)]
+
+            # versions are compared as each source finishes fetching, actions never hold up the fetch
+            phase_start_time = time.monotonic()
+            for site_spec, (current_version, source_site_url) in _iter_site_versions(
+                fetch_site_specs, user_agent_chrome
             ):
-                continue
+                compare_stage.put(site_spec, current_version, source_site_url)
+            _report_phase("fetch", time.monotonic() - phase_start_time)
 
-        else:
-            app_logger_instance.info(
-                "Previous version %s and current version %s match, nothing to do" % (previous_version, current_version)
-            )
+        finally:
+            # drain in stage order, each stage only feeds the stages after it
+            compare_stage.close()
+            act_stage.close()
+            _notification_queue = None
+            notify_stage.close()
+            _send_digest()
+            _close_smtp_session()
+            _compact_outbox()
 
-        app_logger_instance.info("Processing finished for application %s" % source_app_name)
+        if errors:
+            raise errors[0]
 
-    # write timestamp to config.ini
-    config_obj["general"]["last_check"] = time.strftime("%c")
-    config_obj.write()
+        # the timestamp is only moved on by a check that completed
+        config_obj["general"]["last_check"] = time.strftime("%c")
+        _mark_state_dirty()
+
+    except BaseException as e:
+        run_error = e
+        raise
+
+    finally:
+        # a failed run still keeps what it learned, otherwise the next run repeats the same work
+        # and the failure leaves no report or metrics behind
+        _finish_run(site_specs, run_start_time, run_error)
+
+
+def _finish_run(site_specs, run_start_time, run_error):
+    """Persist the state, validators, report and metrics of a run, whether or not it completed."""
+    global _run_memo
+
+    # persist conditional-request validators for the next run
+    _save_validator_cache()
+
+    _log_github_rate_limit()
+
+    _log_run_memo_stats()
+    _run_memo = None
+
+    # write everything buffered during the run to config.ini
+    _flush_state()
+
+    run_secs = time.monotonic() - run_start_time
+    _write_run_report(site_specs, run_secs, run_error)
+
+    _metric_inc("tdb_runs_total")
+    if run_error is not None:
+        _metric_inc("tdb_run_failures_total")
+    _metric_set("tdb_run_duration_seconds", run_secs)
+    _metric_set("tdb_last_run_timestamp_seconds", time.time())
+    _metric_set("tdb_site_items", len(site_specs))
+    _write_metrics_textfile()
 
 
 def ondemand_start():
@@ -1605,6 +4429,7 @@ def scheduler_start():
 
         except KeyboardInterrupt:
             app_logger_instance.info("Keyboard interrupt received, exiting script...")
+            _close_http_sessions()
             sys.exit()
 
         except Exception as e:
@@ -1631,7 +4456,8 @@ if __name__ == "__main__":
             "%(prog)s [--help] [--config <path>] [--logs <path>] [--kodi-password <password>] "
             "[--email-to <email address>] [--email-username <username>] "
             "[--email-password <password>] [--target-access-token <token>] [--pidfile <path>] "
-            "[--kodi-notification] [--email-notification] [--schedule] [--daemon] [--version]"
+            "[--kodi-notification] [--email-notification] [--schedule] [--daemon] [--no-preflight] "
+            "[--changes-since <hours>] [--version]"
         ),
         formatter_class=lambda prog: argparse.HelpFormatter(prog, max_help_position=50),
     )
@@ -1677,6 +4503,18 @@ if __name__ == "__main__":
     )
     commandline_parser.add_argument("--schedule", action="store_true", help="enable scheduling e.g. --schedule")
     commandline_parser.add_argument("--daemon", action="store_true", help="run as daemonized process e.g. --daemon")
+    commandline_parser.add_argument(
+        "--no-preflight",
+        action="store_true",
+        help="skip site health probes and infer site health from the first request e.g. --no-preflight",
+    )
+    commandline_parser.add_argument(
+        "--changes-since",
+        metavar="<hours>",
+        type=float,
+        help="print the versions seen and triggers made in the last <hours> and exit (sqlite state backend) "
+        "e.g. --changes-since 24",
+    )
     commandline_parser.add_argument("--version", action="version", version=version)
 
     # save arguments in dictionary
@@ -1830,6 +4668,91 @@ if __name__ == "__main__":
     # Silence urllib3 InsecureRequestWarning only when verification is disabled
     _silence_tls_warnings(verify_ssl)
 
+    # Connection pool settings for the per-host pooled HTTP sessions
+    http_max_connections_per_host = config_obj["http"]["max_connections_per_host"]
+    http_block_when_pool_full = config_obj["http"]["block_when_pool_full"]
+    http_keepalive_max_requests = config_obj["http"]["keepalive_max_requests"]
+    http_keepalive_idle_secs = config_obj["http"]["keepalive_idle_secs"]
+
+    # Skip up-front site health probes, the first real request to each site decides its health instead
+    preflight_checks = not args["no_preflight"]
+
+    # Pipeline stage sizing, see monitor_sites
+    pipeline_queue_size = config_obj["pipeline"]["queue_size"]
+    compare_workers = config_obj["pipeline"]["compare_workers"]
+    action_workers = config_obj["pipeline"]["action_workers"]
+    notification_workers = config_obj["pipeline"]["notification_workers"]
+
+    # Digest mode, collect each run's notification emails into one summary email
+    email_digest = config_obj["notification"]["email_digest"]
+    digest_immediate_types = config_obj["notification"]["digest_immediate_types"]
+
+    # Notification outbox, undelivered notifications are retried by later runs
+    outbox_max_attempts = config_obj["notification"]["outbox_max_attempts"]
+    outbox_retry_mins = config_obj["notification"]["outbox_retry_mins"]
+    outbox_file = os.path.join(config_dir, "notification_outbox.jsonl")
+    _load_outbox()
+
+    # Per-site circuit breaker tuning
+    circuit_failure_threshold = config_obj["circuit_breaker"]["failure_threshold"]
+    circuit_open_mins = config_obj["circuit_breaker"]["open_mins"]
+    circuit_notification_cooldown_hours = config_obj["circuit_breaker"]["notification_cooldown_hours"]
+
+    # Conditional requests, validators are cached next to config.ini so they survive restarts
+    http_conditional_requests = config_obj["http"]["conditional_requests"]
+    validator_cache_file = os.path.join(config_dir, "validator_cache.json")
+    _load_validator_cache()
+
+    # Compile site_list once up front, every run reuses the specs
+    _site_specs(_config_site_list())
+
+    # Buffered state is written to config.ini after this many apps (and at the end of each run)
+    state_flush_items = config_obj["general"]["state_flush_items"]
+
+    # Version state backend, the SQLite database lives next to config.ini
+    state_db_file = None
+    if config_obj["general"]["state_backend"] == "sqlite":
+        state_db_file = os.path.join(config_dir, "state.db")
+
+    if args["changes_since"] is not None:
+        if state_db_file is not None:
+            _open_state_db(state_db_file)
+
+        changes = state_changes_since(args["changes_since"] * 3600)
+
+        if changes is None:
+            app_logger_instance.warning("'--changes-since' requires 'state_backend = sqlite' in config.ini, exiting...")
+            exit(1)
+
+        for recorded_at, site, app, target, event, version in changes:
+            print(
+                "%s %s %s/%s -> %s %s"
+                % (time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(recorded_at)), event, site, app, target, version)
+            )
+        exit(0)
+
+    # Per-run deadline, a scheduled run must finish before the next one is due
+    run_deadline_mins = config_obj["general"]["run_deadline_mins"]
+    if args["schedule"] is True:
+        schedule_check_mins = config_obj["general"]["schedule_check_mins"]
+        run_deadline_mins = min(run_deadline_mins or schedule_check_mins, schedule_check_mins)
+    run_deadline_secs = run_deadline_mins * 60
+
+    # Concurrent fetch settings, global worker count plus per-source concurrency caps
+    fetch_workers = config_obj["sources"]["fetch_workers"]
+    source_settings = {
+        source_site_name: dict(section)
+        for source_site_name, section in config_obj["sources"].items()
+        if isinstance(section, dict)
+    }
+
+    # Per-run JSON reports are written next to app.log
+    run_report_dir = logs_dir
+    run_reports_keep = config_obj["general"]["run_reports"]
+
+    # Metrics, written as a node_exporter textfile after every run
+    metrics_textfile = config_obj["metrics"]["textfile"] or None
+
     # check os is not windows and then run main process as daemonized process
     if args["daemon"] is True and os.name != "nt":
         app_logger_instance.info("Running as a daemonized process...")
@@ -1839,9 +4762,23 @@ if __name__ == "__main__":
         daemon_context.files_preserve = [app_handler.stream]
         daemon_context.open()
 
+        # a long-running daemon can be scraped directly, started after the fork so the thread survives it
+        if args["schedule"] is True and config_obj["metrics"]["listen_port"]:
+            try:
+                _start_metrics_server(config_obj["metrics"]["listen_address"], config_obj["metrics"]["listen_port"])
+
+            except OSError as e:
+                app_logger_instance.warning("Unable to serve metrics: %s" % e)
+
     else:
         app_logger_instance.info("Running as a foreground process...")
 
+    # opened once daemonized, the daemon context closes every descriptor inherited from before it
+    # started (including the database's WAL and shared memory files) and sqlite connections must
+    # not be carried across its fork
+    if state_db_file is not None:
+        _open_state_db(state_db_file)
+
     if args["schedule"] is True:
         app_logger_instance.info("Running via schedule...")
         scheduler_start()
@@ -0,0 +1,358 @@
+"""Offline throughput benchmark for monitor_sites against the local upstream stub.
+
+For each --items size a synthetic site_list mixing every source (github release/tag/pre-release/
+branch, gitlab, pypi, aor, aur and the minecraft regex apps, a fifth of them with the trigger
+action) is checked --runs times by a child process, so peak RSS is measured per size. The stub
+runs in this process and is advanced between runs, so each later run sees a fraction of the apps
+change (--change-rate) and the rest answer 304 Not Modified.
+
+Reported per size: runs/sec, items/sec, p50/p95 per-item fetch latency (from the run report),
+HTTP requests made, peak RSS and config.ini write volume. --save writes the results as JSON and
+--baseline compares against a saved file, so a performance change can be measured against the
+tree it started from.
+
+Usage:
+    python3 benchmarks/bench_monitor_sites.py --items 100 1000 10000 --runs 3
+    python3 benchmarks/bench_monitor_sites.py --save baseline.json
+    python3 benchmarks/bench_monitor_sites.py --baseline baseline.json --latency-ms 20
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import configobj
+import requests
+from stub_server import StubUpstream
+
+APP_ROOT_DIR = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+# one synthetic site item per kind, repeated through the site_list
+SITE_KINDS = [
+    {"source_site_name": "github", "source_query_type": "release"},
+    {"source_site_name": "github", "source_query_type": "tag"},
+    {"source_site_name": "github", "source_query_type": "pre-release"},
+    {"source_site_name": "github", "source_query_type": "branch", "source_branch_name": "main"},
+    {"source_site_name": "gitlab", "source_query_type": "branch", "source_branch_name": "master"},
+    {"source_site_name": "pypi"},
+    {"source_site_name": "aor"},
+    {"source_site_name": "aur"},
+]
+REGEX_APPS = ["minecraftbedrock", "minecraftserver"]
+
+
+def synthetic_site_list(items):
+    """Return a site_list of the given length covering every source, with unique source apps."""
+    site_list = []
+
+    for n in range(items):
+        if n % 50 == 49:
+            site_item = {"source_site_name": "regex", "source_app_name": REGEX_APPS[(n // 50) % len(REGEX_APPS)]}
+
+        else:
+            site_item = dict(SITE_KINDS[n % len(SITE_KINDS)], source_app_name="app-%05d" % n)
+            site_item["source_repo_name"] = "owner-%03d" % (n % 100)
+            if site_item["source_site_name"] == "gitlab":
+                site_item["source_project_id"] = str(100000 + n)
+
+        site_item["target_repo_name"] = "target-%05d" % n
+        site_item["action"] = "notify"
+        if n % 5 == 0:
+            site_item.update(action="trigger", target_repo_branch="master")
+        site_list.append(site_item)
+
+    return site_list
+
+
+class _StubAdapter(requests.adapters.HTTPAdapter):
+    """Send every request to the stub, as http://<stub>/<original host><original path>."""
+
+    def __init__(self, stub_url, **kwargs):
+        self.stub_url = stub_url
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        url = requests.utils.urlparse(request.url)
+        request.url = "%s/%s%s" % (self.stub_url, url.netloc, url.path)
+        if url.query:
+            request.url = "%s?%s" % (request.url, url.query)
+        return super().send(request, **kwargs)
+
+
+def _load_tdb():
+    spec = importlib.util.spec_from_file_location("tdb", os.path.join(APP_ROOT_DIR, "TriggerDockerBuild.py"))
+    tdb = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(tdb)
+    return tdb
+
+
+def _setup_tdb(tdb, work_dir, stub_url, items, log_level):
+    """Configure the module's globals the way __main__ does, with notifications off and the stub as upstream."""
+    tdb.config_ini = os.path.join(work_dir, "config.ini")
+    tdb.config_obj = configobj.ConfigObj(
+        tdb.config_ini,
+        list_values=False,
+        write_empty_values=True,
+        encoding="UTF-8",
+        default_encoding="UTF-8",
+        configspec=os.path.join(APP_ROOT_DIR, "configs", "configspec.ini"),
+        unrepr=True,
+    )
+    tdb.create_config()
+    tdb.config_obj["general"]["log_level"] = log_level
+    tdb.config_obj["monitor_sites"]["site_list"] = synthetic_site_list(items)
+    # the stub answers REST only, batched GraphQL queries are left to the real API
+    tdb.config_obj["sources"]["github"]["graphql_min_items"] = 0
+
+    tdb.app_log_file = os.path.join(work_dir, "app.log")
+    tdb.app_logger_instance = tdb.app_logging()["logger"]
+
+    tdb.email_notification = False
+    tdb.kodi_notification = False
+    tdb.email_to = tdb.email_username = tdb.email_password = tdb.kodi_password = None
+    tdb.target_access_token = "benchmark-token"
+
+    tdb.http_max_connections_per_host = tdb.config_obj["http"]["max_connections_per_host"]
+    tdb.http_block_when_pool_full = tdb.config_obj["http"]["block_when_pool_full"]
+    tdb.http_conditional_requests = tdb.config_obj["http"]["conditional_requests"]
+    tdb.validator_cache_file = os.path.join(work_dir, "validator_cache.json")
+    tdb.outbox_file = os.path.join(work_dir, "notification_outbox.jsonl")
+    tdb.state_flush_items = tdb.config_obj["general"]["state_flush_items"]
+    tdb.fetch_workers = tdb.config_obj["sources"]["fetch_workers"]
+    tdb.source_settings = {
+        source_site_name: dict(section)
+        for source_site_name, section in tdb.config_obj["sources"].items()
+        if isinstance(section, dict)
+    }
+    tdb.run_report_dir = work_dir
+    tdb.run_reports_keep = 1
+
+    def new_http_session():
+        session = requests.Session()
+        adapter = _StubAdapter(
+            stub_url,
+            pool_connections=1,
+            pool_maxsize=tdb.http_max_connections_per_host,
+            pool_block=tdb.http_block_when_pool_full,
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    tdb._new_http_session = new_http_session
+
+
+def _percentile(values, percent):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(int(round(percent / 100.0 * (len(values) - 1))), len(values) - 1)]
+
+
+def _peak_rss_bytes():
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on linux, bytes on macos
+    return peak_rss if sys.platform == "darwin" else peak_rss * 1024
+
+
+def run_worker(stub_url, items, runs, log_level):
+    """Check a synthetic site_list runs times in this process and return one result dict per run."""
+    tdb = _load_tdb()
+    results = []
+
+    with tempfile.TemporaryDirectory(prefix="tdb-bench-") as work_dir:
+        _setup_tdb(tdb, work_dir, stub_url, items, log_level)
+
+        config_writes = {"count": 0, "bytes": 0}
+        write_config_atomic = tdb._write_config_atomic
+
+        def counted_write_config_atomic():
+            write_config_atomic()
+            config_writes["count"] += 1
+            config_writes["bytes"] += os.path.getsize(tdb.config_obj.filename)
+
+        tdb._write_config_atomic = counted_write_config_atomic
+
+        for run in range(runs):
+            if run:
+                requests.post("%s/_stub/advance" % stub_url, timeout=10)
+
+            config_writes.update(count=0, bytes=0)
+            tdb._metric_values.clear()
+
+            start_time = time.perf_counter()
+            tdb.monitor_sites()
+            wall_secs = time.perf_counter() - start_time
+
+            with open(os.path.join(work_dir, "last_run.json"), encoding="utf-8") as report_file:
+                report = json.load(report_file)
+
+            # items resolved by one batched request share that request's latency
+            latencies = [
+                item["fetch_secs"]
+                if "fetch_secs" in item
+                else report["sources"][item["source_site_name"]]["fetch_secs"]
+                for item in report["items"]
+                if "fetch_secs" in item or item["source_site_name"] in report["sources"]
+            ]
+            outcomes = {}
+            for item in report["items"]:
+                outcomes[item.get("result")] = outcomes.get(item.get("result"), 0) + 1
+
+            results.append(
+                {
+                    "items": items,
+                    "run": run + 1,
+                    "wall_secs": wall_secs,
+                    "p50_item_secs": _percentile(latencies, 50),
+                    "p95_item_secs": _percentile(latencies, 95),
+                    "http_requests": sum(
+                        value for (name, _), value in tdb._metric_values.items() if name == "tdb_http_requests_total"
+                    ),
+                    "config_writes": config_writes["count"],
+                    "config_write_bytes": config_writes["bytes"],
+                    "peak_rss_bytes": _peak_rss_bytes(),
+                    "results": outcomes,
+                }
+            )
+
+    return results
+
+
+def summarise(results):
+    """Collapse per-run results to one entry per size; warm runs (after the first) give the throughput."""
+    summary = {}
+
+    for items in sorted({result["items"] for result in results}):
+        runs = [result for result in results if result["items"] == items]
+        warm = runs[1:] or runs
+        wall_secs = sum(result["wall_secs"] for result in warm) / len(warm)
+        summary[str(items)] = {
+            "cold_wall_secs": runs[0]["wall_secs"],
+            "runs_per_sec": 1.0 / wall_secs,
+            "items_per_sec": items / wall_secs,
+            "p50_item_secs": max(result["p50_item_secs"] or 0 for result in warm),
+            "p95_item_secs": max(result["p95_item_secs"] or 0 for result in warm),
+            "http_requests": sum(result["http_requests"] for result in warm) / len(warm),
+            "config_writes": sum(result["config_writes"] for result in warm) / len(warm),
+            "config_write_bytes": sum(result["config_write_bytes"] for result in warm) / len(warm),
+            "peak_rss_bytes": max(result["peak_rss_bytes"] for result in runs),
+        }
+
+    return summary
+
+
+def _print_runs(results):
+    columns = ("items", "run", "wall_s", "items/s", "p50_ms", "p95_ms", "requests", "writes", "written_kB", "rss_MB")
+    print("%7s %4s %9s %9s %8s %8s %9s %7s %10s %9s  results" % columns)
+    for result in results:
+        print(
+            "%7d %4d %9.3f %9.1f %8.1f %8.1f %9d %7d %10.1f %9.1f  %s"
+            % (
+                result["items"],
+                result["run"],
+                result["wall_secs"],
+                result["items"] / result["wall_secs"],
+                (result["p50_item_secs"] or 0) * 1000,
+                (result["p95_item_secs"] or 0) * 1000,
+                result["http_requests"],
+                result["config_writes"],
+                result["config_write_bytes"] / 1024.0,
+                result["peak_rss_bytes"] / 1048576.0,
+                ", ".join("%s=%d" % (name, count) for name, count in sorted(result["results"].items(), key=str)),
+            )
+        )
+
+
+def _print_comparison(summary, baseline):
+    """Print the change of each summary figure against the baseline, as a percentage."""
+    print("\nChange against baseline (runs/sec up is better, the rest down):")
+    keys = ["runs_per_sec", "p50_item_secs", "p95_item_secs", "http_requests", "config_write_bytes", "peak_rss_bytes"]
+    print("%7s %s" % ("items", " ".join("%18s" % key for key in keys)))
+
+    for items, figures in summary.items():
+        if items not in baseline:
+            print("%7s (not in baseline)" % items)
+            continue
+
+        changes = []
+        for key in keys:
+            before = baseline[items].get(key)
+            changes.append("%+17.1f%%" % ((figures[key] - before) / before * 100.0) if before else "%18s" % "n/a")
+        print("%7s %s" % (items, " ".join(changes)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark monitor_sites offline against stubbed upstream APIs")
+    parser.add_argument("--items", type=int, nargs="+", default=[100, 1000, 10000], help="site_list sizes to check")
+    parser.add_argument("--runs", type=int, default=3, help="checks per size, the first one is cold")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="delay the stub adds to every response")
+    parser.add_argument("--change-rate", type=float, default=0.1, help="fraction of apps changed between runs")
+    parser.add_argument("--log-level", default="WARNING", help="log_level for the checked app")
+    parser.add_argument("--save", metavar="<file>", help="write the summary as JSON for a later --baseline")
+    parser.add_argument("--baseline", metavar="<file>", help="compare the summary against a saved one")
+    parser.add_argument("--json", action="store_true", help="print the per-run results as JSON")
+    parser.add_argument("--worker", metavar="<stub url>", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        json.dump(run_worker(args.worker, args.items[0], args.runs, args.log_level), sys.stdout)
+        return 0
+
+    upstream = StubUpstream(args.latency_ms / 1000.0, args.change_rate)
+    stub_url = upstream.start()
+    results = []
+
+    try:
+        for items in args.items:
+            # a fresh process per size, so peak RSS belongs to that size alone
+            worker = subprocess.run(
+                [
+                    sys.executable,
+                    os.path.realpath(__file__),
+                    "--worker",
+                    stub_url,
+                    "--items",
+                    str(items),
+                    "--runs",
+                    str(args.runs),
+                    "--log-level",
+                    args.log_level,
+                ],
+                capture_output=True,
+                text=True,
+            )
+            if worker.returncode != 0:
+                sys.stderr.write(worker.stderr[-4000:])
+                return worker.returncode
+            results.extend(json.loads(worker.stdout))
+
+    finally:
+        upstream.stop()
+
+    summary = summarise(results)
+
+    if args.json:
+        print(json.dumps(results, indent=1))
+    else:
+        _print_runs(results)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as save_file:
+            json.dump(summary, save_file, indent=1)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            _print_comparison(summary, json.load(baseline_file))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,251 @@
+"""Local HTTP stub of the upstream APIs TriggerDockerBuild monitors, for offline benchmarks.
+
+Requests are addressed as http://<stub>/<original host><original path>, e.g.
+http://127.0.0.1:8080/api.github.com/repos/binhex/app/releases/latest, so one server stands in
+for every upstream. The benchmark harness rewrites URLs this way with a transport adapter.
+
+Emulated endpoints (enough to resolve every site_list source):
+    api.github.com              releases/latest, releases?per_page=1, tags?per_page=1,
+                                commits/<branch> (SHA media type), release creation, rate-limit headers
+    gitlab.com                  projects/<id>/repository/commits/<branch>
+    pypi.org                    pypi/<name>/json
+    archlinux.org               packages/search/json/?name=<name>
+    aur.archlinux.org           rpc/?v=5&type=info&arg[]=<name>... (multi-arg)
+    minecraft-services/mojang   bedrock download links and the java version manifest
+
+Every version is derived from the app name and the stub's generation, POST /_stub/advance bumps
+the generation and changes the version of roughly change_rate of the apps. Responses carry an
+ETag and answer a matching If-None-Match with 304, like the real APIs.
+
+Usage:
+    python3 benchmarks/stub_server.py --port 8080 --latency-ms 50
+"""
+
+import argparse
+import hashlib
+import http.server
+import json
+import threading
+import time
+import urllib.parse
+import zlib
+
+GITHUB_RATE_LIMIT = 1000000
+
+
+class StubUpstream:
+    """Versions and counters shared by the request handler threads."""
+
+    def __init__(self, latency_secs=0.0, change_rate=0.1):
+        self.latency_secs = latency_secs
+        self.change_rate = change_rate
+        self.generation = 0
+        self.requests = {}
+        self.github_used = 0
+        self.lock = threading.Lock()
+        self.server = None
+
+    def version(self, name):
+        """Return the current version of an app, bumped for each generation the app changed in."""
+        changes = sum(
+            1
+            for generation in range(1, self.generation + 1)
+            if zlib.crc32(("%s:%d" % (name, generation)).encode("utf-8")) % 1000 < self.change_rate * 1000
+        )
+        return "1.%d.0" % changes
+
+    def sha(self, name):
+        return hashlib.sha1(("%s:%s" % (name, self.version(name))).encode("utf-8")).hexdigest()
+
+    def count(self, host):
+        with self.lock:
+            self.requests[host] = self.requests.get(host, 0) + 1
+
+            if host == "api.github.com":
+                self.github_used += 1
+                return max(GITHUB_RATE_LIMIT - self.github_used, 0)
+
+        return None
+
+    def advance(self):
+        with self.lock:
+            self.generation += 1
+            return self.generation
+
+    def stats(self):
+        with self.lock:
+            return {"generation": self.generation, "requests": dict(self.requests)}
+
+    def start(self, host="127.0.0.1", port=0):
+        """Serve on a background thread and return the base URL."""
+        self.server = http.server.ThreadingHTTPServer((host, port), _StubRequestHandler)
+        self.server.daemon_threads = True
+        self.server.request_queue_size = 256
+        self.server.upstream = self
+        threading.Thread(target=self.server.serve_forever, name="stub-server", daemon=True).start()
+        return "http://%s:%d" % self.server.server_address[:2]
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+
+def _github(upstream, method, parts, query):
+    """Answer api.github.com/repos/<owner>/<repo>/..., parts starts after 'repos'."""
+    if not parts:
+        return 200, {"current_user_url": "https://api.github.com/user"}
+
+    if len(parts) < 3:
+        return 404, {"message": "Not Found"}
+
+    owner, repo, resource = parts[0], parts[1], parts[2:]
+    name = "%s/%s" % (owner, repo)
+
+    if method == "POST" and resource == ["releases"]:
+        return 201, {"html_url": "https://github.com/%s/releases" % name}
+
+    if resource == ["releases", "latest"]:
+        return 200, {"tag_name": upstream.version(name), "published_at": "2020-01-01T00:00:00Z", "body": "x" * 2048}
+
+    if resource == ["releases"]:
+        return 200, [{"tag_name": upstream.version(name), "prerelease": True, "body": "x" * 2048}]
+
+    if resource == ["tags"]:
+        return 200, [{"name": upstream.version(name), "commit": {"sha": upstream.sha(name)}}]
+
+    if resource[0] == "commits" and len(resource) > 1:
+        return 200, upstream.sha("%s@%s" % (name, "/".join(resource[1:])))
+
+    # release lookups by tag, the benchmark never has an existing release to find
+    return 404, {"message": "Not Found"}
+
+
+def _route(upstream, method, host, path, query):
+    """Return (status, body) for one stubbed upstream request, body is JSON-serialisable or str."""
+    parts = [part for part in path.split("/") if part]
+
+    if host == "api.github.com":
+        if parts[:1] == ["repos"]:
+            return _github(upstream, method, parts[1:], query)
+        return 200 if not parts else 404, {}
+
+    if host == "gitlab.com":
+        if parts == ["api", "v4", "projects"]:
+            return 200, []
+        if parts[:3] == ["api", "v4", "projects"] and parts[4:6] == ["repository", "commits"]:
+            return 200, {"id": upstream.sha("gitlab:%s@%s" % (parts[3], "/".join(parts[6:])))}
+
+    if host == "pypi.org" and parts[:1] == ["pypi"] and parts[-1:] == ["json"]:
+        name = parts[1]
+        # pad with a release history, real pypi documents run to hundreds of kB
+        releases = {"0.%d.0" % n: [{"size": 1024, "url": "https://files.example/%s" % n}] for n in range(50)}
+        return 200, {"info": {"name": name, "version": upstream.version("pypi:%s" % name)}, "releases": releases}
+
+    if host == "archlinux.org":
+        if parts[:3] == ["packages", "search", "json"]:
+            name = query.get("name", [""])[0]
+            pkgver = upstream.version("aor:%s" % name)
+            return 200, {"results": [{"pkgname": name, "pkgver": pkgver, "pkgrel": "1", "repo": "extra"}]}
+        if parts[:1] == ["packages"]:
+            return 200, "<html>base</html>"
+
+    if host == "aur.archlinux.org" and parts[:1] == ["rpc"]:
+        names = query.get("arg[]", [])
+        results = [{"Name": name, "Version": "%s-1" % upstream.version("aur:%s" % name)} for name in names]
+        return 200, {"resultcount": len(results), "results": results}
+
+    if host == "net-secondary.web.minecraft-services.net":
+        download_url = "https://www.minecraft.net/bedrock-server-%s.zip" % upstream.version("minecraftbedrock")
+        return 200, {"result": {"links": [{"downloadType": "serverBedrockLinux", "downloadUrl": download_url}]}}
+
+    if host == "launchermeta.mojang.com":
+        return 200, {"latest": {"release": upstream.version("minecraftserver")}, "versions": []}
+
+    return 404, {"message": "Not Found"}
+
+
+class _StubRequestHandler(http.server.BaseHTTPRequestHandler):
+    # keep-alive, so the benchmark exercises the connection pools as the real APIs would
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):  # noqa: A002
+        pass
+
+    def do_GET(self):  # noqa: N802
+        self._handle("GET")
+
+    def do_POST(self):  # noqa: N802
+        self._handle("POST")
+
+    def _handle(self, method):
+        upstream = self.server.upstream
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+
+        url = urllib.parse.urlsplit(self.path)
+        host, _, path = url.path.lstrip("/").partition("/")
+        query = urllib.parse.parse_qs(url.query)
+
+        if host == "_stub":
+            body = upstream.advance() if path == "advance" else upstream.stats()
+            self._reply(200, json.dumps(body).encode("utf-8"), {})
+            return
+
+        if upstream.latency_secs:
+            time.sleep(upstream.latency_secs)
+
+        remaining = upstream.count(host)
+        status, body = _route(upstream, method, host, "/" + path, query)
+        content = body.encode("utf-8") if isinstance(body, str) else json.dumps(body).encode("utf-8")
+
+        headers = {"ETag": '"%s"' % hashlib.md5(content).hexdigest()}
+        if remaining is not None:
+            headers.update(
+                {
+                    "X-RateLimit-Limit": str(GITHUB_RATE_LIMIT),
+                    "X-RateLimit-Remaining": str(remaining),
+                    "X-RateLimit-Reset": str(int(time.time()) + 3600),
+                    "X-RateLimit-Resource": "core",
+                }
+            )
+
+        if status == 200 and method == "GET" and self.headers.get("If-None-Match") == headers["ETag"]:
+            self._reply(304, b"", headers)
+            return
+
+        self._reply(status, content, headers)
+
+    def _reply(self, status, content, headers):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve stubbed upstream APIs for TriggerDockerBuild benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="delay added to every response")
+    parser.add_argument("--change-rate", type=float, default=0.1, help="fraction of apps changed per generation")
+    args = parser.parse_args()
+
+    upstream = StubUpstream(args.latency_ms / 1000.0, args.change_rate)
+    print("Serving stub upstreams on %s (Ctrl+C to stop)" % upstream.start(args.host, args.port))
+
+    try:
+        while True:
+            time.sleep(3600)
+
+    except KeyboardInterrupt:
+        upstream.stop()
+
+
+if __name__ == "__main__":
+    main()
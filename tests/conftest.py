@@ -80,6 +80,52 @@ def tdb(tdb_module, tmp_path):
     tdb_module.kodi_password = "kodi"
     tdb_module.target_access_token = "test-token-123"
 
+    # Pooled HTTP sessions outlive a single call, so drop them between tests
+    # to make sure each test sees its own (possibly mocked) requests.Session.
+    tdb_module._http_sessions.clear()
+
+    # Conditional-request validators are process-wide too; start each test with none cached.
+    tdb_module._validator_cache.clear()
+    tdb_module.validator_cache_file = None
+
+    # http_client feeds every request outcome into the per-site circuit breakers, so a failing
+    # request in one test must not leave a site "down" for the next.
+    tdb_module._site_down_state.clear()
+    tdb_module._unprobed_sites.clear()
+    tdb_module._github_rate_limit.clear()
+
+    # a run deadline left over from a monitor_sites test would refuse every later request
+    tdb_module.run_deadline_secs = 0
+    tdb_module._run_deadline = None
+
+    # buffered state from one test must not be flushed into the next test's config.ini
+    tdb_module._state_dirty = False
+    tdb_module.state_flush_items = 25
+    tdb_module._state_db = None
+
+    # site_list specs are compiled once per site_list object, start each test uncompiled
+    tdb_module._compiled_site_list = None
+    tdb_module._compiled_site_specs = ()
+    tdb_module._fetch_slots = None
+    tdb_module._notification_queue = None
+
+    # requests are only memoized inside a monitor_sites run
+    tdb_module._run_memo = None
+    tdb_module._run_memo_stats.update(dict.fromkeys(tdb_module._run_memo_stats, 0))
+
+    # an SMTP session opened by one test (against that test's yagmail mock) must not carry over
+    tdb_module._smtp_session = None
+    tdb_module._smtp_stats.update(dict.fromkeys(tdb_module._smtp_stats, 0))
+    tdb_module.outbox_file = None
+    tdb_module._outbox_pending.clear()
+
+    # metrics accumulate for the life of the process, each test starts from none
+    tdb_module._metric_values.clear()
+    tdb_module.metrics_textfile = None
+    tdb_module.run_report_dir = None
+    tdb_module.run_reports_keep = 0
+    tdb_module._run_report = None
+
     return tdb_module
 
 
@@ -98,6 +144,7 @@ def mock_http(monkeypatch):
 def mock_yagmail(tdb, monkeypatch):
     """Mock yagmail.SMTP to avoid real email sending."""
     mock_smtp = MagicMock()
+    mock_smtp.return_value.prepare_send.return_value = (["test@example.com"], "message")
     monkeypatch.setattr("yagmail.SMTP", mock_smtp)
     return mock_smtp
 
@@ -0,0 +1,111 @@
+"""Tests for exact-name AOR lookups, shared-package de-duplication and the sync database mode."""
+
+import io
+import json
+import tarfile
+from unittest.mock import MagicMock
+
+CORE_DB_URL = "https://geo.mirror.pkgbuild.com/core/os/x86_64/core.db"
+EXTRA_DB_URL = "https://geo.mirror.pkgbuild.com/extra/os/x86_64/extra.db"
+
+
+def _sync_db(packages):
+    """Build a gzip tar sync database from {pkgname: "[epoch:]pkgver-pkgrel"}."""
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as sync_db:
+        for pkgname, version in packages.items():
+            desc = (
+                "%%FILENAME%%\n%s-%s-x86_64.pkg.tar.zst\n\n%%NAME%%\n%s\n\n%%VERSION%%\n%s\n\n"
+                % (pkgname, version, pkgname, version)
+            ).encode()
+            member = tarfile.TarInfo("%s-%s/desc" % (pkgname, version.split(":", 1)[-1]))
+            member.size = len(desc)
+            sync_db.addfile(member, io.BytesIO(desc))
+    return buffer.getvalue()
+
+
+def _response(status_code, content=b"", headers=None):
+    return MagicMock(status_code=status_code, content=content, headers=headers or {})
+
+
+def _aor_item(app, target):
+    return {"source_site_name": "aor", "source_app_name": app, "target_repo_name": target, "action": "notify"}
+
+
+class TestAorExactName:
+    def test_lookup_uses_exact_name_match(self, tdb, mock_http):
+        mock_http.get.return_value = _response(
+            200, json.dumps({"results": [{"pkgname": "python", "pkgver": "3.12.4", "pkgrel": "1"}]})
+        )
+
+        version, _ = tdb.aor_apps("python", "agent/1.0")
+
+        assert version == "3.12.4-1"
+        assert mock_http.get.call_args.kwargs["url"] == "https://archlinux.org/packages/search/json/?name=python"
+
+    def test_package_names_are_url_encoded(self, tdb, mock_http):
+        mock_http.get.return_value = _response(200, json.dumps({"results": []}))
+
+        tdb.aor_apps("libc++", "agent/1.0")
+
+        assert mock_http.get.call_args.kwargs["url"].endswith("?name=libc%2B%2B")
+
+    def test_shared_package_is_fetched_once(self, tdb, monkeypatch):
+        aor_apps = MagicMock(return_value=("1.0-1", "https://archlinux.org/packages/?q=base"))
+        monkeypatch.setattr(tdb, "aor_apps", aor_apps)
+        site_list = [_aor_item("base", "one"), _aor_item("base", "two"), _aor_item("zlib", "three")]
+
+        results = tdb._fetch_site_versions(tdb._site_specs(site_list), "agent/1.0")
+
+        assert [version for version, _ in results] == ["1.0-1", "1.0-1", "1.0-1"]
+        assert sorted(call.args[0] for call in aor_apps.call_args_list) == ["base", "zlib"]
+
+
+class TestAorSyncDb:
+    def test_parses_wanted_packages_and_drops_epoch(self, tdb):
+        content = _sync_db({"base": "3-2", "python": "1:3.12.4-1", "zlib": "1:1.3.1-2"})
+
+        assert tdb._aor_sync_db_versions(content, {"python", "base"}) == {"base": "3-2", "python": "3.12.4-1"}
+
+    def test_batch_reads_each_repo_once(self, tdb, mock_http):
+        mock_http.get.side_effect = lambda **kwargs: {
+            CORE_DB_URL: _response(200, _sync_db({"base": "3-2"}), {"ETag": '"core"'}),
+            EXTRA_DB_URL: _response(200, _sync_db({"jellyfin-server": "10.9.7-1", "base": "9-9"})),
+        }[kwargs["url"]]
+
+        versions = tdb.aor_apps_batch({"base", "jellyfin-server", "missing"}, "agent/1.0")
+
+        # the first repo listed wins, as pacman resolves it
+        assert versions == {"base": "3-2", "jellyfin-server": "10.9.7-1"}
+        assert mock_http.get.call_count == 2
+        assert tdb._cached_version(CORE_DB_URL) == {"base": "3-2"}
+
+    def test_unchanged_database_reuses_cached_versions(self, tdb, mock_http, monkeypatch):
+        monkeypatch.setattr(tdb, "source_settings", {"aor": {"sync_db_repos": ["core"]}})
+        tdb._validator_cache[CORE_DB_URL] = {"etag": '"core"', "last_modified": None, "version": {"base": "3-2"}}
+        mock_http.get.return_value = _response(304)
+
+        assert tdb.aor_apps_batch({"base"}, "agent/1.0") == {"base": "3-2"}
+        assert mock_http.get.call_args.kwargs["headers"]["If-None-Match"] == '"core"'
+
+    def test_fetch_stage_falls_back_to_api_for_unresolved(self, tdb, monkeypatch):
+        monkeypatch.setattr(tdb, "source_settings", {"aor": {"sync_db": True}})
+        monkeypatch.setattr(tdb, "aor_apps_batch", MagicMock(return_value={"base": "3-2"}))
+        aor_apps = MagicMock(return_value=("1.0-1", "https://archlinux.org/packages/?q=other"))
+        monkeypatch.setattr(tdb, "aor_apps", aor_apps)
+
+        results = tdb._fetch_site_versions(
+            tdb._site_specs([_aor_item("base", "one"), _aor_item("other", "two")]), "agent/1.0"
+        )
+
+        assert [version for version, _ in results] == ["3-2", "1.0-1"]
+        aor_apps.assert_called_once_with("other", "agent/1.0")
+
+    def test_disabled_by_default(self, tdb, monkeypatch):
+        aor_apps_batch = MagicMock()
+        monkeypatch.setattr(tdb, "aor_apps_batch", aor_apps_batch)
+        monkeypatch.setattr(tdb, "aor_apps", MagicMock(return_value=("1.0-1", None)))
+
+        tdb._fetch_site_versions(tdb._site_specs([_aor_item("base", "one")]), "agent/1.0")
+
+        aor_apps_batch.assert_not_called()
@@ -8,7 +8,7 @@ class TestPypiApps:
 
     def test_returns_version_from_json(self, tdb, mock_http):
         mock_http.get.return_value.status_code = 200
-        mock_http.get.return_value.content = json.dumps({"info": {"version": "2.33.0"}})
+        mock_http.get.return_value.iter_content.return_value = [json.dumps({"info": {"version": "2.33.0"}}).encode()]
 
         version, url = tdb.pypi_apps("requests", "agent/1.0")
         assert version == "2.33.0"
@@ -16,21 +16,21 @@ class TestPypiApps:
 
     def test_missing_info_key_caught(self, tdb, mock_http):
         mock_http.get.return_value.status_code = 200
-        mock_http.get.return_value.content = json.dumps({})
+        mock_http.get.return_value.iter_content.return_value = [json.dumps({}).encode()]
 
         version, url = tdb.pypi_apps("requests", "agent/1.0")
         assert version is None
 
     def test_missing_version_key_caught(self, tdb, mock_http):
         mock_http.get.return_value.status_code = 200
-        mock_http.get.return_value.content = json.dumps({"info": {}})
+        mock_http.get.return_value.iter_content.return_value = [json.dumps({"info": {}}).encode()]
 
         version, url = tdb.pypi_apps("requests", "agent/1.0")
         assert version is None
 
     def test_json_decode_failure(self, tdb, mock_http):
         mock_http.get.return_value.status_code = 200
-        mock_http.get.return_value.content = b"not json"
+        mock_http.get.return_value.iter_content.return_value = [b"not json"]
 
         version, url = tdb.pypi_apps("requests", "agent/1.0")
         assert version is None
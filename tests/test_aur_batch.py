@@ -0,0 +1,66 @@
+"""Tests for batched AUR RPC info lookups."""
+
+import json
+from unittest.mock import MagicMock
+
+
+def _rpc_response(*packages):
+    results = [{"Name": name, "Version": version} for name, version in packages]
+    return MagicMock(status_code=200, content=json.dumps({"results": results}).encode(), headers={})
+
+
+class TestAurBatchUrls:
+    def test_single_url_for_few_names(self, tdb):
+        urls = tdb._aur_batch_urls(["yay", "paru"])
+
+        assert urls == ["https://aur.archlinux.org/rpc/?v=5&type=info&arg[]=yay&arg[]=paru"]
+
+    def test_names_are_url_encoded(self, tdb):
+        (url,) = tdb._aur_batch_urls(["libc++"])
+
+        assert url.endswith("arg[]=libc%2B%2B")
+
+    def test_chunks_respect_max_url_length(self, tdb, monkeypatch):
+        monkeypatch.setattr(tdb, "AUR_RPC_MAX_URL_LENGTH", 120)
+        names = ["package-%02d" % i for i in range(20)]
+
+        urls = tdb._aur_batch_urls(names)
+
+        assert len(urls) > 1
+        assert all(len(url) <= 120 for url in urls)
+        assert sum(url.count("arg[]=") for url in urls) == 20
+
+
+class TestAurAppsBatch:
+    def test_resolves_all_names_in_one_call(self, tdb, mock_http):
+        mock_http.get.return_value = _rpc_response(("yay", "12.1.0-1"), ("paru", "2.0.3-1"))
+
+        versions = tdb.aur_apps_batch(["yay", "paru", "yay"], "agent/1.0")
+
+        assert versions == {"yay": "12.1.0-1", "paru": "2.0.3-1"}
+        assert mock_http.get.call_count == 1
+        assert mock_http.get.call_args.kwargs["url"].count("arg[]=") == 2
+
+    def test_failed_chunk_returns_partial_results(self, tdb, mock_http):
+        mock_http.get.return_value = MagicMock(status_code=500, content=b"error", headers={})
+
+        assert tdb.aur_apps_batch(["yay"], "agent/1.0") == {}
+
+
+class TestFetchSiteVersionsUsesAurBatch:
+    def test_batch_hit_skips_per_item_fetch(self, tdb, monkeypatch):
+        monkeypatch.setattr(tdb, "aur_apps_batch", MagicMock(return_value={"yay": "12.1.0-1"}))
+        mock_aur_apps = MagicMock(return_value=("2.0.3-1", "https://aur.archlinux.org/packages/paru/"))
+        monkeypatch.setattr(tdb, "aur_apps", mock_aur_apps)
+        site_list = [
+            {"source_site_name": "aur", "source_app_name": "yay"},
+            {"source_site_name": "aur", "source_app_name": "paru"},
+        ]
+
+        results = tdb._fetch_site_versions(tdb._site_specs(site_list), "agent/1.0")
+
+        assert results == [
+            ("12.1.0-1", "https://aur.archlinux.org/packages/yay/"),
+            ("2.0.3-1", "https://aur.archlinux.org/packages/paru/"),
+        ]
+        mock_aur_apps.assert_called_once_with("paru", "agent/1.0")
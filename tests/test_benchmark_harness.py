@@ -0,0 +1,27 @@
+"""Smoke test for the offline benchmark harness: every synthetic site item resolves against the stub."""
+
+import json
+import os
+import subprocess
+import sys
+
+BENCHMARK = os.path.join(os.path.dirname(__file__), "..", "benchmarks", "bench_monitor_sites.py")
+
+
+def test_every_source_resolves_against_the_stub():
+    worker = subprocess.run(
+        [sys.executable, BENCHMARK, "--items", "50", "--runs", "2", "--change-rate", "0.5", "--json"],
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+
+    assert worker.returncode == 0, worker.stderr
+    first, second = json.loads(worker.stdout)
+    assert first["results"] == {"first_seen": 50}
+    # the second run sees changed apps, all others come back unchanged via 304s
+    assert set(second["results"]) <= {"unchanged", "notified", "triggered", "throttled"}
+    assert second["results"].get("notified", 0) + second["results"].get("triggered", 0) > 0
+    assert second["http_requests"] > 0
+    assert second["config_writes"] > 0
+    assert second["p95_item_secs"] >= second["p50_item_secs"] > 0
@@ -0,0 +1,171 @@
+"""Tests for the per-site circuit breaker that replaced check_site's retry loop."""
+
+import datetime as dt
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+
+@pytest.fixture
+def mock_notify(tdb, monkeypatch):
+    mock = MagicMock()
+    monkeypatch.setattr(tdb, "notification_email", mock)
+    return mock
+
+
+def _msg_types(mock_notify):
+    return [c.kwargs.get("msg_type") for c in mock_notify.call_args_list]
+
+
+class TestCircuitState:
+    def test_unknown_site_is_closed(self, tdb):
+        assert tdb._circuit_state("GitHub") == "closed"
+
+    def test_recently_opened_is_open(self, tdb):
+        tdb._site_down_state["GitHub"] = {"is_down": True, "opened_at": dt.datetime.now(dt.UTC)}
+
+        assert tdb._circuit_state("GitHub") == "open"
+
+    def test_half_open_after_open_window(self, tdb, monkeypatch):
+        monkeypatch.setattr(tdb, "circuit_open_mins", 10)
+        opened_at = dt.datetime.now(dt.UTC) - dt.timedelta(minutes=11)
+        tdb._site_down_state["GitHub"] = {"is_down": True, "opened_at": opened_at}
+
+        assert tdb._circuit_state("GitHub") == "half_open"
+
+
+class TestRecordSiteOutcome:
+    def test_opens_after_failure_threshold(self, tdb, mock_notify, monkeypatch):
+        monkeypatch.setattr(tdb, "circuit_failure_threshold", 3)
+
+        assert tdb._record_site_outcome("AUR", "https://aur.archlinux.org", False) is False
+        assert tdb._record_site_outcome("AUR", "https://aur.archlinux.org", False) is False
+        assert tdb._record_site_outcome("AUR", "https://aur.archlinux.org", False) is True
+
+        assert tdb._circuit_state("AUR") == "open"
+        assert _msg_types(mock_notify) == ["site_error"]
+
+    def test_success_resets_failures(self, tdb, mock_notify):
+        tdb._record_site_outcome("AUR", "https://aur.archlinux.org", False)
+        tdb._record_site_outcome("AUR", "https://aur.archlinux.org", True)
+
+        assert tdb._site_down_state["AUR"] == {"is_down": False, "notified_at": None}
+        mock_notify.assert_not_called()
+
+    def test_trip_opens_immediately(self, tdb, mock_notify):
+        assert tdb._record_site_outcome("AUR", "https://aur.archlinux.org", False, trip=True) is True
+
+    def test_half_open_success_sends_recovery(self, tdb, mock_notify):
+        opened_at = dt.datetime.now(dt.UTC) - dt.timedelta(hours=1)
+        tdb._site_down_state["AUR"] = {"is_down": True, "notified_at": opened_at, "opened_at": opened_at}
+
+        tdb._record_site_outcome("AUR", "https://aur.archlinux.org", True)
+
+        assert tdb._circuit_state("AUR") == "closed"
+        assert _msg_types(mock_notify) == ["site_recovered"]
+
+
+class TestHttpClientFeedsBreaker:
+    def test_server_errors_open_breaker(self, tdb, mock_http, mock_notify, monkeypatch):
+        monkeypatch.setattr(tdb, "circuit_failure_threshold", 2)
+        mock_http.get.return_value = MagicMock(status_code=500, content=b"error", headers={})
+
+        for _ in range(2):
+            tdb.http_client(url="https://pypi.org/pypi/a/json", user_agent="agent/1.0", request_type="get")
+
+        assert tdb._circuit_state("PyPi") == "open"
+
+    def test_not_found_does_not_count(self, tdb, mock_http, mock_notify, monkeypatch):
+        monkeypatch.setattr(tdb, "circuit_failure_threshold", 1)
+        mock_http.get.return_value = MagicMock(status_code=404, content=b"missing", headers={})
+
+        tdb.http_client(url="https://pypi.org/pypi/missing/json", user_agent="agent/1.0", request_type="get")
+
+        assert tdb._circuit_state("PyPi") == "closed"
+
+    def test_unknown_host_is_not_tracked(self, tdb, mock_http):
+        mock_http.get.return_value = MagicMock(status_code=500, content=b"error", headers={})
+
+        tdb.http_client(url="https://unknown.example.org/", user_agent="agent/1.0", request_type="get")
+
+        assert tdb._site_down_state == {}
+
+
+class TestCheckSiteNonBlocking:
+    def test_single_probe_without_sleeping(self, tdb, mock_http, mock_notify, mock_time_sleep):
+        mock_http.get.return_value = MagicMock(status_code=500, content=b"error", headers={})
+
+        assert tdb.check_site(url="https://api.github.com", user_agent="agent/1.0", site_name="GitHub") is True
+        assert mock_http.get.call_count == 1
+        mock_time_sleep.assert_not_called()
+
+    def test_open_breaker_skips_probe(self, tdb, mock_http, mock_notify):
+        tdb._site_down_state["GitHub"] = {"is_down": True, "opened_at": dt.datetime.now(dt.UTC)}
+
+        assert tdb.check_site(url="https://api.github.com", user_agent="agent/1.0", site_name="GitHub") is True
+        mock_http.get.assert_not_called()
+
+
+class TestHalfOpenTrial:
+    @pytest.fixture(autouse=True)
+    def half_open_pypi(self, tdb, mock_notify, monkeypatch):
+        monkeypatch.setattr(tdb, "circuit_open_mins", 10)
+        opened_at = dt.datetime.now(dt.UTC) - dt.timedelta(minutes=11)
+        tdb._site_down_state["PyPi"] = {"is_down": True, "notified_at": opened_at, "opened_at": opened_at}
+
+    def _fetch(self, tdb, apps):
+        site_list = [
+            {"source_site_name": "pypi", "source_app_name": app, "target_repo_name": app, "action": "notify"}
+            for app in apps
+        ]
+        return tdb._fetch_site_versions(tdb._site_specs(site_list), "agent/1.0")
+
+    def test_failed_trial_reopens_and_skips_the_rest(self, tdb, monkeypatch):
+        def pypi_apps(app, user_agent):
+            threading.Event().wait(0.1)
+            tdb._record_site_outcome("PyPi", "https://pypi.org/pypi/%s/json" % app, False)
+            return None, None
+
+        pypi_apps = MagicMock(side_effect=pypi_apps)
+        monkeypatch.setattr(tdb, "pypi_apps", pypi_apps)
+
+        self._fetch(tdb, ["a", "b", "c", "d"])
+
+        pypi_apps.assert_called_once()
+        assert tdb._circuit_state("PyPi") == "open"
+
+    def test_successful_trial_lets_the_rest_through(self, tdb, monkeypatch):
+        states = []
+
+        def pypi_apps(app, user_agent):
+            states.append(tdb._circuit_state("PyPi"))
+            if len(states) == 1:
+                # give the other fetch workers time to pile in behind the trial
+                threading.Event().wait(0.2)
+            tdb._record_site_outcome("PyPi", "https://pypi.org/pypi/%s/json" % app, True)
+            return "1.0", None
+
+        monkeypatch.setattr(tdb, "pypi_apps", pypi_apps)
+
+        results = self._fetch(tdb, ["a", "b", "c", "d"])
+
+        assert states == ["half_open", "closed", "closed", "closed"]
+        assert [version for version, _ in results] == ["1.0"] * 4
+
+
+class TestMonitorSitesSkipsOpenSite:
+    def test_items_on_site_opened_mid_run_are_skipped(self, tdb, mock_notify, monkeypatch):
+        monkeypatch.setattr(tdb, "check_site", MagicMock(return_value=False))
+        tdb._site_down_state["AUR"] = {"is_down": True, "opened_at": dt.datetime.now(dt.UTC)}
+        mock_aur_apps = MagicMock(return_value=(None, None))
+        monkeypatch.setattr(tdb, "aur_apps", mock_aur_apps)
+        monkeypatch.setattr(tdb, "aur_apps_batch", MagicMock(return_value={}))
+        tdb.config_obj["monitor_sites"]["site_list"] = [
+            {"source_site_name": "aur", "source_app_name": "yay", "target_repo_name": "docker-yay", "action": "notify"}
+        ]
+
+        tdb.monitor_sites()
+
+        mock_aur_apps.assert_not_called()
+        assert "app_error" not in _msg_types(mock_notify)
@@ -0,0 +1,104 @@
+"""Tests for the concurrent fetch stage of monitor_sites."""
+
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+
+def _site(app, site="github", **extra):
+    item = {
+        "source_site_name": site,
+        "source_app_name": app,
+        "source_repo_name": "owner",
+        "source_query_type": "release",
+        "target_repo_name": "docker-%s" % app,
+        "action": "notify",
+    }
+    item.update(extra)
+    return item
+
+
+class TestFetchSiteVersions:
+    def test_results_keep_site_list_order(self, tdb, monkeypatch):
+        """Slow early items must not reorder results."""
+
+        def fake_github_apps(source_app_name, *args):
+            # time.sleep is mocked globally, so block on an event instead
+            threading.Event().wait(0.02 if source_app_name == "a" else 0)
+            return "v-%s" % source_app_name, "https://github.com/owner/%s" % source_app_name
+
+        monkeypatch.setattr(tdb, "github_apps", fake_github_apps)
+        site_list = [_site("a"), _site("b"), _site("c")]
+
+        results = tdb._fetch_site_versions(tdb._site_specs(site_list), "agent/1.0")
+
+        assert [version for version, _ in results] == ["v-a", "v-b", "v-c"]
+
+    def test_per_source_concurrency_cap(self, tdb, monkeypatch):
+        """No more than max_concurrency fetches run at once for one source."""
+        monkeypatch.setattr(tdb, "source_settings", {"aur": {"max_concurrency": 2}})
+        monkeypatch.setattr(tdb, "fetch_workers", 8)
+        lock = threading.Lock()
+        state = {"active": 0, "peak": 0}
+
+        def fake_aur_apps(source_app_name, user_agent):
+            with lock:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+            threading.Event().wait(0.02)
+            with lock:
+                state["active"] -= 1
+            return "1.0", "https://aur.archlinux.org/packages/%s/" % source_app_name
+
+        monkeypatch.setattr(tdb, "aur_apps", fake_aur_apps)
+
+        tdb._fetch_site_versions(tdb._site_specs([_site("pkg%d" % i, site="aur") for i in range(6)]), "agent/1.0")
+
+        assert state["peak"] <= 2
+
+    def test_empty_list_returns_empty(self, tdb):
+        assert tdb._fetch_site_versions(tdb._site_specs([]), "agent/1.0") == []
+
+    def test_source_setting_falls_back_to_defaults(self, tdb, monkeypatch):
+        monkeypatch.setattr(tdb, "source_settings", {"github": {"max_concurrency": 3}})
+
+        assert tdb._source_setting("github", "max_concurrency") == 3
+        assert tdb._source_setting("aur", "max_concurrency") == 4
+        assert tdb._source_setting("unknown", "max_concurrency") == 4
+
+
+class TestSkipSiteItem:
+    def test_missing_target_branch_is_config_error(self, tdb, monkeypatch):
+        mock_notify = MagicMock()
+        monkeypatch.setattr(tdb, "notification_email", mock_notify)
+
+        assert tdb._skip_site_item(tdb._compile_site_spec(_site("a", action="trigger")), {}) is True
+        assert mock_notify.call_args.kwargs["msg_type"] == "config_error"
+
+    def test_down_site_is_skipped(self, tdb):
+        assert tdb._skip_site_item(tdb._compile_site_spec(_site("a")), {"github": True}) is True
+
+    def test_unknown_site_is_skipped(self, tdb):
+        assert tdb._skip_site_item(tdb._compile_site_spec(_site("a", site="sourceforge")), {}) is True
+
+    def test_healthy_item_is_fetched(self, tdb):
+        assert tdb._skip_site_item(tdb._compile_site_spec(_site("a")), {"github": False}) is False
+
+
+class TestMonitorSitesConcurrentFetch:
+    @pytest.fixture(autouse=True)
+    def reset_state(self, tdb, monkeypatch):
+        tdb._app_down_counters.clear()
+        tdb._site_down_state.clear()
+        monkeypatch.setattr(tdb, "check_site", MagicMock(return_value=False))
+
+    def test_results_written_for_every_item(self, tdb, monkeypatch):
+        monkeypatch.setattr(tdb, "github_apps", lambda app, *args: ("v-%s" % app, "https://github.com/%s" % app))
+        tdb.config_obj["monitor_sites"]["site_list"] = [_site("a"), _site("b")]
+
+        tdb.monitor_sites()
+
+        results = tdb.config_obj["results"]
+        assert results["github_a_docker-a_current_version"] == "v-a"
+        assert results["github_b_docker-b_current_version"] == "v-b"
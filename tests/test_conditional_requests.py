@@ -0,0 +1,108 @@
+"""Tests for conditional requests (ETag / Last-Modified) and the validator cache."""
+
+import json
+from unittest.mock import MagicMock
+
+PYPI_URL = "https://pypi.org/pypi/requests/json"
+
+
+def _response(status_code, content=b"", headers=None):
+    return MagicMock(status_code=status_code, content=content, headers=headers or {})
+
+
+class TestConditionalHttpClient:
+    def test_no_validators_sent_without_cached_version(self, tdb, mock_http):
+        mock_http.get.return_value = _response(200, b"{}", {"ETag": '"abc"'})
+
+        tdb.http_client(url=PYPI_URL, user_agent="agent/1.0", request_type="get", conditional=True)
+
+        assert "If-None-Match" not in mock_http.get.call_args.kwargs["headers"]
+        assert tdb._validator_cache[PYPI_URL] == {"etag": '"abc"', "last_modified": None, "version": None}
+
+    def test_validators_sent_once_version_cached(self, tdb, mock_http):
+        tdb._validator_cache[PYPI_URL] = {"etag": '"abc"', "last_modified": "Mon, 01 Jan 2024", "version": "2.31.0"}
+        mock_http.get.return_value = _response(304)
+
+        return_code, status_code, content = tdb.http_client(
+            url=PYPI_URL, user_agent="agent/1.0", request_type="get", conditional=True
+        )
+
+        headers = mock_http.get.call_args.kwargs["headers"]
+        assert headers["If-None-Match"] == '"abc"'
+        assert headers["If-Modified-Since"] == "Mon, 01 Jan 2024"
+        assert (return_code, status_code) == (0, 304)
+
+    def test_non_conditional_304_is_an_error(self, tdb, mock_http):
+        mock_http.get.return_value = _response(304)
+
+        return_code, status_code, content = tdb.http_client(url=PYPI_URL, user_agent="agent/1.0", request_type="get")
+
+        assert return_code == 1
+
+    def test_disabled_by_config(self, tdb, mock_http, monkeypatch):
+        monkeypatch.setattr(tdb, "http_conditional_requests", False)
+        tdb._validator_cache[PYPI_URL] = {"etag": '"abc"', "last_modified": None, "version": "2.31.0"}
+        mock_http.get.return_value = _response(200, b"{}")
+
+        tdb.http_client(url=PYPI_URL, user_agent="agent/1.0", request_type="get", conditional=True)
+
+        assert "If-None-Match" not in mock_http.get.call_args.kwargs["headers"]
+
+
+class TestConditionalFetchers:
+    def test_pypi_full_response_caches_version(self, tdb, mock_http):
+        mock_http.get.return_value = _response(200, headers={"ETag": '"v1"'})
+        mock_http.get.return_value.iter_content.return_value = [json.dumps({"info": {"version": "2.31.0"}}).encode()]
+
+        version, _ = tdb.pypi_apps("requests", "agent/1.0")
+
+        assert version == "2.31.0"
+        assert tdb._cached_version(PYPI_URL) == "2.31.0"
+
+    def test_pypi_304_returns_cached_version(self, tdb, mock_http):
+        tdb._validator_cache[PYPI_URL] = {"etag": '"v1"', "last_modified": None, "version": "2.31.0"}
+        mock_http.get.return_value = _response(304)
+
+        version, _ = tdb.pypi_apps("requests", "agent/1.0")
+
+        assert version == "2.31.0"
+
+    def test_github_branch_304_keeps_branch_url(self, tdb, mock_http):
+        mock_http.get.return_value = _response(200, b"abc1234", {"ETag": 'W/"1"'})
+        version, url = tdb.github_apps("app", "branch", "owner", "agent/1.0", "main")
+        mock_http.get.return_value = _response(304)
+
+        cached_version, cached_url = tdb.github_apps("app", "branch", "owner", "agent/1.0", "main")
+
+        assert cached_version == version == "abc1234"
+        assert cached_url == url
+
+
+class TestValidatorCachePersistence:
+    def test_save_and_load_round_trip(self, tdb, tmp_path, monkeypatch):
+        cache_file = tmp_path / "validator_cache.json"
+        monkeypatch.setattr(tdb, "validator_cache_file", str(cache_file))
+        tdb._store_validators(PYPI_URL, {"ETag": '"v1"'})
+        tdb._cache_version(PYPI_URL, "2.31.0")
+
+        tdb._save_validator_cache()
+        tdb._validator_cache.clear()
+        tdb._load_validator_cache()
+
+        assert tdb._cached_version(PYPI_URL) == "2.31.0"
+
+    def test_corrupt_cache_file_starts_empty(self, tdb, tmp_path, monkeypatch):
+        cache_file = tmp_path / "validator_cache.json"
+        cache_file.write_text("not json")
+        monkeypatch.setattr(tdb, "validator_cache_file", str(cache_file))
+
+        tdb._load_validator_cache()
+
+        assert tdb._validator_cache == {}
+
+    def test_response_without_validators_drops_entry(self, tdb):
+        tdb._validator_cache[PYPI_URL] = {"etag": '"v1"', "last_modified": None, "version": "2.31.0"}
+
+        tdb._store_validators(PYPI_URL, {})
+
+        assert PYPI_URL not in tdb._validator_cache
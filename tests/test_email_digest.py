@@ -0,0 +1,97 @@
+"""Tests for digest mode, one summary email per run instead of one email per event."""
+
+import pytest
+
+
+def _version_change(app, action="notify"):
+    return {
+        "action": action,
+        "source_app_name": app,
+        "source_site_name": "pypi",
+        "target_repo_name": app,
+        "previous_version": "1.0",
+        "current_version": "2.0",
+    }
+
+
+def _sent_subjects(mock_yagmail):
+    return [call.kwargs["subject"] for call in mock_yagmail.return_value.prepare_send.call_args_list]
+
+
+class TestEmailDigest:
+    @pytest.fixture(autouse=True)
+    def enable_digest(self, tdb, monkeypatch):
+        tdb.email_notification = True
+        monkeypatch.setattr(tdb, "email_digest", True)
+
+    def test_messages_are_collected_until_the_digest_is_sent(self, tdb, mock_yagmail):
+        tdb._start_digest()
+
+        assert tdb.notification_email(**_version_change("first")) == 0
+        assert tdb.notification_email(msg_type="app_error", source_app_name="second", error_msg="boom") == 0
+        mock_yagmail.return_value.prepare_send.assert_not_called()
+
+        assert tdb._send_digest() == 0
+
+        assert _sent_subjects(mock_yagmail) == ["TriggerDockerBuild digest - 1 version changes, 1 errors"]
+        html = mock_yagmail.return_value.prepare_send.call_args.kwargs["contents"][0]
+        assert html.index("Version changes") < html.index("first [notify] - updated to 2.0") < html.index("Errors")
+        assert "second - app_error" in html
+        assert tdb._digest_entries is None
+
+    def test_immediate_types_are_sent_straight_away(self, tdb, mock_yagmail, monkeypatch):
+        monkeypatch.setattr(tdb, "digest_immediate_types", ["site_error", "trigger"])
+        tdb._start_digest()
+
+        tdb.notification_email(msg_type="site_error", source_site_name="github", error_msg="down")
+        tdb.notification_email(**_version_change("app", action="trigger"))
+        tdb.notification_email(msg_type="site_recovered", source_site_name="gitlab", error_msg="up")
+
+        assert _sent_subjects(mock_yagmail) == ["github - site_error", "app [trigger] - updated to 2.0"]
+        assert tdb._digest_entries == [{"msg_type": "site_recovered", "source_site_name": "gitlab", "error_msg": "up"}]
+
+    def test_digest_fields_are_escaped(self, tdb, mock_yagmail):
+        tdb._start_digest()
+        tdb.notification_email(msg_type="app_error", source_app_name="<evil>", error_msg="<script>")
+
+        tdb._send_digest()
+
+        html = mock_yagmail.return_value.prepare_send.call_args.kwargs["contents"][0]
+        assert "&lt;evil&gt;" in html
+        assert "<script>" not in html
+
+    def test_quiet_run_sends_nothing(self, tdb, mock_yagmail):
+        tdb._start_digest()
+
+        assert tdb._send_digest() is None
+        mock_yagmail.assert_not_called()
+
+    def test_disabled_digest_sends_each_message(self, tdb, mock_yagmail, monkeypatch):
+        monkeypatch.setattr(tdb, "email_digest", False)
+        tdb._start_digest()
+
+        tdb.notification_email(**_version_change("first"))
+        tdb.notification_email(**_version_change("second"))
+
+        assert len(_sent_subjects(mock_yagmail)) == 2
+        assert tdb._send_digest() is None
+
+    def test_run_sends_one_digest(self, tdb, mock_yagmail, monkeypatch):
+        site_list = [
+            {"source_site_name": "pypi", "source_app_name": app, "target_repo_name": app, "action": "notify"}
+            for app in ("first", "second", "third")
+        ]
+        monkeypatch.setattr(tdb, "_probe_sites", lambda names, ua: dict.fromkeys(names, False))
+        monkeypatch.setattr(
+            tdb,
+            "_iter_site_versions",
+            lambda site_specs, ua: ((site_spec, ("2.0", "https://pypi.org")) for site_spec in site_specs),
+        )
+        tdb.config_obj["monitor_sites"]["site_list"] = site_list
+        for site_item in site_list:
+            tdb._record_previous_version(tdb._compile_site_spec(site_item), "1.0", "notify")
+
+        tdb.monitor_sites()
+
+        assert _sent_subjects(mock_yagmail) == ["TriggerDockerBuild digest - 3 version changes"]
+        mock_yagmail.return_value.close.assert_called_once()
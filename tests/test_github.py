@@ -109,6 +109,8 @@ class TestCheckSite:
             header = call[0][0] if call[0] else {}
             if isinstance(header, dict):
                 assert "Authorization" not in header
+        for call in mock_http.get.call_args_list:
+            assert "Authorization" not in (call.kwargs.get("headers") or {})
 
 
 class TestGithubCreateRelease:
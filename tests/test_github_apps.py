@@ -49,19 +49,39 @@ class TestGithubApps:
         assert "releases" in url
 
     def test_branch_query_type_with_branch_name(self, tdb, mock_http):
-        """Branch query with source_branch_name appends ?sha= parameter."""
+        """Branch query reads the bare head SHA of /commits/<branch>."""
         mock_http.get.return_value.status_code = 200
-        mock_http.get.return_value.content = json.dumps(
-            [
-                {"sha": "abc123def456"},
-            ]
-        )
+        mock_http.get.return_value.content = b"abc123def456\n"
 
         version, url = tdb.github_apps("myapp", "branch", "owner/repo", "agent/1.0", "develop")
 
         assert version == "abc123def456"
         assert "develop" in url
         assert "commits" in url
+        request = mock_http.get.call_args.kwargs
+        assert request["url"] == "https://api.github.com/repos/owner/repo/myapp/commits/develop"
+        assert request["headers"]["Accept"] == "application/vnd.github.sha"
+
+    def test_branch_query_rejects_non_sha_body(self, tdb, mock_http):
+        """A body that is not a commit SHA is a parse failure, not a version."""
+        mock_http.get.return_value.status_code = 200
+        mock_http.get.return_value.content = b'{"message": "unexpected"}'
+
+        version, _ = tdb.github_apps("myapp", "branch", "owner/repo", "agent/1.0", "develop")
+
+        assert version is None
+
+    def test_list_queries_request_a_single_entry(self, tdb, mock_http):
+        """Tags and releases only ever read the newest entry, so only one is requested."""
+        mock_http.get.return_value.status_code = 200
+        mock_http.get.return_value.content = json.dumps([{"name": "v2.0.0", "tag_name": "v2.0.0"}])
+
+        tdb.github_apps("myapp", "tag", "owner", "agent/1.0", None)
+        assert mock_http.get.call_args.kwargs["url"] == "https://api.github.com/repos/owner/myapp/tags?per_page=1"
+
+        tdb.github_apps("myapp", "pre-release", "owner", "agent/1.0", None)
+        assert mock_http.get.call_args.kwargs["url"] == "https://api.github.com/repos/owner/myapp/releases?per_page=1"
+        assert "Accept" not in mock_http.get.call_args.kwargs["headers"]
 
     def test_unknown_query_type_returns_none(self, tdb, mock_http):
         """Unknown query type warns and returns None."""
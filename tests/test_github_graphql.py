@@ -0,0 +1,147 @@
+"""Tests for the GitHub GraphQL batch resolver."""
+
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+
+def _item(app, query_type="release", branch=None, **extra):
+    item = {
+        "source_site_name": "github",
+        "source_repo_name": "owner",
+        "source_app_name": app,
+        "source_query_type": query_type,
+        "target_repo_name": "docker-%s" % app,
+        "action": "notify",
+    }
+    if branch:
+        item["source_branch_name"] = branch
+    item.update(extra)
+    return item
+
+
+def _graphql_response(data, errors=None):
+    body = {"data": data}
+    if errors:
+        body["errors"] = errors
+    return MagicMock(status_code=200, content=json.dumps(body).encode(), headers={})
+
+
+@pytest.fixture(autouse=True)
+def clear_target_info(tdb):
+    tdb._github_target_info.clear()
+
+
+class TestGithubAppsBatch:
+    def test_resolves_release_prerelease_and_branch(self, tdb, mock_http):
+        mock_http.post.return_value = _graphql_response(
+            {
+                "s0": {"latestRelease": {"tagName": "v1.0.0"}},
+                "s1": {"releases": {"nodes": [{"tagName": "v2.0.0-rc1"}]}},
+                "s2": {"ref": {"target": {"oid": "abc123"}}},
+            }
+        )
+        items = [_item("a"), _item("b", "pre-release"), _item("c", "branch", "main")]
+
+        versions = tdb.github_apps_batch(tdb._site_specs(items), [], "agent/1.0")
+
+        assert versions == {
+            ("github", "owner", "a", "release", None): "v1.0.0",
+            ("github", "owner", "b", "pre-release", None): "v2.0.0-rc1",
+            ("github", "owner", "c", "branch", "main"): "abc123",
+        }
+        assert mock_http.post.call_count == 1
+        query = mock_http.post.call_args.kwargs["json"]["query"]
+        assert 's2: repository(owner: "owner", name: "c")' in query
+        assert '"refs/heads/main"' in query
+
+    def test_tags_are_left_for_rest(self, tdb, mock_http):
+        assert tdb.github_apps_batch(tdb._site_specs([_item("a", "tag")]), [], "agent/1.0") == {}
+        mock_http.post.assert_not_called()
+
+    def test_partial_errors_keep_resolved_items(self, tdb, mock_http):
+        mock_http.post.return_value = _graphql_response(
+            {"s0": {"latestRelease": {"tagName": "v1.0.0"}}, "s1": None},
+            errors=[{"message": "Could not resolve to a Repository"}],
+        )
+
+        versions = tdb.github_apps_batch(tdb._site_specs([_item("a"), _item("gone")]), [], "agent/1.0")
+
+        assert list(versions.values()) == ["v1.0.0"]
+
+    def test_query_failure_returns_empty(self, tdb, mock_http):
+        mock_http.post.return_value = MagicMock(status_code=502, content=b"bad gateway", headers={})
+
+        assert tdb.github_apps_batch(tdb._site_specs([_item("a")]), [], "agent/1.0") == {}
+
+    def test_chunks_large_batches(self, tdb, mock_http, monkeypatch):
+        monkeypatch.setattr(tdb, "GITHUB_GRAPHQL_BATCH_SIZE", 2)
+        mock_http.post.return_value = _graphql_response({})
+
+        tdb.github_apps_batch(tdb._site_specs([_item("app%d" % i) for i in range(5)]), [], "agent/1.0")
+
+        assert mock_http.post.call_count == 3
+
+    def test_target_repo_details_recorded(self, tdb, mock_http):
+        mock_http.post.return_value = _graphql_response(
+            {
+                "t0": {
+                    "latestRelease": {"publishedAt": "2024-01-02T03:04:05Z"},
+                    "defaultBranchRef": {"name": "main"},
+                    "ref": None,
+                }
+            }
+        )
+
+        tdb.github_apps_batch(tdb._site_specs([]), [("binhex", "arch-app", "master")], "agent/1.0")
+
+        assert tdb._github_target_info[("binhex", "arch-app")] == {
+            "published_at": "2024-01-02T03:04:05Z",
+            "default_branch": "main",
+            "branches": {"master": False},
+        }
+
+
+class TestTargetInfoConsumers:
+    def test_last_release_date_uses_graphql_result(self, tdb, mock_http):
+        tdb._github_target_info[("binhex", "arch-app")] = {"published_at": "2024-01-02T03:04:05Z", "branches": {}}
+
+        assert tdb.github_target_last_release_date("binhex", "arch-app", "agent/1.0") == (0, "2024-01-02T03:04:05Z")
+        mock_http.get.assert_not_called()
+
+    def test_create_release_skips_missing_branch(self, tdb, mock_http):
+        tdb._github_target_info[("binhex", "arch-app")] = {"branches": {"master": False}}
+        mock_http.post.return_value = MagicMock(status_code=201, content=b"{}", headers={})
+
+        tdb.github_create_release("1.0.0", "master", "binhex", "arch-app", "agent/1.0")
+
+        assert mock_http.post.call_count == 1
+        assert mock_http.post.call_args.kwargs["json"]["target_commitish"] == ""
+        assert ("binhex", "arch-app") not in tdb._github_target_info
+
+
+class TestFetchSiteVersionsUsesGraphql:
+    def test_used_at_threshold_with_rest_fallback(self, tdb, monkeypatch):
+        monkeypatch.setattr(tdb, "source_settings", {"github": {"graphql_min_items": 2}})
+        monkeypatch.setattr(
+            tdb, "github_apps_batch", MagicMock(return_value={("github", "owner", "a", "release", None): "v1"})
+        )
+        mock_rest = MagicMock(return_value=("v2", "https://github.com/owner/b/releases/latest"))
+        monkeypatch.setattr(tdb, "github_apps", mock_rest)
+
+        results = tdb._fetch_site_versions(tdb._site_specs([_item("a"), _item("b")]), "agent/1.0")
+
+        assert results[0] == ("v1", "https://github.com/owner/a/releases/latest")
+        assert results[1][0] == "v2"
+        mock_rest.assert_called_once()
+
+    def test_not_used_below_threshold(self, tdb, monkeypatch):
+        monkeypatch.setattr(tdb, "source_settings", {"github": {"graphql_min_items": 5}})
+        mock_batch = MagicMock()
+        monkeypatch.setattr(tdb, "github_apps_batch", mock_batch)
+        monkeypatch.setattr(tdb, "github_apps", MagicMock(return_value=("v1", "url")))
+
+        tdb._fetch_site_versions(tdb._site_specs([_item("a")]), "agent/1.0")
+
+        mock_batch.assert_not_called()
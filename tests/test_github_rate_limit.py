@@ -0,0 +1,134 @@
+"""Tests for the shared GitHub rate-limit governor."""
+
+import time
+from unittest.mock import MagicMock
+
+GITHUB_URL = "https://api.github.com/repos/owner/app/releases/latest"
+
+
+def _response(status_code=200, content=b"{}", **headers):
+    return MagicMock(status_code=status_code, content=content, headers=headers)
+
+
+class TestRateLimitResource:
+    def test_resources(self, tdb):
+        assert tdb._github_rate_limit_resource(GITHUB_URL) == "core"
+        assert tdb._github_rate_limit_resource("https://api.github.com/graphql") == "graphql"
+        assert tdb._github_rate_limit_resource("https://pypi.org/pypi/a/json") is None
+
+
+class TestBudgetTracking:
+    def test_headers_recorded(self, tdb, mock_http):
+        reset = str(int(time.time()) + 600)
+        mock_http.get.return_value = _response(
+            **{"X-RateLimit-Remaining": "4999", "X-RateLimit-Limit": "5000", "X-RateLimit-Reset": reset}
+        )
+
+        tdb.http_client(url=GITHUB_URL, user_agent="agent/1.0", request_type="get")
+
+        assert tdb._github_rate_limit["core"] == {"remaining": 4999, "limit": 5000, "reset": int(reset)}
+
+    def test_secondary_rate_limit_sets_retry_after(self, tdb, mock_http):
+        mock_http.get.return_value = _response(
+            403, b'{"message": "You have exceeded a secondary rate limit"}', **{"Retry-After": "120"}
+        )
+
+        tdb.http_client(url=GITHUB_URL, user_agent="agent/1.0", request_type="get")
+
+        assert tdb._github_rate_limit["core"]["retry_after_until"] > time.time() + 100
+
+    def test_non_github_hosts_ignored(self, tdb, mock_http):
+        mock_http.get.return_value = _response(**{"X-RateLimit-Remaining": "1"})
+
+        tdb.http_client(url="https://pypi.org/pypi/a/json", user_agent="agent/1.0", request_type="get")
+
+        assert tdb._github_rate_limit == {}
+
+
+class TestGovernor:
+    def test_low_priority_deferred_at_reserve(self, tdb, mock_http):
+        tdb._github_rate_limit["core"] = {"remaining": 10, "reset": time.time() + 3600}
+
+        return_code, status_code, content = tdb.http_client(url=GITHUB_URL, user_agent="agent/1.0", request_type="get")
+
+        assert return_code == 1
+        assert tdb._github_rate_limited() is True
+        mock_http.get.assert_not_called()
+
+    def test_high_priority_uses_reserve(self, tdb, mock_http):
+        tdb._github_rate_limit["core"] = {"remaining": 10, "reset": time.time() + 3600}
+        mock_http.post.return_value = _response(201)
+
+        return_code, status_code, content = tdb.http_client(
+            url="https://api.github.com/repos/owner/app/releases",
+            user_agent="agent/1.0",
+            request_type="post",
+            json_payload={},
+            priority="high",
+        )
+
+        assert return_code == 0
+        assert tdb._github_rate_limit["core"]["remaining"] == 9
+
+    def test_paces_near_reserve(self, tdb, mock_http, mock_time_sleep):
+        tdb._github_rate_limit["core"] = {"remaining": 60, "reset": time.time() + 100}
+        mock_http.get.return_value = _response()
+
+        tdb.http_client(url=GITHUB_URL, user_agent="agent/1.0", request_type="get")
+
+        (wait_secs,), _ = mock_time_sleep.call_args
+        assert 0 < wait_secs <= 10
+
+    def test_short_retry_after_is_waited_out(self, tdb, mock_http, mock_time_sleep):
+        tdb._github_rate_limit["core"] = {"retry_after_until": time.time() + 30}
+        mock_http.get.return_value = _response()
+
+        return_code, status_code, content = tdb.http_client(url=GITHUB_URL, user_agent="agent/1.0", request_type="get")
+
+        assert return_code == 0
+        mock_time_sleep.assert_called_once()
+
+    def test_plenty_of_budget_no_wait(self, tdb):
+        tdb._github_rate_limit["core"] = {"remaining": 4000, "reset": time.time() + 3600}
+
+        assert tdb._github_rate_limit_wait("core", "low") == 0
+
+
+class TestMonitorSitesDefersGithub:
+    def test_deferred_item_sends_no_app_error(self, tdb, monkeypatch):
+        monkeypatch.setattr(tdb, "check_site", MagicMock(return_value=False))
+        mock_notify = MagicMock()
+        monkeypatch.setattr(tdb, "notification_email", mock_notify)
+        mock_github_apps = MagicMock()
+        monkeypatch.setattr(tdb, "github_apps", mock_github_apps)
+        tdb._github_rate_limit["core"] = {"remaining": 0, "reset": time.time() + 3600}
+        tdb.config_obj["monitor_sites"]["site_list"] = [
+            {
+                "source_site_name": "github",
+                "source_app_name": "app",
+                "source_repo_name": "owner",
+                "source_query_type": "release",
+                "target_repo_name": "docker-app",
+                "action": "notify",
+            }
+        ]
+
+        tdb.monitor_sites()
+
+        mock_github_apps.assert_not_called()
+        mock_notify.assert_not_called()
+
+
+class TestHealthProbe:
+    def test_probe_at_reserve_is_not_an_outage(self, tdb, mock_http, monkeypatch):
+        mock_notify = MagicMock()
+        monkeypatch.setattr(tdb, "notification_email", mock_notify)
+        tdb._github_rate_limit["core"] = {"remaining": 10, "reset": time.time() + 3600}
+        mock_http.get.return_value = _response()
+
+        site_down = tdb.check_site(url="https://api.github.com", user_agent="agent/1.0", site_name="github")
+
+        assert site_down is False
+        mock_http.get.assert_called_once()
+        assert tdb._circuit_state("github") == "closed"
+        mock_notify.assert_not_called()
@@ -0,0 +1,175 @@
+"""Tests for the per-source retry policy in _execute_http_request.
+
+Transient failures (429, 5xx, connection resets and timeouts) are retried with exponential
+backoff and full jitter, honoring Retry-After. POSTs are only retried when they are safe to
+repeat, and release creation checks whether a lost attempt already created the release.
+"""
+
+import email.utils
+import time
+from unittest.mock import MagicMock
+
+import requests
+
+PYPI_URL = "https://pypi.org/pypi/requests/json"
+
+
+def _ok():
+    return MagicMock(status_code=200, content=b'{"info":{"version":"2.0"}}', headers={})
+
+
+class TestRetryPolicy:
+    def test_source_defaults_and_overrides(self, tdb, monkeypatch):
+        assert tdb._retry_policy(PYPI_URL) == (3, 2.0, 30.0)
+
+        monkeypatch.setattr(tdb, "source_settings", {"pypi": {"max_attempts": 5, "max_delay_secs": 10.0}})
+
+        assert tdb._retry_policy(PYPI_URL) == (5, 2.0, 10.0)
+        # other sources and unknown hosts keep the defaults
+        assert tdb._retry_policy("https://gitlab.com/api/v4/projects") == (3, 2.0, 30.0)
+        assert tdb._retry_policy("http://kodi.local:8080/jsonrpc") == (3, 2.0, 30.0)
+
+    def test_jittered_delay_is_capped(self, tdb, mock_http, mock_time_sleep, monkeypatch):
+        monkeypatch.setattr(
+            tdb, "source_settings", {"pypi": {"max_attempts": 6, "base_delay_secs": 1.0, "max_delay_secs": 3.0}}
+        )
+        monkeypatch.setattr(tdb.backoff, "full_jitter", lambda value: value)
+        mock_http.get.side_effect = [MagicMock(status_code=503, content=b"", headers={})] * 5 + [_ok()]
+
+        return_code, status_code, _ = tdb.http_client(url=PYPI_URL, user_agent="agent/1.0", request_type="get")
+
+        assert (return_code, status_code) == (0, 200)
+        assert [c.args[0] for c in mock_time_sleep.call_args_list] == [1.0, 2.0, 3.0, 3.0, 3.0]
+
+
+class TestRetryConditions:
+    def test_429_honors_retry_after(self, tdb, mock_http, mock_time_sleep):
+        mock_http.get.side_effect = [
+            MagicMock(status_code=429, content=b"slow down", headers={"Retry-After": "7"}),
+            _ok(),
+        ]
+
+        return_code, _, _ = tdb.http_client(url=PYPI_URL, user_agent="agent/1.0", request_type="get")
+
+        assert return_code == 0
+        mock_time_sleep.assert_called_once_with(7.0)
+
+    def test_retry_after_beyond_max_delay_gives_up(self, tdb, mock_http, mock_time_sleep):
+        mock_http.get.return_value = MagicMock(status_code=503, content=b"", headers={"Retry-After": "3600"})
+
+        return_code, status_code, _ = tdb.http_client(url=PYPI_URL, user_agent="agent/1.0", request_type="get")
+
+        assert (return_code, status_code) == (1, 503)
+        assert mock_http.get.call_count == 1
+        mock_time_sleep.assert_not_called()
+
+    def test_github_secondary_rate_limit_403_is_retried(self, tdb, mock_http, mock_time_sleep):
+        mock_http.get.side_effect = [
+            MagicMock(status_code=403, content=b"secondary", headers={"Retry-After": "1"}),
+            _ok(),
+        ]
+
+        return_code, _, _ = tdb.http_client(
+            url="https://api.github.com/repos/a/b/releases", user_agent="agent/1.0", request_type="get"
+        )
+
+        assert return_code == 0
+        assert mock_http.get.call_count == 2
+
+    def test_plain_403_is_not_retried(self, tdb, mock_http):
+        mock_http.get.return_value = MagicMock(status_code=403, content=b"forbidden", headers={})
+
+        tdb.http_client(url=PYPI_URL, user_agent="agent/1.0", request_type="get")
+
+        assert mock_http.get.call_count == 1
+
+    def test_connection_reset_then_success(self, tdb, mock_http):
+        mock_http.get.side_effect = [requests.exceptions.ConnectionError("reset by peer"), _ok()]
+
+        return_code, status_code, _ = tdb.http_client(url=PYPI_URL, user_agent="agent/1.0", request_type="get")
+
+        assert (return_code, status_code) == (0, 200)
+        assert mock_http.get.call_count == 2
+
+    def test_timeouts_exhaust_attempts(self, tdb, mock_http):
+        mock_http.get.side_effect = requests.exceptions.ReadTimeout("read timeout")
+
+        return_code, _, content = tdb.http_client(url=PYPI_URL, user_agent="agent/1.0", request_type="get")
+
+        assert return_code == 1
+        assert isinstance(content, requests.exceptions.ReadTimeout)
+        assert mock_http.get.call_count == 3
+
+    def test_retry_false_sends_single_attempt(self, tdb, mock_http):
+        mock_http.get.return_value = MagicMock(status_code=502, content=b"", headers={})
+
+        tdb.http_client(url=PYPI_URL, user_agent="agent/1.0", request_type="get", retry=False)
+
+        assert mock_http.get.call_count == 1
+
+
+class TestPostRetries:
+    def test_plain_post_is_not_retried(self, tdb, mock_http):
+        mock_http.post.side_effect = requests.exceptions.ReadTimeout("read timeout")
+
+        return_code, _, _ = tdb.http_client(
+            url="https://example.org/hook", user_agent="agent/1.0", request_type="post", json_payload={}
+        )
+
+        assert return_code == 1
+        assert mock_http.post.call_count == 1
+
+    def test_idempotent_post_is_retried(self, tdb, mock_http):
+        mock_http.post.side_effect = [MagicMock(status_code=502, content=b"", headers={}), _ok()]
+
+        return_code, _, _ = tdb.http_client(
+            url="https://api.github.com/graphql",
+            user_agent="agent/1.0",
+            request_type="post",
+            json_payload={"query": "{}"},
+            idempotent=True,
+        )
+
+        assert return_code == 0
+        assert mock_http.post.call_count == 2
+
+    def test_release_not_reposted_when_lost_attempt_landed(self, tdb, mock_http):
+        mock_http.post.side_effect = [requests.exceptions.ReadTimeout("read timeout")]
+        mock_http.get.return_value = MagicMock(status_code=200, content=b'{"tag_name":"2.0-01"}', headers={})
+
+        return_code, status_code, _ = tdb.github_create_release("2.0", "main", "binhex", "arch-app", "agent/1.0")
+
+        assert (return_code, status_code) == (0, 201)
+        assert mock_http.post.call_count == 1
+        assert (
+            mock_http.get.call_args.kwargs["url"] == "https://api.github.com/repos/binhex/arch-app/releases/tags/2.0-01"
+        )
+
+    def test_release_reposted_when_lost_attempt_did_not_land(self, tdb, mock_http):
+        mock_http.post.side_effect = [
+            MagicMock(status_code=502, content=b"", headers={}),
+            MagicMock(status_code=201, content=b'{"html_url":"https://x"}', headers={}),
+        ]
+        mock_http.get.return_value = MagicMock(status_code=404, content=b"not found", headers={})
+
+        return_code, status_code, _ = tdb.github_create_release("2.0", "main", "binhex", "arch-app", "agent/1.0")
+
+        assert (return_code, status_code) == (0, 201)
+        assert mock_http.post.call_count == 2
+        assert mock_http.get.call_count == 1
+
+
+class TestRetryAfterParsing:
+    def test_http_date_form(self, tdb):
+        retry_at = email.utils.formatdate(time.time() + 20, usegmt=True)
+
+        assert 15 <= tdb._retry_after_secs({"Retry-After": retry_at}) <= 20
+
+    def test_github_exhausted_budget_uses_reset(self, tdb):
+        headers = {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(int(time.time()) + 600)}
+
+        assert tdb._retry_after_secs(headers) > 500
+
+    def test_missing_or_invalid(self, tdb):
+        assert tdb._retry_after_secs({}) is None
+        assert tdb._retry_after_secs({"Retry-After": "soon"}) is None
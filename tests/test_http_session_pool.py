@@ -0,0 +1,81 @@
+"""Tests for the process-wide pooled HTTP sessions used by http_client."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+
+@pytest.fixture
+def session_factory(monkeypatch):
+    """Patch requests.Session so every construction returns a distinct mock."""
+    created = []
+
+    def _factory():
+        session = MagicMock()
+        session.get.return_value = MagicMock(status_code=200, content=b"ok")
+        created.append(session)
+        return session
+
+    monkeypatch.setattr("requests.Session", MagicMock(side_effect=_factory))
+    return created
+
+
+class TestHttpSessionPool:
+    def test_same_host_reuses_session(self, tdb, session_factory):
+        tdb.http_client(url="https://api.github.com/repos/a/b", user_agent="agent/1.0", request_type="get")
+        tdb.http_client(url="https://api.github.com/repos/c/d", user_agent="agent/1.0", request_type="get")
+
+        assert len(session_factory) == 1
+        assert session_factory[0].get.call_count == 2
+
+    def test_different_hosts_get_different_sessions(self, tdb, session_factory):
+        tdb.http_client(url="https://api.github.com/repos/a/b", user_agent="agent/1.0", request_type="get")
+        tdb.http_client(url="https://pypi.org/pypi/requests/json", user_agent="agent/1.0", request_type="get")
+
+        assert len(session_factory) == 2
+        assert set(tdb._http_sessions) == {"https://api.github.com", "https://pypi.org"}
+
+    def test_headers_and_auth_are_per_request(self, tdb, session_factory):
+        """A token sent to one URL must not be left on the shared session."""
+        tdb.http_client(
+            url="https://api.github.com/repos/a/b",
+            user_agent="agent/1.0",
+            request_type="get",
+            additional_header={"Authorization": "token secret"},
+            auth=("user", "pass"),
+        )
+        tdb.http_client(url="https://api.github.com/rate_limit", user_agent="agent/1.0", request_type="get")
+
+        session = session_factory[0]
+        first, second = session.get.call_args_list
+        assert first.kwargs["headers"]["Authorization"] == "token secret"
+        assert first.kwargs["auth"] == ("user", "pass")
+        assert "Authorization" not in second.kwargs["headers"]
+        assert "auth" not in second.kwargs
+        session.headers.update.assert_not_called()
+
+    def test_session_recycled_after_max_requests(self, tdb, session_factory, monkeypatch):
+        monkeypatch.setattr(tdb, "http_keepalive_max_requests", 2)
+
+        for _ in range(3):
+            tdb.http_client(url="https://aur.archlinux.org/rpc/", user_agent="agent/1.0", request_type="get")
+
+        assert len(session_factory) == 2
+        session_factory[0].close.assert_called_once()
+
+    def test_idle_session_recycled(self, tdb, session_factory, monkeypatch):
+        monkeypatch.setattr(tdb, "http_keepalive_idle_secs", 0)
+        clock = iter([100.0, 200.0])
+        monkeypatch.setattr(tdb.time, "monotonic", lambda: next(clock))
+
+        tdb._get_http_session("https://pypi.org/pypi/a/json")
+        tdb._get_http_session("https://pypi.org/pypi/b/json")
+
+        assert len(session_factory) == 2
+
+    def test_close_http_sessions_empties_pool(self, tdb, session_factory):
+        tdb._get_http_session("https://gitlab.com/api/v4/projects")
+        tdb._close_http_sessions()
+
+        assert tdb._http_sessions == {}
+        session_factory[0].close.assert_called_once()
@@ -0,0 +1,78 @@
+"""Tests for lazy, concurrent site health probes and --no-preflight."""
+
+import threading
+from unittest.mock import MagicMock
+
+
+def _site(site, app="app"):
+    return {"source_site_name": site, "source_app_name": app, "target_repo_name": "docker", "action": "notify"}
+
+
+class TestProbeSites:
+    def test_only_sources_in_use_are_probed(self, tdb, monkeypatch):
+        mock_check = MagicMock(return_value=False)
+        monkeypatch.setattr(tdb, "check_site", mock_check)
+
+        site_down = tdb._probe_sites({"aur", "regex"}, "agent/1.0")
+
+        assert site_down == {"aur": False}
+        assert [c.kwargs["site_name"] for c in mock_check.call_args_list] == ["AUR"]
+
+    def test_no_sources_no_probes(self, tdb, monkeypatch):
+        mock_check = MagicMock()
+        monkeypatch.setattr(tdb, "check_site", mock_check)
+
+        assert tdb._probe_sites(set(), "agent/1.0") == {}
+        mock_check.assert_not_called()
+
+    def test_probes_run_concurrently(self, tdb, monkeypatch):
+        """Every probe must be in flight at once for the barrier to release."""
+        barrier = threading.Barrier(3, timeout=5)
+
+        def fake_check(**kwargs):
+            barrier.wait()
+            return False
+
+        monkeypatch.setattr(tdb, "check_site", fake_check)
+
+        assert tdb._probe_sites({"github", "pypi", "aur"}, "agent/1.0") == {
+            "github": False,
+            "pypi": False,
+            "aur": False,
+        }
+
+
+class TestNoPreflight:
+    def test_no_probe_requests_sent(self, tdb, monkeypatch):
+        monkeypatch.setattr(tdb, "preflight_checks", False)
+        mock_check = MagicMock()
+        monkeypatch.setattr(tdb, "check_site", mock_check)
+
+        site_down = tdb._probe_sites({"github"}, "agent/1.0")
+
+        assert site_down == {"github": False}
+        assert tdb._unprobed_sites == {"GitHub"}
+        mock_check.assert_not_called()
+
+    def test_first_request_failure_opens_breaker(self, tdb, mock_http, monkeypatch):
+        monkeypatch.setattr(tdb, "preflight_checks", False)
+        monkeypatch.setattr(tdb, "notification_email", MagicMock())
+        mock_http.get.return_value = MagicMock(status_code=503, content=b"down", headers={})
+        tdb._probe_sites({"pypi"}, "agent/1.0")
+
+        tdb.http_client(url="https://pypi.org/pypi/a/json", user_agent="agent/1.0", request_type="get")
+
+        assert tdb._circuit_state("PyPi") == "open"
+        assert tdb._unprobed_sites == set()
+
+    def test_monitor_sites_without_probes(self, tdb, monkeypatch):
+        monkeypatch.setattr(tdb, "preflight_checks", False)
+        mock_check = MagicMock()
+        monkeypatch.setattr(tdb, "check_site", mock_check)
+        monkeypatch.setattr(tdb, "pypi_apps", MagicMock(return_value=("2.0", "https://pypi.org")))
+        tdb.config_obj["monitor_sites"]["site_list"] = [_site("pypi", "requests")]
+
+        tdb.monitor_sites()
+
+        mock_check.assert_not_called()
+        assert tdb.config_obj["results"]["pypi_requests_docker_current_version"] == "2.0"
@@ -11,18 +11,27 @@ import sys
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
+import pytest
 
-def _exec_main_in_process(config_dir, logs_dir, extra_args=None):
+
+def _exec_main_in_process(config_dir, logs_dir, extra_args=None, daemon_context=None):
     """Execute TriggerDockerBuild.py __main__ block in-process via exec().
 
     Mock everything that would cause real network calls, daemon forks,
     or infinite loops. Site checks and app fetches are all stubbed.
+    Returns the namespace the script ran in.
     """
     script_path = Path(__file__).parent.parent / "TriggerDockerBuild.py"
 
     old_cwd = os.getcwd()
     old_argv = sys.argv[:]
 
+    # Create a clean namespace with __name__ = '__main__'
+    namespace = {
+        "__name__": "__main__",
+        "__file__": str(script_path),
+    }
+
     try:
         os.chdir(str(config_dir.parent))
 
@@ -41,12 +50,6 @@ def _exec_main_in_process(config_dir, logs_dir, extra_args=None):
 
         source = script_path.read_text()
 
-        # Create a clean namespace with __name__ = '__main__'
-        namespace = {
-            "__name__": "__main__",
-            "__file__": str(script_path),
-        }
-
         # Mocks to prevent real network calls
         mock_session = MagicMock()
         mock_session.get.return_value.status_code = 200
@@ -56,7 +59,7 @@ def _exec_main_in_process(config_dir, logs_dir, extra_args=None):
 
         mocks = {
             "requests.Session": MagicMock(return_value=mock_session),
-            "daemon.DaemonContext": MagicMock(),
+            "daemon.DaemonContext": daemon_context or MagicMock(),
             "schedule.every": MagicMock(),
             "schedule.run_pending": MagicMock(return_value=0),
             "yagmail.SMTP": MagicMock(),
@@ -72,6 +75,8 @@ def _exec_main_in_process(config_dir, logs_dir, extra_args=None):
         os.chdir(old_cwd)
         sys.argv = old_argv
 
+    return namespace
+
 
 class _MultiPatch:
     """Context manager that applies multiple module-level patches."""
@@ -168,6 +173,65 @@ class TestMainExecBasic:
         except SystemExit as e:
             assert e.code == 1
 
+    def test_main_exec_changes_since_requires_sqlite(self, tmp_path):
+        """--changes-since with the default configobj backend → exit(1)."""
+        config_dir, logs_dir = _setup_env(tmp_path)
+        with pytest.raises(SystemExit) as excinfo:
+            _exec_main_in_process(config_dir, logs_dir, ["--changes-since", "24"])
+        assert excinfo.value.code == 1
+
+    def test_main_exec_changes_since_sqlite(self, tmp_path, capsys):
+        config_dir, logs_dir = _setup_env(tmp_path)
+        config_ini = config_dir / "config.ini"
+        config_ini.write_text(config_ini.read_text().replace("[general]\n", "[general]\nstate_backend = 'sqlite'\n"))
+
+        _exec_main_in_process(config_dir, logs_dir, ["--changes-since", "24"])
+
+        assert (config_dir / "state.db").exists()
+        assert capsys.readouterr().out == ""
+
+    def test_main_exec_string_site_list(self, tmp_path):
+        """A legacy site_list left as a plain string is logged and treated as empty."""
+        config_dir, logs_dir = _setup_env(tmp_path)
+        config_ini = config_dir / "config.ini"
+        config_ini.write_text(config_ini.read_text().replace("site_list = []", "site_list = 'legacy string'"))
+
+        _exec_main_in_process(config_dir, logs_dir)
+
+        assert "site_list in config.ini is not a list (got str)" in (logs_dir / "app.log").read_text()
+
+    def test_main_exec_daemon_with_sqlite_state(self, tmp_path):
+        """The state database still works after the daemon closes inherited descriptors."""
+        config_dir, logs_dir = _setup_env(tmp_path)
+        config_ini = config_dir / "config.ini"
+        config_ini.write_text(config_ini.read_text().replace("[general]\n", "[general]\nstate_backend = 'sqlite'\n"))
+
+        class ClosingDaemonContext:
+            """Close descriptors opened in config_dir, as python-daemon closes all but files_preserve."""
+
+            def __init__(self):
+                self.files_preserve = []
+
+            def open(self):
+                for fd in map(int, os.listdir("/proc/self/fd")):
+                    try:
+                        path = os.readlink("/proc/self/fd/%d" % fd)
+                    except OSError:
+                        continue
+                    if path.startswith(str(config_dir)):
+                        os.close(fd)
+
+        namespace = _exec_main_in_process(config_dir, logs_dir, ["--daemon"], daemon_context=ClosingDaemonContext)
+
+        site_spec = namespace["_compile_site_spec"](
+            {"source_site_name": "pypi", "source_app_name": "app", "target_repo_name": "app", "action": "notify"}
+        )
+        namespace["_record_previous_version"](site_spec, "1.0", "first_seen")
+        namespace["_flush_state"]()
+
+        assert namespace["_get_previous_version"](site_spec) == "1.0"
+        namespace["_state_db"].close()
+
 
 def _setup_env(tmp_path, include_token=True):
     """Create test config/log dirs."""
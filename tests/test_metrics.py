@@ -0,0 +1,138 @@
+"""Tests for the Prometheus metrics: recording, rendering, the textfile and the /metrics endpoint."""
+
+import http.client
+from unittest.mock import MagicMock
+
+import requests
+
+PYPI_URL = "https://pypi.org/pypi/requests/json"
+
+
+def _samples(tdb):
+    """Rendered metrics as {sample name with labels: value}."""
+    return {
+        line.rsplit(" ", 1)[0]: float(line.rsplit(" ", 1)[1])
+        for line in tdb._render_metrics().splitlines()
+        if not line.startswith("#")
+    }
+
+
+class TestRendering:
+    def test_counter_and_gauge(self, tdb):
+        tdb._metric_inc("tdb_releases_created_total")
+        tdb._metric_inc("tdb_releases_created_total")
+        tdb._metric_set("tdb_github_rate_limit_remaining", 4990, resource="core")
+
+        text = tdb._render_metrics()
+
+        assert "# TYPE tdb_releases_created_total counter\ntdb_releases_created_total 2.0\n" in text
+        assert 'tdb_github_rate_limit_remaining{resource="core"} 4990.0' in text
+        # metrics never recorded are left out
+        assert "tdb_runs_total" not in text
+
+    def test_histogram_buckets_are_cumulative(self, tdb):
+        for secs in (0.07, 0.3, 0.4, 45.0):
+            tdb._metric_observe("tdb_notification_duration_seconds", secs, channel="email")
+
+        samples = _samples(tdb)
+
+        assert samples['tdb_notification_duration_seconds_bucket{channel="email",le="0.05"}'] == 0
+        assert samples['tdb_notification_duration_seconds_bucket{channel="email",le="0.1"}'] == 1
+        assert samples['tdb_notification_duration_seconds_bucket{channel="email",le="0.5"}'] == 3
+        assert samples['tdb_notification_duration_seconds_bucket{channel="email",le="30.0"}'] == 3
+        assert samples['tdb_notification_duration_seconds_bucket{channel="email",le="+Inf"}'] == 4
+        assert samples['tdb_notification_duration_seconds_count{channel="email"}'] == 4
+        assert samples['tdb_notification_duration_seconds_sum{channel="email"}'] == 45.77
+
+    def test_label_values_are_escaped(self, tdb):
+        tdb._metric_inc("tdb_http_retries_total", source='we"ird\\')
+
+        assert 'tdb_http_retries_total{source="we\\"ird\\\\"} 1.0' in tdb._render_metrics()
+
+
+class TestInstrumentation:
+    def test_request_latency_status_and_bytes(self, tdb, mock_http):
+        mock_http.get.return_value = MagicMock(status_code=200, content=b"0123456789", headers={})
+
+        tdb.http_client(url=PYPI_URL, user_agent="agent/1.0", request_type="get")
+
+        samples = _samples(tdb)
+        assert samples['tdb_http_requests_total{code="200",source="pypi"}'] == 1
+        assert samples['tdb_http_response_bytes_total{source="pypi"}'] == 10
+        assert samples['tdb_http_request_duration_seconds_count{source="pypi"}'] == 1
+
+    def test_retries_and_connection_errors(self, tdb, mock_http):
+        mock_http.get.side_effect = [
+            requests.exceptions.ConnectionError("reset by peer"),
+            MagicMock(status_code=200, content=b"{}", headers={}),
+        ]
+
+        tdb.http_client(url=PYPI_URL, user_agent="agent/1.0", request_type="get")
+
+        samples = _samples(tdb)
+        assert samples['tdb_http_retries_total{source="pypi"}'] == 1
+        assert samples['tdb_http_requests_total{code="error",source="pypi"}'] == 1
+        assert samples['tdb_http_request_duration_seconds_count{source="pypi"}'] == 2
+
+    def test_not_modified_and_rate_limit(self, tdb, mock_http):
+        mock_http.get.return_value = MagicMock(
+            status_code=304, content=b"", headers={"X-RateLimit-Remaining": "4321", "X-RateLimit-Resource": "core"}
+        )
+
+        tdb.http_client(
+            url="https://api.github.com/repos/a/b/releases/latest",
+            user_agent="agent/1.0",
+            request_type="get",
+            conditional=True,
+        )
+
+        samples = _samples(tdb)
+        assert samples['tdb_http_not_modified_total{source="github"}'] == 1
+        assert samples['tdb_github_rate_limit_remaining{resource="core"}'] == 4321
+
+    def test_release_created(self, tdb, mock_http):
+        mock_http.post.return_value = MagicMock(status_code=201, content=b"{}", headers={})
+
+        tdb.github_create_release("2.0", "main", "binhex", "arch-app", "agent/1.0")
+
+        assert _samples(tdb)["tdb_releases_created_total"] == 1
+
+
+class TestExport:
+    def test_run_writes_textfile(self, tdb, tmp_path, monkeypatch):
+        textfile = tmp_path / "tdb.prom"
+        monkeypatch.setattr(tdb, "metrics_textfile", str(textfile))
+        monkeypatch.setattr(tdb, "_probe_sites", lambda names, ua: dict.fromkeys(names, False))
+        monkeypatch.setattr(tdb, "_iter_site_versions", lambda site_specs, ua: iter(()))
+        tdb.config_obj["monitor_sites"]["site_list"] = []
+
+        tdb.monitor_sites()
+        tdb.monitor_sites()
+
+        text = textfile.read_text()
+        assert "tdb_runs_total 2.0" in text
+        assert "# TYPE tdb_run_duration_seconds gauge" in text
+        assert not list(tmp_path.glob("*.tmp"))
+
+    def test_endpoint_serves_metrics(self, tdb):
+        tdb._metric_inc("tdb_runs_total")
+        server = tdb._start_metrics_server("127.0.0.1", 0)
+
+        try:
+            connection = http.client.HTTPConnection(*server.server_address[:2], timeout=5)
+            connection.request("GET", "/metrics")
+            response = connection.getresponse()
+            body = response.read().decode("utf-8")
+
+            connection.request("GET", "/other")
+            other = connection.getresponse()
+            other.read()
+
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        assert response.status == 200
+        assert response.getheader("Content-Type").startswith("text/plain; version=0.0.4")
+        assert "tdb_runs_total 1.0" in body
+        assert other.status == 404
@@ -0,0 +1,135 @@
+"""Tests for the durable notification outbox: record, deliver, retry on later runs, de-duplicate."""
+
+import json
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+
+def _records(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+@pytest.fixture
+def outbox(tdb, tmp_path, monkeypatch):
+    path = tmp_path / "notification_outbox.jsonl"
+    monkeypatch.setattr(tdb, "outbox_file", str(path))
+    tdb.email_notification = True
+    return path
+
+
+def _notify(tdb, app="app"):
+    tdb._send_notification(tdb.notification_email, msg_type="app_error", source_app_name=app, error_msg="boom")
+
+
+class TestOutboxEntries:
+    def test_notification_is_recorded_before_delivery(self, tdb, outbox, mock_yagmail):
+        notification_queue = MagicMock()
+        tdb._notification_queue = notification_queue
+
+        _notify(tdb)
+
+        (queued,) = _records(outbox)
+        assert queued["event"] == "queued"
+        assert queued["send"] == "notification_email"
+        assert queued["kwargs"]["source_app_name"] == "app"
+        notification_queue.put.assert_called_once_with((tdb._deliver_outbox_entry, (queued["id"],), {}))
+
+        assert tdb._deliver_outbox_entry(queued["id"]) == 0
+
+        assert _records(outbox)[-1]["event"] == "delivered"
+        assert tdb._outbox_pending == {}
+
+    def test_pending_duplicate_is_dropped(self, tdb, outbox):
+        tdb._notification_queue = MagicMock()
+
+        _notify(tdb)
+        _notify(tdb)
+        _notify(tdb, app="other")
+
+        assert [record["kwargs"]["source_app_name"] for record in _records(outbox)] == ["app", "other"]
+        assert tdb._notification_queue.put.call_count == 2
+
+    def test_disabled_target_is_not_recorded(self, tdb, outbox):
+        tdb._notification_queue = MagicMock()
+        tdb.kodi_notification = False
+
+        tdb._send_notification(tdb.notification_kodi, "notify", "app", "2.0")
+
+        assert not outbox.exists()
+        tdb._notification_queue.put.assert_called_once_with((tdb.notification_kodi, ("notify", "app", "2.0"), {}))
+
+    def test_failed_delivery_is_retried_with_growing_delay(self, tdb, outbox, monkeypatch):
+        send = MagicMock(__name__="notification_email", return_value=1)
+        monkeypatch.setattr(tdb, "notification_email", send)
+        monkeypatch.setattr(tdb, "outbox_retry_mins", 5)
+        entry_id = tdb._outbox_put(send, (), {"msg_type": "app_error"})
+
+        tdb._deliver_outbox_entry(entry_id)
+        first_retry = tdb._outbox_pending[entry_id]["next_attempt_at"]
+        tdb._deliver_outbox_entry(entry_id)
+
+        assert tdb._outbox_pending[entry_id]["attempts"] == 2
+        assert 290 <= first_retry - time.time() <= 300
+        assert 590 <= tdb._outbox_pending[entry_id]["next_attempt_at"] - time.time() <= 600
+        assert tdb._due_outbox_entries() == []
+        assert [record["event"] for record in _records(outbox)] == ["queued", "failed", "failed"]
+
+    def test_entry_is_dropped_after_max_attempts(self, tdb, outbox, monkeypatch):
+        send = MagicMock(__name__="notification_email", side_effect=RuntimeError("smtp gone"))
+        monkeypatch.setattr(tdb, "notification_email", send)
+        monkeypatch.setattr(tdb, "outbox_max_attempts", 2)
+        entry_id = tdb._outbox_put(send, (), {})
+
+        assert tdb._deliver_outbox_entry(entry_id) == 1
+        assert tdb._deliver_outbox_entry(entry_id) == 1
+
+        assert entry_id not in tdb._outbox_pending
+        assert _records(outbox)[-1] == {"event": "dropped", "id": entry_id}
+
+
+class TestOutboxPersistence:
+    def test_load_replays_records_and_compacts(self, tdb, outbox):
+        queued = {"event": "queued", "send": "notification_kodi", "kwargs": {}, "attempts": 0, "next_attempt_at": 0}
+        lines = [
+            dict(queued, id="a", args=["notify", "a", "1"]),
+            dict(queued, id="b", args=["notify", "b", "1"]),
+            {"event": "delivered", "id": "a", "delivered_at": 1.0},
+            {"event": "failed", "id": "b", "attempts": 1, "next_attempt_at": 0},
+        ]
+        # the last line is a write cut short by a crash
+        outbox.write_text("".join(json.dumps(record) + "\n" for record in lines) + '{"event": "queu')
+
+        tdb._load_outbox()
+
+        assert list(tdb._outbox_pending) == ["b"]
+        assert tdb._outbox_pending["b"]["attempts"] == 1
+        (compacted,) = _records(outbox)
+        assert (compacted["event"], compacted["id"], compacted["args"]) == ("queued", "b", ["notify", "b", "1"])
+
+    def test_next_run_delivers_what_an_earlier_run_left(self, tdb, outbox, monkeypatch):
+        monkeypatch.setattr(tdb, "_probe_sites", lambda names, ua: dict.fromkeys(names, False))
+        monkeypatch.setattr(tdb, "_iter_site_versions", lambda site_specs, ua: iter(()))
+        notification_kodi = MagicMock(__name__="notification_kodi", return_value=None)
+        monkeypatch.setattr(tdb, "notification_kodi", notification_kodi)
+        tdb.config_obj["monitor_sites"]["site_list"] = []
+        tdb._outbox_put(notification_kodi, ("notify", "app", "2.0"), {})
+
+        tdb.monitor_sites()
+
+        notification_kodi.assert_called_once_with("notify", "app", "2.0")
+        assert tdb._outbox_pending == {}
+        assert outbox.read_text() == ""
+
+    def test_digest_goes_through_the_outbox(self, tdb, outbox, mock_yagmail, monkeypatch):
+        monkeypatch.setattr(tdb, "email_digest", True)
+        tdb._start_digest()
+        tdb.notification_email(msg_type="app_error", source_app_name="app", error_msg="boom")
+
+        assert tdb._send_digest() == 0
+
+        assert [(record["event"], record.get("send")) for record in _records(outbox)] == [
+            ("queued", "_smtp_send"),
+            ("delivered", None),
+        ]
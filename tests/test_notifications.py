@@ -34,9 +34,9 @@ class TestNotificationEmail:
         assert result == 0
         mock_yagmail.assert_called_once()
         smtp_instance = mock_yagmail.return_value
-        smtp_instance.send.assert_called_once()
-        # yagmail.send(to=..., subject=..., contents=[...])
-        call_kwargs = smtp_instance.send.call_args.kwargs
+        smtp_instance.prepare_send.assert_called_once()
+        # prepare_send(to=..., subject=..., contents=[...])
+        call_kwargs = smtp_instance.prepare_send.call_args.kwargs
         assert "site down" in str(call_kwargs.get("contents", ""))
 
     def test_site_recovered_sends_email(self, tdb, mock_yagmail):
@@ -48,7 +48,7 @@ class TestNotificationEmail:
         )
         assert result == 0
         smtp_instance = mock_yagmail.return_value
-        smtp_instance.send.assert_called_once()
+        smtp_instance.prepare_send.assert_called_once()
 
     def test_app_error_sends_email(self, tdb, mock_yagmail):
         result = tdb.notification_email(
@@ -60,7 +60,7 @@ class TestNotificationEmail:
             source_site_url="https://example.com",
         )
         assert result == 0
-        mock_yagmail.return_value.send.assert_called_once()
+        mock_yagmail.return_value.prepare_send.assert_called_once()
 
     def test_config_error_sends_email(self, tdb, mock_yagmail):
         result = tdb.notification_email(
@@ -86,7 +86,7 @@ class TestNotificationEmail:
             current_version="v2.0.0",
         )
         assert result == 0
-        mock_yagmail.return_value.send.assert_called_once()
+        mock_yagmail.return_value.prepare_send.assert_called_once()
 
     def test_notify_action_sends_email_without_docker_links(self, tdb, mock_yagmail):
         tdb.config_obj["general"]["target_repo_owner"] = "testowner"
@@ -111,8 +111,8 @@ class TestNotificationEmail:
         )
         assert result == 0
         smtp_instance = mock_yagmail.return_value
-        smtp_instance.send.assert_called_once()
-        call_kwargs = smtp_instance.send.call_args.kwargs
+        smtp_instance.prepare_send.assert_called_once()
+        call_kwargs = smtp_instance.prepare_send.call_args.kwargs
         assert "(unknown)" in str(call_kwargs.get("contents", ""))
 
     def test_html_escaping_applied(self, tdb, mock_yagmail):
@@ -125,8 +125,8 @@ class TestNotificationEmail:
         )
         assert result == 0
         smtp_instance = mock_yagmail.return_value
-        smtp_instance.send.assert_called_once()
-        call_kwargs = smtp_instance.send.call_args.kwargs
+        smtp_instance.prepare_send.assert_called_once()
+        call_kwargs = smtp_instance.prepare_send.call_args.kwargs
         content = str(call_kwargs.get("contents", ""))
         assert "&lt;script&gt;" in content
         assert "&lt;evil&gt;" in content
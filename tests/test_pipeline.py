@@ -0,0 +1,169 @@
+"""Tests for the fetch -> compare -> act -> notify pipeline of monitor_sites."""
+
+import datetime
+import json
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+
+def _item(app, site="pypi", **extra):
+    item = {
+        "source_site_name": site,
+        "source_app_name": app,
+        "target_repo_name": app,
+        "action": "notify",
+    }
+    item.update(extra)
+    return item
+
+
+@pytest.fixture(autouse=True)
+def no_probes(tdb, monkeypatch):
+    monkeypatch.setattr(tdb, "_probe_sites", lambda names, ua: dict.fromkeys(names, False))
+
+
+class TestPipeline:
+    def test_slow_notification_does_not_stall_fetching(self, tdb, monkeypatch):
+        notification_started = threading.Event()
+        fetched_other_source = threading.Event()
+        seen = {}
+
+        def slow_notification_email(**kwargs):
+            notification_started.set()
+            seen["fetched_while_notifying"] = fetched_other_source.wait(5)
+            seen["thread"] = threading.current_thread().name.split("-")[0]
+
+        def aur_apps_batch(source_app_names, user_agent):
+            seen["notification_started_first"] = notification_started.wait(5)
+            fetched_other_source.set()
+            return dict.fromkeys(source_app_names, "1.0")
+
+        monkeypatch.setattr(tdb, "notification_email", slow_notification_email)
+        monkeypatch.setattr(tdb, "pypi_apps", lambda app, ua: ("2.0", "https://pypi.org/project/%s" % app))
+        monkeypatch.setattr(tdb, "aur_apps_batch", aur_apps_batch)
+        tdb.config_obj["results"]["pypi_a_a_previous_version"] = "1.0"
+        tdb.config_obj["monitor_sites"]["site_list"] = [_item("a"), _item("b", site="aur")]
+
+        tdb.monitor_sites()
+
+        assert seen == {
+            "notification_started_first": True,
+            "fetched_while_notifying": True,
+            "thread": "notify",
+        }
+        assert tdb.config_obj["results"]["aur_b_b_previous_version"] == "1.0"
+
+    def test_slow_release_does_not_stall_comparing(self, tdb, monkeypatch):
+        monkeypatch.setattr(tdb, "action_workers", 1)
+        release_started = threading.Event()
+        compared_other = threading.Event()
+        seen = {}
+
+        def slow_create_release(current_version, *args):
+            release_started.set()
+            seen["compared_while_releasing"] = compared_other.wait(5)
+            return 0, 201, "{}"
+
+        real_compare = tdb._compare_site_version
+
+        def compare(site_spec, current_version, source_site_url):
+            if site_spec.source_app_name == "b":
+                release_started.wait(5)
+                compared_other.set()
+            return real_compare(site_spec, current_version, source_site_url)
+
+        monkeypatch.setattr(tdb, "github_create_release", slow_create_release)
+        monkeypatch.setattr(tdb, "_compare_site_version", compare)
+        monkeypatch.setattr(tdb, "notification_email", MagicMock())
+        monkeypatch.setattr(tdb, "pypi_apps", lambda app, ua: ("2.0", None))
+        tdb.config_obj["results"]["pypi_a_a_previous_version"] = "1.0"
+        tdb.config_obj["monitor_sites"]["site_list"] = [
+            _item("a", action="trigger", target_repo_branch="main"),
+            _item("b"),
+        ]
+
+        tdb.monitor_sites()
+
+        assert seen == {"compared_while_releasing": True}
+        assert tdb.config_obj["results"]["pypi_a_a_previous_version"] == "2.0"
+
+    def test_items_sharing_a_target_release_once(self, tdb, monkeypatch):
+        monkeypatch.setattr(tdb, "action_workers", 4)
+        last_release = {"date": "2000-01-01T00:00:00Z"}
+        both_checked = threading.Event()
+        checked = []
+
+        def last_release_date(target_repo_owner, target_repo_name, user_agent):
+            checked.append(target_repo_name)
+            if len(checked) == 2:
+                both_checked.set()
+            return 0, last_release["date"]
+
+        def create_release(current_version, *args):
+            # without a per-target lock the other worker passes its release-days check meanwhile
+            both_checked.wait(0.5)
+            last_release["date"] = datetime.datetime.now().strftime("%Y-%m-%dT%H:%M:%SZ")
+            return 0, 201, "{}"
+
+        create_release = MagicMock(side_effect=create_release)
+        monkeypatch.setattr(tdb, "github_target_last_release_date", last_release_date)
+        monkeypatch.setattr(tdb, "github_create_release", create_release)
+        monkeypatch.setattr(tdb, "notification_email", MagicMock())
+        monkeypatch.setattr(tdb, "pypi_apps", lambda app, ua: ("2.0", None))
+        for app in ("a", "b"):
+            tdb.config_obj["results"]["pypi_%s_shared_previous_version" % app] = "1.0"
+        tdb.config_obj["monitor_sites"]["site_list"] = [
+            _item(app, target_repo_name="shared", action="trigger", target_repo_branch="main", target_release_days=1)
+            for app in ("a", "b")
+        ]
+
+        tdb.monitor_sites()
+
+        create_release.assert_called_once()
+        assert checked == ["shared", "shared"]
+
+    def test_stage_error_is_raised_after_the_run_drains(self, tdb, monkeypatch):
+        notification_email = MagicMock(side_effect=[RuntimeError("smtp exploded"), None])
+        monkeypatch.setattr(tdb, "notification_email", notification_email)
+        monkeypatch.setattr(tdb, "notification_workers", 1)
+        monkeypatch.setattr(tdb, "pypi_apps", lambda app, ua: ("2.0", None))
+        for app in ("a", "b"):
+            tdb.config_obj["results"]["pypi_%s_%s_previous_version" % (app, app)] = "1.0"
+        tdb.config_obj["monitor_sites"]["site_list"] = [_item("a"), _item("b")]
+
+        with pytest.raises(RuntimeError, match="smtp exploded"):
+            tdb.monitor_sites()
+
+        # the failure did not stop the other item's notification
+        assert notification_email.call_count == 2
+        assert tdb._notification_queue is None
+
+    def test_failed_run_still_saves_state_report_and_metrics(self, tdb, tmp_path, monkeypatch):
+        monkeypatch.setattr(tdb, "run_report_dir", str(tmp_path))
+        monkeypatch.setattr(tdb, "run_reports_keep", 1)
+        monkeypatch.setattr(tdb, "state_flush_items", 1000)
+        monkeypatch.setattr(tdb, "_handle_version_change", MagicMock(side_effect=RuntimeError("release exploded")))
+        monkeypatch.setattr(tdb, "pypi_apps", lambda app, ua: ("2.0", None))
+        tdb.config_obj["results"]["pypi_changed_changed_previous_version"] = "1.0"
+        tdb.config_obj["monitor_sites"]["site_list"] = [_item("new"), _item("changed")]
+
+        with pytest.raises(RuntimeError, match="release exploded"):
+            tdb.monitor_sites()
+
+        # the first-seen version buffered before the failure reached config.ini
+        assert "pypi_new_new_previous_version" in (tmp_path / "config.ini").read_text()
+        assert tdb._run_memo is None
+        report = json.loads((tmp_path / "last_run.json").read_text())
+        assert report["error"] == "RuntimeError: release exploded"
+        assert "tdb_run_failures_total 1.0" in tdb._render_metrics()
+
+
+class TestSendNotification:
+    def test_sent_directly_outside_a_run(self, tdb):
+        send = MagicMock()
+
+        tdb._send_notification(send, "trigger", app="a")
+
+        send.assert_called_once_with("trigger", app="a")
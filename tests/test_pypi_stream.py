@@ -0,0 +1,119 @@
+"""Tests for streamed PyPI JSON extraction and the response size cap."""
+
+import json
+from unittest.mock import MagicMock
+
+import requests
+
+PYPI_URL = "https://pypi.org/pypi/boto3/json"
+
+
+def _document(version="1.34.0", releases=2000):
+    """A PyPI JSON document shaped like the real one: "info" first, then the per-release file lists."""
+    return json.dumps(
+        {
+            "info": {"name": "boto3", "version": version, "summary": "café ☃"},
+            "last_serial": 1,
+            "releases": {"1.%d.0" % n: [{"filename": "boto3-1.%d.0.tar.gz" % n}] for n in range(releases)},
+            "urls": [],
+        },
+        ensure_ascii=False,
+    ).encode("utf-8")
+
+
+def _chunks(body, size):
+    return [body[i : i + size] for i in range(0, len(body), size)]
+
+
+def _streamed(body, size=64):
+    response = MagicMock(status_code=200, headers={})
+    response.iter_content.return_value = iter(_chunks(body, size))
+    return response
+
+
+class TestPypiInfoReader:
+    def test_stops_after_info_object(self, tdb):
+        body = _document()
+        response = _streamed(body)
+
+        content = tdb._pypi_info_reader(PYPI_URL, 10_000_000)(response)
+
+        assert json.loads(content) == {"info": {"name": "boto3", "version": "1.34.0", "summary": "café ☃"}}
+        # the release lists after "info" were never read
+        assert len(list(response.iter_content.return_value)) > len(_chunks(body, 64)) // 2
+        response.close.assert_called_once()
+
+    def test_multibyte_characters_split_across_chunks(self, tdb):
+        body = _document()
+
+        for size in (1, 3, 7):
+            content = tdb._pypi_info_reader(PYPI_URL, 10_000_000)(_streamed(body, size))
+
+            assert json.loads(content)["info"]["summary"] == "café ☃"
+
+    def test_info_is_decoded_once_however_it_is_chunked(self, tdb, monkeypatch):
+        raw_decode = MagicMock(side_effect=json.JSONDecoder().raw_decode)
+        monkeypatch.setattr(tdb._json_decoder, "raw_decode", raw_decode)
+        body = _document()
+
+        for size in (1, 64):
+            raw_decode.reset_mock()
+
+            content = tdb._pypi_info_reader(PYPI_URL, 10_000_000)(_streamed(body, size))
+
+            assert json.loads(content)["info"]["version"] == "1.34.0"
+            raw_decode.assert_called_once()
+
+    def test_brackets_and_escapes_inside_strings(self, tdb):
+        info = {"version": "2.0", "summary": 'a "}" and \\ \\" ]', "classifiers": [{"x": "{"}]}
+        body = json.dumps({"info": info, "releases": {}}).encode()
+
+        for size in (1, 2, 5):
+            content = tdb._pypi_info_reader(PYPI_URL, 10_000_000)(_streamed(body, size))
+
+            assert json.loads(content) == {"info": info}
+
+    def test_document_without_leading_info_is_returned_whole(self, tdb):
+        body = json.dumps({"last_serial": 1, "info": {"version": "2.0"}}).encode()
+
+        content = tdb._pypi_info_reader(PYPI_URL, 10_000_000)(_streamed(body))
+
+        assert content == body
+
+    def test_oversized_body_is_abandoned(self, tdb):
+        body = json.dumps({"last_serial": 1, "padding": "x" * 5000}).encode()
+        response = _streamed(body)
+
+        assert tdb._pypi_info_reader(PYPI_URL, 1024)(response) is None
+        response.close.assert_called_once()
+
+
+class TestPypiAppsStreaming:
+    def test_streams_and_extracts_version(self, tdb, mock_http):
+        mock_http.get.return_value = _streamed(_document(version="1.35.2"), size=4096)
+
+        version, _ = tdb.pypi_apps("boto3", "agent/1.0")
+
+        assert version == "1.35.2"
+        assert mock_http.get.call_args.kwargs["stream"] is True
+
+    def test_oversized_body_fails_without_caching_validators(self, tdb, mock_http, monkeypatch):
+        monkeypatch.setattr(tdb, "source_settings", {"pypi": {"max_response_bytes": 1024}})
+        response = _streamed(json.dumps({"padding": "x" * 5000}).encode())
+        response.headers = {"ETag": '"big"'}
+        mock_http.get.return_value = response
+
+        version, _ = tdb.pypi_apps("boto3", "agent/1.0")
+
+        assert version is None
+        assert PYPI_URL not in tdb._validator_cache
+
+    def test_connection_dropped_mid_body_is_retried(self, tdb, mock_http):
+        broken = MagicMock(status_code=200, headers={})
+        broken.iter_content.side_effect = requests.exceptions.ChunkedEncodingError("connection reset")
+        mock_http.get.side_effect = [broken, _streamed(_document())]
+
+        version, _ = tdb.pypi_apps("boto3", "agent/1.0")
+
+        assert version == "1.34.0"
+        assert mock_http.get.call_count == 2
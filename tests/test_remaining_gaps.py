@@ -115,11 +115,8 @@ class TestMonitorSitesDeepCoverage:
 
     def test_pypi_site_down_skips(self, tdb, mock_http, monkeypatch):
         """When PyPI is marked down, pypi apps are skipped."""
-        # Return True (down) for the PyPI site check
-        mock_check_site = MagicMock()
-        # First 5 calls = site checks; PyPI is 3rd call
-        # GitHub=False, GitLab=False, PyPI=True, AOR=False, AUR=False
-        mock_check_site.side_effect = [False, False, True, False, False]
+        # Return True (down) for the PyPI site check; only sources in site_list are probed
+        mock_check_site = MagicMock(side_effect=lambda **kwargs: kwargs["site_name"] == "PyPi")
         monkeypatch.setattr(tdb, "check_site", mock_check_site)
 
         tdb.config_obj["monitor_sites"]["site_list"] = [
@@ -133,10 +130,11 @@ class TestMonitorSitesDeepCoverage:
         ]
 
         tdb.monitor_sites()
+        mock_http.get.assert_not_called()
 
     def test_aor_site_down_skips(self, tdb, mock_http, monkeypatch):
         """When AOR is marked down, aor apps are skipped."""
-        mock_check_site = MagicMock(side_effect=[False, False, False, True, False])
+        mock_check_site = MagicMock(side_effect=lambda **kwargs: kwargs["site_name"] == "AOR")
         monkeypatch.setattr(tdb, "check_site", mock_check_site)
 
         tdb.config_obj["monitor_sites"]["site_list"] = [
@@ -150,10 +148,11 @@ class TestMonitorSitesDeepCoverage:
         ]
 
         tdb.monitor_sites()
+        mock_http.get.assert_not_called()
 
     def test_aur_site_down_skips(self, tdb, mock_http, monkeypatch):
         """When AUR is marked down, aur apps are skipped."""
-        mock_check_site = MagicMock(side_effect=[False, False, False, False, True])
+        mock_check_site = MagicMock(side_effect=lambda **kwargs: kwargs["site_name"] == "AUR")
         monkeypatch.setattr(tdb, "check_site", mock_check_site)
 
         tdb.config_obj["monitor_sites"]["site_list"] = [
@@ -167,6 +166,7 @@ class TestMonitorSitesDeepCoverage:
         ]
 
         tdb.monitor_sites()
+        mock_http.get.assert_not_called()
 
     def test_aor_app_fetch_fails_increments_counter(self, tdb, mock_http, monkeypatch):
         """AOR app fetch failure increments the persistent counter."""
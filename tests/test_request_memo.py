@@ -0,0 +1,152 @@
+"""Tests for per-run request memoization and in-flight coalescing."""
+
+import threading
+from unittest.mock import MagicMock
+
+PYPI_URL = "https://pypi.org/pypi/requests/json"
+RELEASES_URL = "https://api.github.com/repos/binhex/arch-app/releases/latest"
+
+
+def _ok(content=b"{}"):
+    return MagicMock(status_code=200, content=content, headers={})
+
+
+def _get(tdb, url=PYPI_URL, **kwargs):
+    return tdb.http_client(url=url, user_agent="agent/1.0", request_type="get", **kwargs)
+
+
+class TestHttpMemo:
+    def test_not_memoized_outside_a_run(self, tdb, mock_http):
+        mock_http.get.return_value = _ok()
+
+        _get(tdb)
+        _get(tdb)
+
+        assert mock_http.get.call_count == 2
+
+    def test_identical_gets_share_one_response(self, tdb, mock_http):
+        tdb._run_memo = {}
+        mock_http.get.return_value = _ok(b'{"v": 1}')
+
+        first = _get(tdb)
+        second = _get(tdb)
+
+        assert first == second == (0, 200, b'{"v": 1}')
+        assert mock_http.get.call_count == 1
+        assert (tdb._run_memo_stats["http_hits"], tdb._run_memo_stats["http_misses"]) == (1, 1)
+
+    def test_auth_identity_and_representation_are_part_of_the_key(self, tdb, mock_http):
+        tdb._run_memo = {}
+        mock_http.get.return_value = _ok()
+
+        _get(tdb, additional_header={"Authorization": "token a"})
+        _get(tdb, additional_header={"Authorization": "token b"})
+        _get(tdb, additional_header={"Authorization": "token a", "Accept": "application/vnd.github.sha"})
+        _get(tdb, additional_header={"Authorization": "token a"}, conditional=True)
+
+        assert mock_http.get.call_count == 4
+        # the token itself is never kept in the memo
+        assert "token a" not in repr(list(tdb._run_memo))
+
+    def test_in_flight_request_is_coalesced(self, tdb, mock_http):
+        tdb._run_memo = {}
+        release = threading.Event()
+
+        def slow_get(**kwargs):
+            release.wait(5)
+            return _ok()
+
+        mock_http.get.side_effect = slow_get
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(_get(tdb))) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        # let every caller reach the memo before the one real request completes
+        threading.Event().wait(0.05)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        assert mock_http.get.call_count == 1
+        assert results == [(0, 200, b"{}")] * 4
+
+    def test_large_body_is_only_shared_with_callers_in_flight(self, tdb, mock_http):
+        tdb._run_memo = {}
+        release = threading.Event()
+        large = b"x" * (tdb.MEMO_MAX_BODY_BYTES + 1)
+
+        def slow_get(**kwargs):
+            release.wait(5)
+            return _ok(large)
+
+        mock_http.get.side_effect = slow_get
+        threads = [threading.Thread(target=_get, args=(tdb,)) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        threading.Event().wait(0.05)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        assert mock_http.get.call_count == 1
+        # the body is not held until the end of the run
+        assert tdb._run_memo == {}
+        _get(tdb)
+        assert mock_http.get.call_count == 2
+
+    def test_streamed_response_is_not_kept(self, tdb, mock_http):
+        tdb._run_memo = {}
+        mock_http.get.return_value = _ok()
+
+        _get(tdb, stream_reader=lambda response: b"{}")
+        _get(tdb, stream_reader=lambda response: b"{}")
+
+        assert mock_http.get.call_count == 2
+        assert tdb._run_memo == {}
+
+    def test_posts_and_opted_out_gets_are_not_memoized(self, tdb, mock_http):
+        tdb._run_memo = {}
+        mock_http.get.return_value = _ok()
+        mock_http.post.return_value = _ok()
+
+        _get(tdb, memoize=False)
+        _get(tdb, memoize=False)
+        tdb.http_client(url="https://example.org/hook", user_agent="agent/1.0", request_type="post", json_payload={})
+        tdb.http_client(url="https://example.org/hook", user_agent="agent/1.0", request_type="post", json_payload={})
+
+        assert mock_http.get.call_count == 2
+        assert mock_http.post.call_count == 2
+
+    def test_release_creation_forgets_target_repo_responses(self, tdb, mock_http):
+        tdb._run_memo = {}
+        mock_http.get.return_value = _ok(b'{"published_at": "2024-01-01T00:00:00Z"}')
+        mock_http.post.return_value = MagicMock(status_code=201, content=b"{}", headers={})
+
+        _get(tdb, url=RELEASES_URL)
+        _get(tdb, url=PYPI_URL)
+        tdb.github_create_release("2.0", "main", "binhex", "arch-app", "agent/1.0")
+        _get(tdb, url=RELEASES_URL)
+        _get(tdb, url=PYPI_URL)
+
+        assert [call.kwargs["url"] for call in mock_http.get.call_args_list] == [RELEASES_URL, PYPI_URL, RELEASES_URL]
+
+
+class TestRunMemoLifecycle:
+    def test_monitor_sites_logs_stats_and_ends_memo(self, tdb, monkeypatch):
+        log = MagicMock()
+        monkeypatch.setattr(tdb, "app_logger_instance", log)
+        pypi_apps = MagicMock(return_value=(None, "https://pypi.org/search/?q=requests"))
+        monkeypatch.setattr(tdb, "pypi_apps", pypi_apps)
+        monkeypatch.setattr(tdb, "_handle_app_fetch", MagicMock(return_value=False))
+        monkeypatch.setattr(tdb, "_probe_sites", lambda names, ua: dict.fromkeys(names, False))
+        tdb.config_obj["monitor_sites"]["site_list"] = [
+            {"source_site_name": "pypi", "source_app_name": "requests", "target_repo_name": target, "action": "notify"}
+            for target in ("one", "two", "three")
+        ]
+
+        tdb.monitor_sites()
+
+        pypi_apps.assert_called_once()
+        assert tdb._run_memo is None
+        messages = [call.args[0] for call in log.info.call_args_list]
+        assert "Request memoization: 0 HTTP hits, 0 misses; parsed results 2 hits, 1 misses" in messages
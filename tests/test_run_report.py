@@ -0,0 +1,123 @@
+"""Tests for the per-run JSON report written next to the logs."""
+
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+
+def _item(app, site="pypi", action="notify", **extra):
+    return {"source_site_name": site, "source_app_name": app, "target_repo_name": app, "action": action, **extra}
+
+
+@pytest.fixture
+def reports(tdb, tmp_path, monkeypatch):
+    monkeypatch.setattr(tdb, "run_report_dir", str(tmp_path))
+    monkeypatch.setattr(tdb, "run_reports_keep", 3)
+    monkeypatch.setattr(tdb, "_probe_sites", lambda names, ua: dict.fromkeys(names, False))
+    return tmp_path
+
+
+def _last_run(path):
+    return json.loads((path / "last_run.json").read_text())
+
+
+class TestRunReport:
+    def test_items_carry_fetch_details_and_results(self, tdb, reports, mock_http, mock_yagmail):
+        responses = {
+            "https://pypi.org/pypi/changed/json": b'{"info":{"version":"2.0"}}',
+            "https://pypi.org/pypi/same/json": b'{"info":{"version":"1.0"}}',
+            "https://pypi.org/pypi/new/json": b'{"info":{"version":"0.1"}}',
+        }
+
+        def get(**kwargs):
+            body = responses[kwargs["url"]]
+            response = MagicMock(status_code=200, content=body, headers={})
+            response.iter_content.return_value = iter([body])
+            return response
+
+        mock_http.get.side_effect = get
+        site_list = [_item("changed"), _item("same"), _item("new"), _item("nobranch", action="trigger")]
+        tdb.config_obj["monitor_sites"]["site_list"] = site_list
+        for app in ("changed", "same"):
+            tdb._record_previous_version(tdb._compile_site_spec(_item(app)), "1.0", "notify")
+
+        tdb.monitor_sites()
+
+        report = _last_run(reports)
+        items = {item["source_app_name"]: item for item in report["items"]}
+        assert list(items) == ["changed", "same", "new", "nobranch"]
+        assert items["changed"]["result"] == "notified"
+        assert (items["changed"]["previous_version"], items["changed"]["current_version"]) == ("1.0", "2.0")
+        assert items["changed"]["http_status"] == 200
+        assert items["changed"]["bytes"] > 0
+        assert items["changed"]["requests"] == 1
+        assert items["changed"]["fetch_secs"] >= 0
+        assert items["changed"]["url"] == "https://pypi.org/search/?q=changed"
+        assert items["same"]["result"] == "unchanged"
+        assert items["new"]["result"] == "first_seen"
+        assert items["nobranch"]["result"] == "config_error"
+        assert {"health_probes", "fetch", "compare", "actions", "state_write"} <= set(report["phases_secs"])
+        assert report["wall_secs"] >= 0
+
+    def test_throttle_reason_is_reported(self, tdb, reports, monkeypatch):
+        site_spec = tdb._compile_site_spec(_item("app", site="github", action="trigger", target_repo_branch="main"))
+        monkeypatch.setattr(tdb, "_throttle_by_grace_period", lambda *args: False)
+        monkeypatch.setattr(tdb, "_throttle_by_release_days", lambda *args: True)
+        tdb._start_run_report()
+
+        assert tdb._trigger_release(site_spec, "owner", "2.0", "1.0", "agent/1.0") is True
+
+        assert tdb._run_report["items"][site_spec] == {"result": "throttled", "throttle": "release_days"}
+
+    def test_batched_items_point_at_the_source_fetch(self, tdb, reports, monkeypatch):
+        class BatchSource(tdb.Source):
+            name = "batch"
+
+            def fetch_one(self, site_spec, user_agent):
+                return None, None
+
+            def fetch_many(self, site_specs, user_agent):
+                tdb._report_request(200, b"x" * 42)
+                # "two" is left unresolved, as a deferred or failed item would be
+                return {
+                    site_spec: ("1.0" if site_spec.source_app_name == "one" else None, None) for site_spec in site_specs
+                }
+
+        monkeypatch.setitem(tdb._SOURCES, "batch", BatchSource())
+        site_specs = tdb._site_specs(
+            [_item("one", site="batch"), _item("two", site="batch"), _item("skipped", action="trigger")]
+        )
+        tdb._start_run_report()
+
+        # "skipped" never reaches a fetch, like a config error or an item on a down site
+        tdb._fetch_site_versions(site_specs[:2], "agent/1.0")
+        tdb._write_run_report(site_specs, 1.5)
+
+        report = _last_run(reports)
+        assert report["sources"]["batch"]["bytes"] == 42
+        assert [item.get("batched") for item in report["items"]] == [True, None, None]
+        assert "fetch_secs" not in report["items"][2]
+
+    def test_old_run_files_are_pruned(self, tdb, reports):
+        for stamp in ("20260101-000000", "20260102-000000", "20260103-000000"):
+            (reports / ("run-%s.json" % stamp)).write_text("{}")
+        (reports / "app.log").write_text("")
+        tdb._start_run_report()
+
+        tdb._write_run_report([], 0.1)
+
+        names = sorted(path.name for path in reports.iterdir())
+        assert names[0] == "app.log"
+        assert names[1:3] == ["last_run.json", "run-20260102-000000.json"]
+        assert len([name for name in names if name.startswith("run-")]) == 3
+
+    def test_disabled_reports_collect_nothing(self, tdb, reports, monkeypatch):
+        monkeypatch.setattr(tdb, "run_reports_keep", 0)
+        tdb._start_run_report()
+
+        tdb._report_item(tdb._compile_site_spec(_item("app")), result="unchanged")
+        tdb._write_run_report([], 0.1)
+
+        assert tdb._run_report is None
+        assert not (reports / "last_run.json").exists()
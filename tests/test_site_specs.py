@@ -0,0 +1,90 @@
+"""Tests for SiteSpec compilation of site_list items."""
+
+import dataclasses
+from unittest.mock import MagicMock
+
+import pytest
+
+
+def _item(site="github", app="app", **extra):
+    item = {
+        "source_site_name": site,
+        "source_app_name": app,
+        "source_repo_name": "owner",
+        "source_query_type": "Release",
+        "target_repo_name": "docker-%s" % app,
+        "action": "notify",
+    }
+    item.update(extra)
+    return item
+
+
+class TestCompileSiteSpec:
+    def test_keys_and_urls_are_precomputed(self, tdb):
+        site_spec = tdb._compile_site_spec(_item())
+
+        assert site_spec.source_query_type == "release"
+        assert site_spec.site_key == "github:app"
+        assert site_spec.state_key == ("github", "app", "docker-app")
+        assert site_spec.current_version_key == "github_app_docker-app_current_version"
+        assert site_spec.previous_version_key == "github_app_docker-app_previous_version"
+        assert site_spec.prefetch_key == ("github", "owner", "app", "release", None)
+        assert site_spec.source_site_url == "https://github.com/owner/app/releases/latest"
+        assert site_spec.source is tdb._SOURCES["github"]
+
+    def test_branch_url_includes_branch(self, tdb):
+        site_spec = tdb._compile_site_spec(_item(source_query_type="branch", source_branch_name="main"))
+
+        assert site_spec.source_site_url == "https://github.com/owner/app/commits/main"
+
+    def test_aor_grace_period_defaults_to_60(self, tdb):
+        assert tdb._compile_site_spec(_item(site="aor")).grace_period_mins == 60
+        assert tdb._compile_site_spec(_item(site="aor", grace_period_mins=5)).grace_period_mins == 5
+        assert tdb._compile_site_spec(_item(site="aur")).grace_period_mins is None
+
+    def test_unknown_source_has_no_source(self, tdb):
+        assert tdb._compile_site_spec(_item(site="sourceforge")).source is None
+
+    def test_specs_are_immutable_and_slotted(self, tdb):
+        site_spec = tdb._compile_site_spec(_item())
+
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            site_spec.source_app_name = "other"
+        assert not hasattr(site_spec, "__dict__")
+
+    def test_identical_items_share_fetch_key_but_stay_distinct(self, tdb):
+        first, second = tdb._site_specs([_item(target_repo_name="one"), _item(target_repo_name="two")])
+
+        assert first.fetch_key == second.fetch_key
+        assert len({first: 1, second: 2}) == 2
+
+
+class TestSiteSpecCache:
+    def test_compiled_once_per_site_list(self, tdb, monkeypatch):
+        compile_spec = MagicMock(side_effect=tdb._compile_site_spec)
+        monkeypatch.setattr(tdb, "_compile_site_spec", compile_spec)
+        site_list = [_item(app="a"), _item(app="b")]
+
+        assert tdb._site_specs(site_list) is tdb._site_specs(site_list)
+        assert compile_spec.call_count == 2
+
+        tdb._site_specs([_item(app="c")])
+
+        assert compile_spec.call_count == 3
+
+    def test_runs_reuse_specs_and_see_live_datetimes(self, tdb, monkeypatch):
+        compile_spec = MagicMock(side_effect=tdb._compile_site_spec)
+        monkeypatch.setattr(tdb, "_compile_site_spec", compile_spec)
+        monkeypatch.setattr(tdb, "_probe_sites", lambda names, ua: dict.fromkeys(names, False))
+        versions = iter(["1.0", "2.0"])
+        monkeypatch.setattr(tdb, "pypi_apps", lambda app, ua: (next(versions), "https://pypi.org/project/a"))
+        tdb.config_obj["monitor_sites"]["site_list"] = [
+            _item(site="pypi", action="trigger", target_repo_branch="main", grace_period_mins=60)
+        ]
+
+        tdb.monitor_sites()
+        tdb.monitor_sites()
+
+        assert compile_spec.call_count == 1
+        # the grace period datetime is written to the config section the spec points at
+        assert "source_version_change_datetime" in tdb.config_obj["monitor_sites"]["site_list"][0]
@@ -0,0 +1,88 @@
+"""Tests for the per-run SMTP session shared by email notifications."""
+
+import smtplib
+from unittest.mock import MagicMock
+
+import pytest
+
+
+def _send(tdb, error_msg="boom"):
+    return tdb.notification_email(msg_type="app_error", action="notify", source_app_name="app", error_msg=error_msg)
+
+
+class TestSmtpSession:
+    @pytest.fixture(autouse=True)
+    def enable_email(self, tdb):
+        tdb.email_notification = True
+
+    def test_messages_share_one_login(self, tdb, mock_yagmail):
+        assert [_send(tdb, "first"), _send(tdb, "second"), _send(tdb, "third")] == [0, 0, 0]
+
+        mock_yagmail.assert_called_once()
+        session = mock_yagmail.return_value
+        session.login.assert_called_once()
+        session.send.assert_not_called()
+        assert session.smtp.sendmail.call_count == 3
+        assert tdb._smtp_stats["sent"] == 3
+
+    def test_dropped_session_reconnects_and_resends(self, tdb, mock_yagmail):
+        dropped, fresh = MagicMock(), MagicMock()
+        for session in (dropped, fresh):
+            session.prepare_send.return_value = (["test@example.com"], "message")
+        dropped.smtp.sendmail.side_effect = smtplib.SMTPServerDisconnected("idle timeout")
+        mock_yagmail.side_effect = [dropped, fresh]
+
+        assert _send(tdb) == 0
+
+        dropped.close.assert_called_once()
+        fresh.smtp.sendmail.assert_called_once()
+        assert tdb._smtp_session is fresh
+        assert tdb._smtp_stats["reconnects"] == 1
+
+    def test_second_drop_fails_the_message(self, tdb, mock_yagmail):
+        mock_yagmail.return_value.smtp.sendmail.side_effect = ConnectionResetError("reset by peer")
+
+        assert _send(tdb) == 1
+
+        assert mock_yagmail.call_count == 2
+        assert tdb._smtp_session is None
+        assert tdb._smtp_stats["failed"] == 1
+
+    def test_rejected_message_keeps_session(self, tdb, mock_yagmail):
+        session = mock_yagmail.return_value
+        session.smtp.sendmail.side_effect = [smtplib.SMTPRecipientsRefused({}), None]
+
+        assert [_send(tdb), _send(tdb)] == [1, 0]
+
+        mock_yagmail.assert_called_once()
+        session.close.assert_not_called()
+
+    def test_close_logs_summary_and_resets(self, tdb, mock_yagmail, caplog):
+        _send(tdb)
+
+        tdb._close_smtp_session()
+
+        mock_yagmail.return_value.close.assert_called_once()
+        assert tdb._smtp_session is None
+        assert tdb._smtp_stats["sent"] == 0
+        assert "1 sent, 0 failed, 0 reconnects" in caplog.text
+
+    def test_run_closes_session_after_notifications_drain(self, tdb, mock_yagmail, monkeypatch):
+        monkeypatch.setattr(tdb, "_probe_sites", lambda names, ua: dict.fromkeys(names, False))
+        monkeypatch.setattr(tdb, "_iter_site_versions", lambda site_specs, ua: iter(()))
+
+        def skip_site_item(site_spec, site_down):
+            tdb._send_notification(tdb.notification_email, msg_type="site_error", error_msg="down")
+            return True
+
+        monkeypatch.setattr(tdb, "_skip_site_item", skip_site_item)
+        tdb.config_obj["monitor_sites"]["site_list"] = [
+            {"source_site_name": "pypi", "source_app_name": "app", "target_repo_name": "app", "action": "notify"}
+        ]
+
+        tdb.monitor_sites()
+
+        session = mock_yagmail.return_value
+        session.smtp.sendmail.assert_called_once()
+        session.close.assert_called_once()
+        assert tdb._smtp_session is None
@@ -0,0 +1,140 @@
+"""Tests for the source registry and the per-source fetch_many interface."""
+
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+
+def _item(app, site="pypi", **extra):
+    item = {
+        "source_site_name": site,
+        "source_app_name": app,
+        "source_repo_name": "owner",
+        "source_query_type": "release",
+        "target_repo_name": "docker-%s" % app,
+        "action": "notify",
+    }
+    item.update(extra)
+    return item
+
+
+class RecordingSource:
+    """Stands in for a registered source and records each fetch_many call."""
+
+    def __init__(self, tdb, name):
+        class VersionSource(tdb.Source):
+            def fetch_one(self, site_spec, user_agent):
+                return "1.0-%s" % site_spec.source_app_name, None
+
+        self.source = VersionSource()
+        self.source.name = name
+        self.calls = []
+        original = self.source.fetch_many
+
+        def fetch_many(site_specs, user_agent):
+            self.calls.append([site_spec.source_app_name for site_spec in site_specs])
+            return original(site_specs, user_agent)
+
+        self.source.fetch_many = fetch_many
+
+
+@pytest.fixture
+def registry(tdb, monkeypatch):
+    monkeypatch.setattr(tdb, "_SOURCES", dict(tdb._SOURCES))
+    return tdb._SOURCES
+
+
+class TestFetchSiteVersions:
+    def test_each_source_called_once_with_unique_items(self, tdb, registry):
+        pypi = RecordingSource(tdb, "pypi")
+        aur = RecordingSource(tdb, "aur")
+        tdb.register_source(pypi.source)
+        tdb.register_source(aur.source)
+        site_list = [_item("a"), _item("b"), _item("a", target_repo_name="other"), _item("yay", site="aur")]
+
+        results = tdb._fetch_site_versions(tdb._site_specs(site_list), "agent/1.0")
+
+        assert [version for version, _ in results] == ["1.0-a", "1.0-b", "1.0-a", "1.0-yay"]
+        assert pypi.calls == [["a", "b"]]
+        assert aur.calls == [["yay"]]
+
+    def test_fetch_workers_caps_fetches_across_sources(self, tdb, registry, monkeypatch):
+        monkeypatch.setattr(tdb, "fetch_workers", 2)
+        lock = threading.Lock()
+        state = {"active": 0, "peak": 0}
+
+        class SlowSource(tdb.Source):
+            def fetch_one(self, site_spec, user_agent):
+                with lock:
+                    state["active"] += 1
+                    state["peak"] = max(state["peak"], state["active"])
+                threading.Event().wait(0.02)
+                with lock:
+                    state["active"] -= 1
+                return "1.0", None
+
+        for name in ("pypi", "gitlab"):
+            source = SlowSource()
+            source.name = name
+            tdb.register_source(source)
+
+        site_list = [_item("p%d" % i) for i in range(4)] + [_item("g%d" % i, site="gitlab") for i in range(4)]
+        tdb._fetch_site_versions(tdb._site_specs(site_list), "agent/1.0")
+
+        assert state["peak"] <= 2
+
+    def test_github_items_deferred_when_budget_low(self, tdb, monkeypatch):
+        github_apps = MagicMock()
+        monkeypatch.setattr(tdb, "github_apps", github_apps)
+        monkeypatch.setattr(tdb, "_github_rate_limited", lambda resource="core": True)
+
+        results = tdb._fetch_site_versions(tdb._site_specs([_item("a", site="github")]), "agent/1.0")
+
+        assert results == [(None, None)]
+        github_apps.assert_not_called()
+
+
+class TestRegisteredSources:
+    def test_source_must_implement_fetch_one(self, tdb):
+        class IncompleteSource(tdb.Source):
+            name = "incomplete"
+
+        with pytest.raises(TypeError):
+            IncompleteSource()
+
+    def test_registered_source_is_monitored(self, tdb, registry, monkeypatch):
+        class ChartSource(tdb.Source):
+            name = "helm"
+
+            def fetch_one(self, site_spec, user_agent):
+                return "4.2.0", "https://charts.example/%s" % site_spec.source_app_name
+
+        tdb.register_source(ChartSource())
+        monkeypatch.setattr(tdb, "_probe_sites", lambda names, ua: dict.fromkeys(names, False))
+        tdb.config_obj["monitor_sites"]["site_list"] = [_item("nginx", site="helm")]
+
+        tdb.monitor_sites()
+
+        assert tdb.config_obj["results"]["helm_nginx_docker-nginx_previous_version"] == "4.2.0"
+
+    def test_probe_uses_site_probe(self, tdb, monkeypatch):
+        check_site = MagicMock(return_value=True)
+        monkeypatch.setattr(tdb, "check_site", check_site)
+
+        assert tdb._SOURCES["pypi"].probe("agent/1.0") is True
+        assert check_site.call_args.kwargs == {
+            "url": "https://pypi.org/pypi/requests/json",
+            "user_agent": "agent/1.0",
+            "site_name": "PyPi",
+        }
+
+    def test_source_without_probe_is_never_down(self, tdb):
+        assert tdb._SOURCES["regex"].probe("agent/1.0") is False
+
+    def test_probe_sites_only_probes_sources_in_use(self, tdb, monkeypatch):
+        check_site = MagicMock(return_value=False)
+        monkeypatch.setattr(tdb, "check_site", check_site)
+
+        assert tdb._probe_sites({"aur", "regex"}, "agent/1.0") == {"aur": False}
+        assert check_site.call_count == 1
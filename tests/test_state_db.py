@@ -0,0 +1,111 @@
+"""Tests for the optional SQLite state backend and its version history."""
+
+import time
+
+
+def _pypi_item(app):
+    return {"source_site_name": "pypi", "source_app_name": app, "target_repo_name": app, "action": "notify"}
+
+
+def _spec(tdb, app):
+    return tdb._compile_site_spec(_pypi_item(app))
+
+
+def _open(tdb, tmp_path):
+    return tdb._open_state_db(str(tmp_path / "state.db"))
+
+
+class TestSqliteBackend:
+    def test_current_and_previous_versions(self, tdb, tmp_path):
+        _open(tdb, tmp_path)
+
+        assert tdb._get_previous_version(_spec(tdb, "app")) is None
+
+        tdb._record_current_version(_spec(tdb, "app"), "1.0")
+        tdb._record_previous_version(_spec(tdb, "app"), "1.0", "first_seen")
+
+        assert tdb._get_previous_version(_spec(tdb, "app")) == "1.0"
+        # nothing goes to config.ini
+        assert tdb.config_obj["results"] == {}
+        assert tdb._state_dirty is False
+
+    def test_history_records_new_versions_only(self, tdb, tmp_path):
+        _open(tdb, tmp_path)
+
+        for version in ("1.0", "1.0", "1.1", "1.1"):
+            tdb._record_current_version(_spec(tdb, "app"), version)
+        tdb._record_previous_version(_spec(tdb, "app"), "1.1", "notify")
+
+        changes = tdb.state_changes_since(3600)
+
+        assert [(event, version) for _, _, _, _, event, version in changes] == [
+            ("observed", "1.0"),
+            ("observed", "1.1"),
+            ("notify", "1.1"),
+        ]
+
+    def test_changes_since_excludes_older_entries(self, tdb, tmp_path):
+        connection = _open(tdb, tmp_path)
+        connection.execute(
+            "INSERT INTO history (recorded_at, site, app, target, event, version) "
+            "VALUES (?, 'pypi', 'old', 'old', 'trigger', '0.9')",
+            (time.time() - 2 * 86400,),
+        )
+        tdb._record_previous_version(_spec(tdb, "new"), "2.0", "trigger")
+
+        assert [row[2] for row in tdb.state_changes_since(86400)] == ["new"]
+
+    def test_changes_since_needs_sqlite(self, tdb):
+        assert tdb.state_changes_since(86400) is None
+
+    def test_existing_results_are_imported(self, tdb, tmp_path):
+        tdb.config_obj["monitor_sites"]["site_list"] = [_pypi_item("app"), _pypi_item("new")]
+        tdb.config_obj["results"]["pypi_app_app_current_version"] = "1.1"
+        tdb.config_obj["results"]["pypi_app_app_previous_version"] = "1.0"
+
+        _open(tdb, tmp_path)
+
+        assert tdb._get_previous_version(_spec(tdb, "app")) == "1.0"
+        assert tdb._get_previous_version(_spec(tdb, "new")) is None
+
+    def test_string_site_list_imports_nothing(self, tdb, tmp_path):
+        tdb.config_obj["monitor_sites"]["site_list"] = "legacy string"
+        tdb.config_obj["results"]["pypi_app_app_previous_version"] = "1.0"
+
+        connection = _open(tdb, tmp_path)
+
+        assert connection.execute("SELECT COUNT(*) FROM versions").fetchone() == (0,)
+
+    def test_flush_commits_to_disk(self, tdb, tmp_path):
+        _open(tdb, tmp_path)
+        tdb._record_previous_version(_spec(tdb, "app"), "1.0", "trigger")
+
+        tdb._flush_state()
+        tdb._state_db.close()
+        tdb._state_db = None
+        _open(tdb, tmp_path)
+
+        assert tdb._get_previous_version(_spec(tdb, "app")) == "1.0"
+
+
+class TestMonitorSitesWithSqlite:
+    def test_run_keeps_results_out_of_config(self, tdb, tmp_path, monkeypatch):
+        _open(tdb, tmp_path)
+        versions = {"a": "1.0"}
+        monkeypatch.setattr(tdb, "pypi_apps", lambda app, *args: (versions[app], "https://pypi.org/project/a"))
+        monkeypatch.setattr(tdb, "_probe_sites", lambda names, ua: dict.fromkeys(names, False))
+        monkeypatch.setattr(tdb, "notification_email", lambda **kwargs: None)
+        tdb.config_obj["monitor_sites"]["site_list"] = [_pypi_item("a")]
+
+        tdb.monitor_sites()
+        versions["a"] = "1.1"
+        tdb.monitor_sites()
+
+        assert tdb.config_obj["results"] == {}
+        assert tdb._get_previous_version(_spec(tdb, "a")) == "1.1"
+        assert [row[4:] for row in tdb.state_changes_since(3600)] == [
+            ("observed", "1.0"),
+            ("first_seen", "1.0"),
+            ("observed", "1.1"),
+            ("notify", "1.1"),
+        ]
@@ -0,0 +1,82 @@
+"""Tests for the write-behind state store and the atomic config.ini flush."""
+
+import os
+from unittest.mock import MagicMock
+
+import configobj
+
+
+def _read_back(tdb):
+    return configobj.ConfigObj(tdb.config_obj.filename, encoding="UTF-8")
+
+
+def _pypi_item(app):
+    return {"source_site_name": "pypi", "source_app_name": app, "target_repo_name": app, "action": "notify"}
+
+
+class TestFlushState:
+    def test_clean_state_is_not_written(self, tdb):
+        tdb._flush_state()
+
+        assert not os.path.exists(tdb.config_obj.filename)
+
+    def test_dirty_state_is_written_once(self, tdb):
+        tdb.config_obj["results"]["pypi_app_app_previous_version"] = "1.0"
+        tdb._mark_state_dirty()
+
+        tdb._flush_state()
+
+        assert _read_back(tdb)["results"]["pypi_app_app_previous_version"] == "1.0"
+        assert tdb._state_dirty is False
+        assert not os.path.exists(tdb.config_obj.filename + ".tmp")
+
+    def test_file_mode_is_preserved(self, tdb):
+        tdb.config_obj.write()
+        os.chmod(tdb.config_obj.filename, 0o600)
+        tdb._mark_state_dirty()
+
+        tdb._flush_state()
+
+        assert os.stat(tdb.config_obj.filename).st_mode & 0o777 == 0o600
+
+    def test_failed_write_keeps_old_file_and_stays_dirty(self, tdb, monkeypatch):
+        tdb.config_obj["results"]["pypi_app_app_previous_version"] = "1.0"
+        tdb.config_obj.write()
+        tdb.config_obj["results"]["pypi_app_app_previous_version"] = "2.0"
+        tdb._mark_state_dirty()
+        monkeypatch.setattr(tdb.os, "replace", MagicMock(side_effect=OSError("disk full")))
+
+        tdb._flush_state()
+
+        assert _read_back(tdb)["results"]["pypi_app_app_previous_version"] == "1.0"
+        assert tdb._state_dirty is True
+
+
+class TestWriteBehind:
+    def test_version_bookkeeping_is_buffered(self, tdb, monkeypatch):
+        write = MagicMock()
+        monkeypatch.setattr(tdb, "_write_config_atomic", write)
+        site_item = {"source_site_name": "pypi", "source_app_name": "app", "target_repo_name": "app"}
+
+        assert tdb._throttle_by_grace_period(site_item, "app", 60, None, None, "2026-01-01 00:00:00") is True
+
+        assert site_item["source_version_change_datetime"] == "2026-01-01 00:00:00"
+        assert tdb._state_dirty is True
+        write.assert_not_called()
+
+    def test_run_flushes_in_batches_and_at_end(self, tdb, monkeypatch):
+        flushes = []
+        monkeypatch.setattr(tdb, "_write_config_atomic", lambda: flushes.append(tdb.config_obj["results"].copy()))
+        monkeypatch.setattr(tdb, "pypi_apps", lambda app, *args: ("1.0", "https://pypi.org/project/%s" % app))
+        monkeypatch.setattr(tdb, "_probe_sites", lambda names, ua: dict.fromkeys(names, False))
+        monkeypatch.setattr(tdb, "state_flush_items", 2)
+        tdb.config_obj["monitor_sites"]["site_list"] = [_pypi_item(app) for app in ("a", "b", "c", "d", "e")]
+
+        tdb.monitor_sites()
+
+        # one flush after each 2 apps, then the final one with last_check
+        assert len(flushes) == 3
+        assert "pypi_b_b_current_version" in flushes[0]
+        assert "pypi_c_c_current_version" not in flushes[0]
+        assert "pypi_e_e_current_version" in flushes[-1]
+        assert tdb._state_dirty is False
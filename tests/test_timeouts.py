@@ -0,0 +1,143 @@
+"""Tests for per-source timeout profiles and the per-run deadline."""
+
+import time
+from unittest.mock import MagicMock
+
+import requests
+
+
+def _ok():
+    return MagicMock(status_code=200, content=b"{}", headers={})
+
+
+class TestSourceTimeouts:
+    def test_defaults_per_source(self, tdb, mock_http):
+        mock_http.get.return_value = _ok()
+
+        tdb.http_client(url="https://archlinux.org/packages/search/json/", user_agent="agent/1.0", request_type="get")
+        assert mock_http.get.call_args.kwargs["timeout"] == (5.0, 20.0)
+
+        tdb.http_client(url="https://pypi.org/pypi/requests/json", user_agent="agent/1.0", request_type="get")
+        assert mock_http.get.call_args.kwargs["timeout"] == (5.0, 15.0)
+
+    def test_configured_override(self, tdb, mock_http, monkeypatch):
+        monkeypatch.setattr(tdb, "source_settings", {"gitlab": {"connect_timeout_secs": 2.0, "read_timeout_secs": 8.0}})
+        mock_http.get.return_value = _ok()
+
+        tdb.http_client(url="https://gitlab.com/api/v4/projects/1", user_agent="agent/1.0", request_type="get")
+
+        assert mock_http.get.call_args.kwargs["timeout"] == (2.0, 8.0)
+
+    def test_named_source_wins_over_host(self, tdb):
+        assert tdb._request_timeouts("http://192.168.1.10:8080/jsonrpc", "kodi") == (3.0, 5.0)
+        assert tdb._request_timeouts("http://192.168.1.10:8080/jsonrpc") == (5.0, 15.0)
+
+
+class TestNotificationTimeouts:
+    def test_smtp_timeout_passed_to_yagmail(self, tdb, mock_yagmail, monkeypatch):
+        monkeypatch.setattr(tdb, "source_settings", {"smtp": {"timeout_secs": 12.0}})
+
+        tdb.notification_email(msg_type="app_error", action="notify", source_app_name="app", error_msg="boom")
+
+        assert mock_yagmail.call_args.kwargs["timeout"] == 12.0
+
+    def test_kodi_call_goes_through_http_client(self, tdb, mock_http):
+        tdb.kodi_notification = True
+        mock_http.post.return_value = MagicMock(status_code=200, content=b'{"result":"OK"}', headers={})
+
+        assert tdb.notification_kodi("trigger", "myapp", "v2.0.0") is None
+
+        call = mock_http.post.call_args.kwargs
+        assert call["url"] == "http://localhost:80/jsonrpc"
+        assert call["timeout"] == (3.0, 5.0)
+        assert call["auth"] == ("kodi", "kodi")
+        assert call["json"]["method"] == "GUI.ShowNotification"
+        assert call["json"]["params"]["title"] == "TriggerDockerBuild"
+
+    def test_kodi_timeout_is_retried_then_returns_1(self, tdb, mock_http, mock_time_sleep):
+        tdb.kodi_notification = True
+        mock_http.post.side_effect = requests.exceptions.ReadTimeout("read timeout")
+
+        assert tdb.notification_kodi("trigger", "myapp", "v2.0.0") == 1
+        # [[kodi]] max_attempts
+        assert mock_http.post.call_count == 3
+        assert mock_time_sleep.call_count == 2
+
+    def test_kodi_is_sent_past_the_run_deadline(self, tdb, mock_http):
+        tdb.kodi_notification = True
+        tdb._run_deadline = time.monotonic() - 1
+        mock_http.post.return_value = MagicMock(status_code=200, content=b'{"result":"OK"}', headers={})
+
+        assert tdb.notification_kodi("trigger", "myapp", "v2.0.0") is None
+        # the deadline does not clamp its timeouts either
+        assert mock_http.post.call_args.kwargs["timeout"] == (3.0, 5.0)
+
+
+class TestRunDeadline:
+    def test_timeouts_clamped_to_time_left(self, tdb, mock_http):
+        tdb._run_deadline = time.monotonic() + 4
+        mock_http.get.return_value = _ok()
+
+        tdb.http_client(url="https://pypi.org/pypi/requests/json", user_agent="agent/1.0", request_type="get")
+
+        connect_timeout, read_timeout = mock_http.get.call_args.kwargs["timeout"]
+        assert connect_timeout <= 4
+        assert read_timeout <= 4
+
+    def test_expired_deadline_skips_low_priority_requests(self, tdb, mock_http):
+        tdb._run_deadline = time.monotonic() - 1
+
+        return_code, _, _ = tdb.http_client(
+            url="https://pypi.org/pypi/requests/json", user_agent="agent/1.0", request_type="get"
+        )
+
+        assert return_code == 1
+        mock_http.get.assert_not_called()
+
+    def test_expired_deadline_still_sends_high_priority(self, tdb, mock_http):
+        tdb._run_deadline = time.monotonic() - 1
+        mock_http.post.return_value = MagicMock(status_code=201, content=b"{}", headers={})
+
+        return_code, status_code, _ = tdb.github_create_release("2.0", "main", "binhex", "arch-app", "agent/1.0")
+
+        assert (return_code, status_code) == (0, 201)
+
+    def test_no_retry_past_deadline(self, tdb, mock_http, mock_time_sleep):
+        tdb._run_deadline = time.monotonic() + 5
+        mock_http.get.return_value = MagicMock(status_code=503, content=b"", headers={"Retry-After": "10"})
+
+        return_code, status_code, _ = tdb.http_client(
+            url="https://pypi.org/pypi/requests/json", user_agent="agent/1.0", request_type="get"
+        )
+
+        assert (return_code, status_code) == (1, 503)
+        assert mock_http.get.call_count == 1
+        mock_time_sleep.assert_not_called()
+
+    def test_items_left_unfetched_are_deferred_without_errors(self, tdb, monkeypatch):
+        fetched = []
+
+        def fake_pypi_apps(source_app_name, *args):
+            fetched.append(source_app_name)
+            # the first fetch uses up the whole run budget
+            tdb._run_deadline = time.monotonic() - 1
+            return "1.0", "https://pypi.org/project/%s" % source_app_name
+
+        handle_app_fetch = MagicMock(return_value=False)
+        monkeypatch.setattr(tdb, "pypi_apps", fake_pypi_apps)
+        monkeypatch.setattr(tdb, "_handle_app_fetch", handle_app_fetch)
+        monkeypatch.setattr(tdb, "source_settings", {"pypi": {"max_concurrency": 1}})
+        monkeypatch.setattr(tdb, "fetch_workers", 1)
+        monkeypatch.setattr(tdb, "run_deadline_secs", 60)
+        monkeypatch.setattr(tdb, "_probe_sites", lambda names, ua: dict.fromkeys(names, False))
+        tdb.config_obj["monitor_sites"]["site_list"] = [
+            {"source_site_name": "pypi", "source_app_name": app, "target_repo_name": app, "action": "notify"}
+            for app in ("first", "second")
+        ]
+
+        tdb.monitor_sites()
+
+        assert fetched == ["first"]
+        # only the fetched item reaches the version handling, the deferred one is not an app failure
+        assert handle_app_fetch.call_count == 1
+        assert handle_app_fetch.call_args.args[0] == "1.0"